@@ -0,0 +1,2 @@
+# benchmarks/__init__.py
+"""Benchmark scripts for the Discord Party Bot"""
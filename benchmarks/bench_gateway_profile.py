@@ -0,0 +1,77 @@
+"""
+Compare gateway profiles: time-to-ready and RSS of a bare bot under each profile
+
+Each profile runs in a fresh process that connects with DISCORD_TOKEN, waits for
+on_ready plus a settle period (so guild chunking and cache fills are counted),
+reports, and disconnects. Storage warmup and command sync are turned off so only
+the gateway and cache cost is measured.
+
+Usage: python -m benchmarks.bench_gateway_profile [settle_seconds] [profile ...]
+"""
+import os
+import sys
+import json
+import time
+import asyncio
+import subprocess
+
+PROFILES = ['standard', 'lean']
+
+async def measure(profile: str, settle: float) -> dict:
+    """Run one bot with the profile until ready and report timings and memory"""
+    from config.settings import DISCORD_TOKEN
+    from cluster.stats import get_rss_bytes
+    from main import create_bot
+    
+    started = time.perf_counter()
+    bot = create_bot(profile=profile)
+    result = {'profile': profile, 'rss_mb_before': round(get_rss_bytes() / 2 ** 20, 1)}
+    ready = asyncio.Event()
+    
+    @bot.event
+    async def on_ready():
+        result['time_to_ready_s'] = round(time.perf_counter() - started, 2)
+        ready.set()
+    
+    runner = asyncio.ensure_future(bot.start(DISCORD_TOKEN))
+    try:
+        await ready.wait()
+        await asyncio.sleep(settle)
+        result.update({
+            'rss_mb': round(get_rss_bytes() / 2 ** 20, 1),
+            'guilds': len(bot.guilds),
+            'cached_members': sum(len(guild.members) for guild in bot.guilds),
+            'cached_messages': len(bot.cached_messages)
+        })
+    finally:
+        await bot.close()
+        runner.cancel()
+    return result
+
+def run_child(profile: str, settle: float) -> dict:
+    env = dict(os.environ, BOT_PROFILE=profile, WARMUP_STORAGE='false', COMMAND_SYNC='off',
+               METRICS_ENABLED='false', LOG_LEVEL='WARNING')
+    output = subprocess.run([sys.executable, '-m', 'benchmarks.bench_gateway_profile', '--child', profile, str(settle)],
+                            capture_output=True, text=True, env=env)
+    if output.returncode != 0:
+        return {'profile': profile, 'error': output.stderr.strip().splitlines()[-1:] or ['failed']}
+    return json.loads(output.stdout.strip().splitlines()[-1])
+
+def main():
+    if len(sys.argv) > 1 and sys.argv[1] == '--child':
+        print(json.dumps(asyncio.run(measure(sys.argv[2], float(sys.argv[3])))))
+        return
+    
+    settle = float(sys.argv[1]) if len(sys.argv) > 1 else 15.0
+    profiles = sys.argv[2:] or PROFILES
+    print(f"{'profile':<10} {'ready':>8} {'rss':>9} {'guilds':>7} {'members':>9} {'messages':>9}")
+    for profile in profiles:
+        result = run_child(profile, settle)
+        if 'error' in result:
+            print(f"{profile:<10} failed: {result['error']}")
+            continue
+        print(f"{profile:<10} {result['time_to_ready_s']:>7.2f}s {result['rss_mb']:>7.1f}MB {result['guilds']:>7} "
+              f"{result['cached_members']:>9} {result['cached_messages']:>9}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""
+Measure the import time of an entry point against IMPORT_TIME_BUDGET
+
+Runs a fresh interpreter with -X importtime, prints the slowest modules and
+fails if the total exceeds the budget or a lazily loaded SDK was imported eagerly.
+
+Usage: python -m benchmarks.bench_import_time [module] [top_n]
+"""
+import os
+import sys
+import subprocess
+from typing import List, Tuple
+from config.settings import IMPORT_TIME_BUDGET
+
+# SDKs that must only be imported when first used
+LAZY_MODULES = ('firebase_admin', 'google.cloud.firestore', 'grpc', 'redis', 'nacl', 'dateutil')
+
+def measure(module: str) -> List[Tuple[str, int, int]]:
+    """Import module in a fresh interpreter and return (name, self_us, cumulative_us) per import"""
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        capture_output=True, text=True, cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    )
+    if result.returncode != 0:
+        sys.stderr.write(result.stderr)
+        raise SystemExit(f"import {module} failed")
+    
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        rows.append((name.rstrip(), int(self_us), int(cumulative_us)))
+    return rows
+
+def main():
+    module = sys.argv[1] if len(sys.argv) > 1 else 'main'
+    top_n = int(sys.argv[2]) if len(sys.argv) > 2 else 15
+    rows = measure(module)
+    
+    # Top-level imports are the ones without indentation; their cumulative times add up to the total
+    total = sum(cumulative for name, _, cumulative in rows if not name.startswith(' ')) / 1e6
+    print(f"import {module}: {total:.3f}s (budget {IMPORT_TIME_BUDGET:.2f}s)\n")
+    print(f"{'cumulative':>11}  {'self':>9}  module")
+    for name, self_us, cumulative in sorted(rows, key=lambda row: row[2], reverse=True)[:top_n]:
+        print(f"{cumulative / 1e3:9.1f}ms  {self_us / 1e3:7.1f}ms  {name.strip()}")
+    
+    eager = sorted({name.strip() for name, _, _ in rows
+                    if any(name.strip() == lazy or name.strip().startswith(lazy + '.') for lazy in LAZY_MODULES)})
+    if eager:
+        print(f"\n❌ Imported eagerly: {', '.join(eager[:10])}")
+    if total > IMPORT_TIME_BUDGET:
+        print(f"\n❌ Over budget by {total - IMPORT_TIME_BUDGET:.3f}s")
+    sys.exit(1 if eager or total > IMPORT_TIME_BUDGET else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+"""
+Benchmark the typed Party model against the raw-dict path for rendering and stats
+
+Times format_party_embed / calculate_party_stats on Party models against the previous
+dict implementations, and compares the memory of parsed models with the raw documents.
+
+Usage: python -m benchmarks.bench_party_model [parties] [iterations]
+"""
+import sys
+import copy
+import time
+import random
+import tracemalloc
+import discord
+from config.settings import EMBED_COLOR
+from database.models import Party
+from utils.helpers import format_party_embed, calculate_party_stats
+
+ROLES = ['tank', 'healer', 'dps', 'dps', 'dps', 'cant_attend']
+
+def make_party(index: int, rng: random.Random) -> dict:
+    """A party document shaped like the ones PartyOperations returns"""
+    creator_id = 100000000000000000 + index
+    members = {}
+    for n in range(rng.randint(4, 12)):
+        user_id = creator_id if n == 0 else rng.randint(10 ** 17, 10 ** 18)
+        members[str(user_id)] = {'username': f'user{user_id % 10000}', 'role': rng.choice(ROLES), 'joined_at': None}
+    return {
+        'id': f'party{index:06d}abcdef', 'guild_id': 1, 'channel_id': 2, 'message_id': 3 + index,
+        'party_name': f'Raid night {index}', 'party_timestamp': 1760000000 + index * 60,
+        'tank_slots': 2, 'healer_slots': 2, 'dps_slots': 4, 'created_by': creator_id, 'members': members
+    }
+
+def legacy_format_party_embed(party_data: dict) -> discord.Embed:
+    """The dict-based renderer, kept here as the baseline"""
+    party_creator_id = party_data.get('created_by')
+    members = party_data.get('members', {})
+    embed = discord.Embed(title=f"⚔️ {party_data.get('party_name', 'Unknown Party')}", color=EMBED_COLOR)
+    
+    party_timestamp = party_data.get('party_timestamp')
+    if party_timestamp:
+        try:
+            timestamp = int(party_timestamp)
+            embed.add_field(name="🕐 Party Starts", value=f"<t:{timestamp}:F>\n<t:{timestamp}:R>", inline=False)
+        except (ValueError, TypeError):
+            embed.add_field(name="🕐 Party Starts", value=f"**{party_timestamp}**", inline=False)
+    
+    buckets = {'tank': [], 'healer': [], 'dps': [], 'cant_attend': []}
+    for user_id_str, member_data in members.items():
+        user_id = int(user_id_str)
+        username = member_data.get('username', 'Unknown')
+        display_name = f"👑 {username}" if user_id == party_creator_id else username
+        bucket = buckets.get(member_data.get('role', 'unknown'))
+        if bucket is not None:
+            bucket.append(display_name)
+    
+    for role, label, default in (('tank', '🛡️ Tanks', 2), ('healer', '💚 Healers', 2), ('dps', '⚔️ DPS', 4)):
+        slots = party_data.get(f'{role}_slots', default)
+        names = buckets[role]
+        text = "\n".join(names[i] if i < len(names) else "*Empty*" for i in range(slots)) or "*No Slots Set*"
+        embed.add_field(name=f"{label} ({len(names)}/{slots})", value=text, inline=True)
+    
+    embed.add_field(name=f"❌ Can't Attend ({len(buckets['cant_attend'])})",
+                    value="\n".join(buckets['cant_attend']) or "*Empty*", inline=False)
+    
+    creator_name = 'Unknown'
+    for user_id_str, member_data in members.items():
+        if int(user_id_str) == party_creator_id:
+            creator_name = member_data.get('username', 'Unknown')
+    total_members = len(buckets['tank']) + len(buckets['healer']) + len(buckets['dps'])
+    total_slots = (party_data.get('tank_slots', 2) + party_data.get('healer_slots', 2) +
+                   party_data.get('dps_slots', 4))
+    embed.set_footer(text=f"{creator_name}'s Party • {total_members}/{total_slots} members")
+    return embed
+
+def legacy_calculate_party_stats(parties: list) -> dict:
+    """The dict-based stats, kept here as the baseline"""
+    total_members = 0
+    role_stats = {'tank': 0, 'healer': 0, 'dps': 0, 'cant_attend': 0}
+    user_party_count = {}
+    for party_data in parties:
+        for member_data in party_data.get('members', {}).values():
+            role = member_data.get('role', 'unknown')
+            username = member_data.get('username', 'Unknown')
+            if role != 'cant_attend':
+                total_members += 1
+            if role in role_stats:
+                role_stats[role] += 1
+            user_party_count[username] = user_party_count.get(username, 0) + 1
+    return {'total_parties': len(parties), 'total_members': total_members, 'role_stats': role_stats,
+            'user_party_count': user_party_count}
+
+def bench(label: str, func, iterations: int, per_call: int) -> float:
+    """Time func and print the cost per party"""
+    start = time.perf_counter()
+    for _ in range(iterations):
+        func()
+    elapsed = time.perf_counter() - start
+    calls = iterations * per_call
+    print(f"{label:<36} {calls:>8} parties  {elapsed * 1e6 / calls:>8.1f} µs/party")
+    return elapsed
+
+def retained_bytes(build) -> int:
+    """Bytes still allocated by the object build() returns"""
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    kept = build()
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    size = sum(stat.size_diff for stat in after.compare_to(before, 'filename'))
+    del kept
+    return size
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    iterations = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    rng = random.Random(42)
+    docs = [make_party(i, rng) for i in range(count)]
+    models = [Party.from_dict(doc) for doc in docs]
+    
+    # Sanity check: both renderers produce the same embed
+    assert legacy_format_party_embed(docs[0]).to_dict() == format_party_embed(models[0]).to_dict()
+    
+    print("Render (format_party_embed)")
+    legacy = bench("  dict path", lambda: [legacy_format_party_embed(d) for d in docs], iterations, count)
+    parsed = bench("  model, parse + render", lambda: [format_party_embed(Party.from_dict(d)) for d in docs],
+                   iterations, count)
+    reused = bench("  model, already parsed", lambda: [format_party_embed(m) for m in models], iterations, count)
+    print(f"  speedup: {legacy / parsed:.2f}x with parsing, {legacy / reused:.2f}x parsed once\n")
+    
+    print("Stats (calculate_party_stats)")
+    legacy = bench("  dict path", lambda: legacy_calculate_party_stats(docs), iterations, count)
+    model = bench("  model, already parsed", lambda: calculate_party_stats(models), iterations, count)
+    print(f"  speedup: {legacy / model:.2f}x\n")
+    
+    dict_bytes = retained_bytes(lambda: copy.deepcopy(docs))
+    model_bytes = retained_bytes(lambda: [Party.from_dict(doc) for doc in docs])
+    print("Memory per party")
+    print(f"  raw documents    {dict_bytes / count:>8.0f} bytes")
+    print(f"  Party models     {model_bytes / count:>8.0f} bytes ({model_bytes / dict_bytes:.2f}x)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""
+Benchmark the start time parser against the previous dateutil-only implementation
+
+Usage: python -m benchmarks.bench_time_parser [iterations]
+"""
+import sys
+import time
+from utils.time_parser import parse_start_time, clear_cache, get_cache_stats
+
+SAMPLE_INPUTS = [
+    "Friday 8PM UTC-5",
+    "Tomorrow 7PM UTC+3",
+    "tomorrow 19:00",
+    "8pm",
+    "next saturday 21:30",
+    "2025-06-01T19:00:00Z",
+    "2025-06-01 19:00",
+    "June 5th at 7pm",
+    "sometime next week",
+]
+
+def legacy_parse_time_string(time_str: str, guild_id: int = None):
+    """The original implementation, kept here as the baseline"""
+    try:
+        import dateutil.parser
+        
+        time_str = time_str.lower()
+        
+        dt = dateutil.parser.parse(time_str, fuzzy=True)
+        return int(dt.timestamp())
+    
+    except Exception:
+        return time_str
+
+def bench(label: str, func, iterations: int):
+    """Time func over all sample inputs and print per-call cost"""
+    start = time.perf_counter()
+    for _ in range(iterations):
+        for time_str in SAMPLE_INPUTS:
+            func(time_str, 1)
+    elapsed = time.perf_counter() - start
+    calls = iterations * len(SAMPLE_INPUTS)
+    print(f"{label:<28} {calls:>8} calls  {elapsed * 1e6 / calls:>8.1f} µs/call")
+    return elapsed
+
+def main():
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    
+    legacy = bench("legacy (dateutil fuzzy)", legacy_parse_time_string, iterations)
+    
+    def uncached(time_str, guild_id):
+        clear_cache()
+        return parse_start_time(time_str, guild_id)
+    
+    cold = bench("fast path, cache disabled", uncached, iterations)
+    clear_cache()
+    warm = bench("fast path, cached", parse_start_time, iterations)
+    
+    print(f"\nSpeedup vs legacy: {legacy / cold:.1f}x uncached, {legacy / warm:.1f}x cached")
+    print(f"Cache stats: {get_cache_stats()}")
+
+if __name__ == "__main__":
+    main()
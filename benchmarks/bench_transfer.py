@@ -0,0 +1,80 @@
+"""
+Benchmark NDJSON export/import (transfer.py) on a large synthetic guild
+
+Seeds N party documents under a throwaway guild id with import_documents at each
+parallelism level, exports them back with the guild filter, and reports docs/s and the
+peak traced memory of each phase. Runs only against the Firestore emulator.
+
+Usage: FIRESTORE_EMULATOR_HOST=localhost:8080 python -m benchmarks.bench_transfer [documents] [parallelism ...]
+"""
+import os
+import sys
+import time
+import random
+import tempfile
+import tracemalloc
+from typing import Iterator
+from transfer import Record, export_documents, import_documents, stream_collection
+from database.firebase_client import get_db
+
+BENCH_GUILD_ID = 999000000000000001
+
+def synthetic_records(count: int, guild_id: int, seed: int = 7) -> Iterator[Record]:
+    """Party documents generated on the fly, so seeding itself holds nothing in memory"""
+    rng = random.Random(seed)
+    for index in range(count):
+        members = {str(rng.randint(10 ** 17, 10 ** 18)): {'username': f'user{n}',
+                                                          'role': rng.choice(['tank', 'healer', 'dps'])}
+                   for n in range(rng.randint(1, 8))}
+        yield 'parties', f'bench{index:07d}', {
+            'guild_id': guild_id, 'channel_id': 1, 'message_id': index, 'party_name': f'Bench party {index}',
+            'party_timestamp': 1760000000 + index, 'tank_slots': 2, 'healer_slots': 2, 'dps_slots': 4,
+            'created_by': 1, 'members': members
+        }
+
+def measure(label: str, func, documents: int):
+    """Run func under tracemalloc and print throughput and peak memory"""
+    tracemalloc.start()
+    started = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{label:<28} {documents:>8} docs  {elapsed:>7.1f}s  {documents / elapsed:>8.0f} docs/s  "
+          f"peak {peak / 2 ** 20:>6.1f} MB")
+
+def cleanup(guild_id: int):
+    """Delete every document seeded for the benchmark guild"""
+    db = get_db()
+    batch, pending = db.batch(), 0
+    for doc_id, _ in stream_collection('parties', guild_id):
+        batch.delete(db.collection('parties').document(doc_id))
+        pending += 1
+        if pending == 500:
+            batch.commit()
+            batch, pending = db.batch(), 0
+    if pending:
+        batch.commit()
+
+def main():
+    if not os.getenv('FIRESTORE_EMULATOR_HOST'):
+        print("Set FIRESTORE_EMULATOR_HOST: this benchmark writes and deletes documents")
+        sys.exit(1)
+    documents = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    levels = [int(level) for level in sys.argv[2:]] or [1, 4, 8]
+    
+    for parallelism in levels:
+        cleanup(BENCH_GUILD_ID)
+        measure(f"import, parallel={parallelism}",
+                lambda: import_documents(synthetic_records(documents, BENCH_GUILD_ID), parallelism=parallelism,
+                                         invalidate=False), documents)
+    
+    with tempfile.NamedTemporaryFile('w', suffix='.ndjson', encoding='utf-8', delete=False) as out:
+        path = out.name
+        measure("export, guild filter", lambda: export_documents(out, ['parties'], BENCH_GUILD_ID), documents)
+    print(f"NDJSON size: {os.path.getsize(path) / 2 ** 20:.1f} MB")
+    os.unlink(path)
+    cleanup(BENCH_GUILD_ID)
+
+if __name__ == "__main__":
+    main()
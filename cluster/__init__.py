@@ -0,0 +1,2 @@
+# cluster/__init__.py
+"""Multi-process shard cluster mode for the Discord Party Bot"""
@@ -0,0 +1,12 @@
+"""
+Entry point for cluster mode: python -m cluster
+"""
+from cluster.launcher import main
+from monitoring.log_config import setup_logging, shutdown_logging
+
+if __name__ == "__main__":
+    setup_logging()
+    try:
+        main()
+    finally:
+        shutdown_logging()
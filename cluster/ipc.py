@@ -0,0 +1,135 @@
+"""
+Pipe-based IPC between the cluster launcher and its worker processes
+
+Messages are plain dicts: {'op': str, 'id': int, ...}. A reader thread per pipe
+hands incoming messages to the asyncio loop.
+"""
+import asyncio
+import logging
+import itertools
+import threading
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+from multiprocessing.connection import Connection
+
+logger = logging.getLogger(__name__)
+
+class PipeChannel:
+    """Duplex pipe endpoint that dispatches received messages onto an event loop"""
+    
+    def __init__(self, conn: Connection, on_message: Callable[[dict], None], name: str = 'ipc'):
+        self.conn = conn
+        self.on_message = on_message
+        self.name = name
+        self._send_lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self.closed = False
+    
+    def start(self, loop: asyncio.AbstractEventLoop):
+        """Start the reader thread"""
+        self._loop = loop
+        self._thread = threading.Thread(target=self._reader, name=f'{self.name}-reader', daemon=True)
+        self._thread.start()
+    
+    def _reader(self):
+        while not self.closed:
+            try:
+                message = self.conn.recv()
+            except (EOFError, OSError):
+                self.closed = True
+                self._loop.call_soon_threadsafe(self.on_message, {'op': 'disconnected'})
+                return
+            self._loop.call_soon_threadsafe(self.on_message, message)
+    
+    def send(self, message: dict):
+        """Send a message; silently dropped once the other side is gone"""
+        if self.closed:
+            return
+        try:
+            with self._send_lock:
+                self.conn.send(message)
+        except (BrokenPipeError, EOFError, OSError) as e:
+            self.closed = True
+            logger.warning("IPC %s send failed: %s", self.name, e)
+    
+    def close(self):
+        self.closed = True
+        try:
+            self.conn.close()
+        except OSError:
+            pass
+
+class ClusterClient:
+    """Worker-side IPC client: identify permits, cluster-wide broadcasts and command handlers"""
+    
+    def __init__(self, cluster_id: int, conn: Connection):
+        self.cluster_id = cluster_id
+        self.channel = PipeChannel(conn, self._on_message, name=f'cluster-{cluster_id}')
+        self._ids = itertools.count(1)
+        self._pending: Dict[int, asyncio.Future] = {}
+        self._handlers: Dict[str, Callable[[dict], Awaitable[Any]]] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+    
+    def start(self):
+        """Attach to the running loop and start receiving"""
+        self._loop = asyncio.get_running_loop()
+        self.channel.start(self._loop)
+    
+    def register(self, command: str, handler: Callable[[dict], Awaitable[Any]]):
+        """Register a handler for a cluster-wide command"""
+        self._handlers[command] = handler
+    
+    def notify(self, op: str, **payload):
+        """Send a one-way message to the launcher"""
+        self.channel.send({'op': op, 'cluster_id': self.cluster_id, **payload})
+    
+    async def request(self, op: str, timeout: Optional[float] = None, **payload) -> Any:
+        """Send a request to the launcher and wait for its reply"""
+        request_id = next(self._ids)
+        future = self._loop.create_future()
+        self._pending[request_id] = future
+        self.channel.send({'op': op, 'id': request_id, 'cluster_id': self.cluster_id, **payload})
+        try:
+            return await asyncio.wait_for(future, timeout)
+        finally:
+            self._pending.pop(request_id, None)
+    
+    async def wait_identify(self, shard_id: int):
+        """Block until the launcher grants this shard an IDENTIFY slot"""
+        await self.request('identify', shard_id=shard_id)
+    
+    async def broadcast(self, command: str, timeout: float = 10.0, **args) -> List[dict]:
+        """Run a command on every cluster (including this one) and collect the results"""
+        return await self.request('broadcast', timeout=timeout + 1, command=command, args=args,
+                                  command_timeout=timeout)
+    
+    def _on_message(self, message: dict):
+        op = message.get('op')
+        if op == 'reply':
+            future = self._pending.get(message.get('id'))
+            if future is not None and not future.done():
+                if 'error' in message:
+                    future.set_exception(RuntimeError(message['error']))
+                else:
+                    future.set_result(message.get('result'))
+        elif op == 'command':
+            asyncio.ensure_future(self._run_command(message))
+        elif op == 'disconnected':
+            logger.error("❌ Lost IPC connection to cluster launcher")
+            for future in self._pending.values():
+                if not future.done():
+                    future.set_exception(ConnectionError("IPC connection lost"))
+    
+    async def _run_command(self, message: dict):
+        command = message.get('command')
+        handler = self._handlers.get(command)
+        reply = {'op': 'reply', 'id': message.get('id'), 'cluster_id': self.cluster_id}
+        if handler is None:
+            reply['error'] = f"Unknown command: {command}"
+        else:
+            try:
+                reply['result'] = await handler(message.get('args') or {})
+            except Exception as e:
+                logger.error("Cluster command %s failed: %s", command, e)
+                reply['error'] = str(e)
+        self.channel.send(reply)
@@ -0,0 +1,208 @@
+"""
+Cluster launcher: splits the shard range across worker processes and brokers IPC
+
+Run with: python -m cluster
+"""
+import sys
+import json
+import time
+import signal
+import asyncio
+import logging
+import itertools
+import urllib.request
+import multiprocessing
+from typing import Dict, List, Optional, Tuple
+from config.settings import (DISCORD_TOKEN, CLUSTER_COUNT, SHARD_COUNT, IDENTIFY_INTERVAL,
+                             CLUSTER_STARTUP_TIMEOUT)
+from cluster.ipc import PipeChannel
+from cluster.worker import run_worker
+
+logger = logging.getLogger(__name__)
+
+GATEWAY_BOT_URL = 'https://discord.com/api/v10/gateway/bot'
+
+def fetch_gateway_info(token: str) -> Tuple[int, int]:
+    """Get Discord's recommended shard count and the IDENTIFY max_concurrency"""
+    request = urllib.request.Request(GATEWAY_BOT_URL, headers={
+        'Authorization': f'Bot {token}',
+        'User-Agent': 'DiscordBot (party-bot cluster launcher)'
+    })
+    with urllib.request.urlopen(request, timeout=10) as response:
+        data = json.loads(response.read())
+    return data['shards'], data.get('session_start_limit', {}).get('max_concurrency', 1)
+
+def split_shards(shard_count: int, cluster_count: int) -> List[List[int]]:
+    """Split shard ids into contiguous, evenly sized slices"""
+    cluster_count = max(1, min(cluster_count, shard_count))
+    base, extra = divmod(shard_count, cluster_count)
+    slices, start = [], 0
+    for i in range(cluster_count):
+        size = base + (1 if i < extra else 0)
+        slices.append(list(range(start, start + size)))
+        start += size
+    return slices
+
+class WorkerHandle:
+    """Launcher-side state for one worker process"""
+    
+    def __init__(self, cluster_id: int, shard_ids: List[int]):
+        self.cluster_id = cluster_id
+        self.shard_ids = shard_ids
+        self.process: Optional[multiprocessing.Process] = None
+        self.channel: Optional[PipeChannel] = None
+        self.ready = asyncio.Event()
+
+class ClusterLauncher:
+    """Starts worker processes one at a time and serves identify permits and broadcasts"""
+    
+    def __init__(self, shard_count: int, cluster_count: int, max_concurrency: int = 1):
+        self.shard_count = shard_count
+        self.max_concurrency = max(1, max_concurrency)
+        self.workers = [WorkerHandle(i, shards) for i, shards in enumerate(split_shards(shard_count, cluster_count))]
+        self._mp = multiprocessing.get_context('spawn')
+        self._ids = itertools.count(1)
+        self._pending: Dict[int, asyncio.Future] = {}
+        self._identify_next: Dict[int, float] = {}
+        self._identify_lock = asyncio.Lock()
+        self._stopping = False
+    
+    def _spawn(self, worker: WorkerHandle):
+        parent_conn, child_conn = self._mp.Pipe(duplex=True)
+        worker.ready.clear()
+        worker.process = self._mp.Process(
+            target=run_worker,
+            args=(worker.cluster_id, worker.shard_ids, self.shard_count, child_conn),
+            name=f'cluster-{worker.cluster_id}'
+        )
+        worker.process.start()
+        child_conn.close()
+        worker.channel = PipeChannel(parent_conn, lambda message: self._on_message(worker, message),
+                                     name=f'launcher-{worker.cluster_id}')
+        worker.channel.start(asyncio.get_running_loop())
+        logger.info("🚀 Started cluster %d (pid %s) with shards %s", worker.cluster_id, worker.process.pid, worker.shard_ids)
+    
+    async def start(self):
+        """Start workers, waiting for each cluster to become ready before starting the next"""
+        for worker in self.workers:
+            if self._stopping:
+                return
+            self._spawn(worker)
+            # Staggered start: the next cluster only identifies once this one is connected
+            budget = max(CLUSTER_STARTUP_TIMEOUT, len(worker.shard_ids) * IDENTIFY_INTERVAL / self.max_concurrency)
+            try:
+                await asyncio.wait_for(worker.ready.wait(), budget)
+            except asyncio.TimeoutError:
+                logger.warning("Cluster %d not ready after %.0fs, starting the next one anyway", worker.cluster_id, budget)
+    
+    async def supervise(self):
+        """Restart workers that exit unexpectedly"""
+        while not self._stopping:
+            await asyncio.sleep(5)
+            for worker in self.workers:
+                if self._stopping or worker.process is None or worker.process.is_alive():
+                    continue
+                logger.error("❌ Cluster %d exited with code %s, restarting", worker.cluster_id, worker.process.exitcode)
+                worker.channel.close()
+                self._spawn(worker)
+    
+    async def stop(self, timeout: float = 15.0):
+        """Ask every worker to shut down, then terminate stragglers"""
+        self._stopping = True
+        for worker in self.workers:
+            if worker.channel is not None:
+                worker.channel.send({'op': 'command', 'id': 0, 'command': 'shutdown'})
+        deadline = time.monotonic() + timeout
+        for worker in self.workers:
+            if worker.process is None:
+                continue
+            await asyncio.to_thread(worker.process.join, max(0.0, deadline - time.monotonic()))
+            if worker.process.is_alive():
+                worker.process.terminate()
+            worker.channel.close()
+    
+    def _on_message(self, worker: WorkerHandle, message: dict):
+        op = message.get('op')
+        if op == 'ready':
+            logger.info("✅ Cluster %d ready with %s guilds", worker.cluster_id, message.get('guilds'))
+            worker.ready.set()
+        elif op == 'identify':
+            asyncio.ensure_future(self._grant_identify(worker, message))
+        elif op == 'broadcast':
+            asyncio.ensure_future(self._broadcast(worker, message))
+        elif op == 'reply':
+            future = self._pending.get(message.get('id'))
+            if future is not None and not future.done():
+                future.set_result(message)
+        elif op == 'disconnected':
+            logger.warning("IPC channel to cluster %d closed", worker.cluster_id)
+    
+    async def _grant_identify(self, worker: WorkerHandle, message: dict):
+        """Allow one IDENTIFY per rate-limit bucket every IDENTIFY_INTERVAL seconds"""
+        bucket = message['shard_id'] % self.max_concurrency
+        async with self._identify_lock:
+            now = time.monotonic()
+            wait = self._identify_next.get(bucket, 0.0) - now
+            self._identify_next[bucket] = max(now, self._identify_next.get(bucket, 0.0)) + IDENTIFY_INTERVAL
+        if wait > 0:
+            await asyncio.sleep(wait)
+        worker.channel.send({'op': 'reply', 'id': message['id'], 'result': True})
+    
+    async def _broadcast(self, origin: WorkerHandle, message: dict):
+        """Fan a command out to every live worker and reply to the origin with all results"""
+        timeout = message.get('command_timeout', 10.0)
+        
+        async def ask(worker: WorkerHandle) -> dict:
+            request_id = next(self._ids)
+            future = asyncio.get_running_loop().create_future()
+            self._pending[request_id] = future
+            worker.channel.send({'op': 'command', 'id': request_id, 'command': message['command'],
+                                 'args': message.get('args')})
+            try:
+                reply = await asyncio.wait_for(future, timeout)
+                if 'error' in reply:
+                    return {'cluster_id': worker.cluster_id, 'error': reply['error']}
+                return reply.get('result')
+            except asyncio.TimeoutError:
+                return {'cluster_id': worker.cluster_id, 'error': 'timeout'}
+            finally:
+                self._pending.pop(request_id, None)
+        
+        live = [w for w in self.workers if w.channel is not None and not w.channel.closed]
+        results = await asyncio.gather(*(ask(w) for w in live))
+        origin.channel.send({'op': 'reply', 'id': message['id'], 'result': list(results)})
+
+async def launch(cluster_count: int = CLUSTER_COUNT, shard_count: int = SHARD_COUNT):
+    """Resolve the shard layout and run the cluster until interrupted"""
+    recommended, max_concurrency = await asyncio.to_thread(fetch_gateway_info, DISCORD_TOKEN)
+    if shard_count <= 0:
+        shard_count = recommended
+    
+    launcher = ClusterLauncher(shard_count, cluster_count, max_concurrency)
+    logger.info("🧩 Launching %d clusters for %d shards (max_concurrency=%d)",
+                len(launcher.workers), shard_count, max_concurrency)
+    
+    stop_event = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sig, stop_event.set)
+        except NotImplementedError:
+            pass
+    
+    supervisor = None
+    try:
+        await launcher.start()
+        supervisor = asyncio.ensure_future(launcher.supervise())
+        await stop_event.wait()
+    finally:
+        logger.info("🛑 Stopping clusters")
+        if supervisor is not None:
+            supervisor.cancel()
+        await launcher.stop()
+
+def main():
+    if not DISCORD_TOKEN:
+        logger.critical("❌ No Discord token found in environment variables!")
+        sys.exit(1)
+    asyncio.run(launch())
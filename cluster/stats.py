@@ -0,0 +1,32 @@
+"""
+Per-process statistics reported over the cluster IPC channel
+"""
+import os
+import time
+from discord.ext import commands
+
+_STARTED_AT = time.time()
+
+def get_rss_bytes() -> int:
+    """Current resident set size of this process"""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+def collect_process_stats(bot: commands.Bot, cluster_id: int = 0) -> dict:
+    """Snapshot of this bot process: shards, guilds, latency and memory"""
+    shard_ids = sorted(bot.shards.keys()) if isinstance(bot, commands.AutoShardedBot) else [bot.shard_id or 0]
+    latency = bot.latency
+    return {
+        'cluster_id': cluster_id,
+        'pid': os.getpid(),
+        'shard_ids': shard_ids,
+        'guilds': len(bot.guilds),
+        'latency_ms': round(latency * 1000, 1) if latency == latency and latency != float('inf') else None,
+        'rss_mb': round(get_rss_bytes() / (1024 * 1024), 1),
+        'uptime_s': int(time.time() - _STARTED_AT),
+        'ready': bot.is_ready()
+    }
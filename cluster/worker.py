@@ -0,0 +1,53 @@
+"""
+Cluster worker process: one auto-sharded bot over a slice of shard ids
+"""
+import asyncio
+import logging
+from typing import List
+from multiprocessing.connection import Connection
+from config.settings import METRICS_PORT
+from cluster.ipc import ClusterClient
+from cluster.stats import collect_process_stats
+from monitoring.log_config import setup_logging, shutdown_logging
+
+logger = logging.getLogger(__name__)
+
+async def _worker_main(cluster_id: int, shard_ids: List[int], shard_count: int, conn: Connection):
+    # Imported here so the launcher process never loads discord.py cogs
+    from main import create_bot, run_bot
+    
+    bot = create_bot(shard_ids=shard_ids, shard_count=shard_count)
+    client = ClusterClient(cluster_id, conn)
+    client.start()
+    bot.cluster = client
+    
+    async def before_identify_hook(shard_id: int, *, initial: bool = False):
+        # IDENTIFY limits are per bot, so every process asks the launcher for a slot
+        await client.wait_identify(shard_id)
+    bot.before_identify_hook = before_identify_hook
+    
+    async def on_ready():
+        client.notify('ready', guilds=len(bot.guilds))
+    bot.add_listener(on_ready, 'on_ready')
+    
+    async def stats_command(args: dict) -> dict:
+        return collect_process_stats(bot, cluster_id)
+    client.register('stats', stats_command)
+    
+    async def shutdown_command(args: dict) -> dict:
+        asyncio.get_running_loop().call_soon(lambda: asyncio.ensure_future(bot.close()))
+        return {'cluster_id': cluster_id, 'closing': True}
+    client.register('shutdown', shutdown_command)
+    
+    logger.info("🧩 Cluster %d starting shards %s/%d", cluster_id, shard_ids, shard_count)
+    await run_bot(bot, metrics_port=METRICS_PORT + cluster_id)
+
+def run_worker(cluster_id: int, shard_ids: List[int], shard_count: int, conn: Connection):
+    """Process entry point"""
+    setup_logging()
+    try:
+        asyncio.run(_worker_main(cluster_id, shard_ids, shard_count, conn))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        shutdown_logging()
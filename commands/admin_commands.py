@@ -1,12 +1,19 @@
 """
 Admin-only slash commands
 """
+import io
+import logging
 import discord
 from discord import app_commands
 from discord.ext import commands
 from database.party_operations import party_ops
-from utils.helpers import format_admin_stats_embed, calculate_party_stats
+from utils.helpers import format_admin_stats_embed, calculate_party_stats, format_cluster_stats_embed, get_guild_name
 from config.settings import ERROR_COLOR
+from utils.interactions import interaction_pipeline, get_context
+from cluster.stats import collect_process_stats
+from monitoring.profiler import profiler, ProfileBusy
+
+logger = logging.getLogger(__name__)
 
 class AdminCommands(commands.Cog):
     """Administrative commands for party management"""
@@ -15,19 +22,21 @@ class AdminCommands(commands.Cog):
         self.bot = bot
     
     @app_commands.command(name="admin-clear-parties", description="🔨 Admin: Delete all parties in this server")
+    @interaction_pipeline('command.admin_clear_parties', lane='admin')
     async def admin_clear_parties(self, interaction: discord.Interaction):
         """Delete all parties in the server (Admin only)"""
+        ctx = get_context(interaction)
         try:
             # Check if user has administrator permissions
-            if not interaction.user.guild_permissions.administrator:
-                await interaction.response.send_message("❌ **Admin Only** - You need Administrator permissions to use this command.", ephemeral=True)
+            if not interaction.permissions.administrator:
+                await ctx.send("❌ **Admin Only** - You need Administrator permissions to use this command.", ephemeral=True)
                 return
             
             # Delete all parties for this guild
-            party_count = party_ops.delete_guild_parties(interaction.guild.id)
+            party_count = await ctx.storage(party_ops.delete_guild_parties, interaction.guild_id)
             
             if party_count == 0:
-                await interaction.response.send_message("📭 No parties to delete in this server.", ephemeral=True)
+                await ctx.send("📭 No parties to delete in this server.", ephemeral=True)
                 return
             
             embed = discord.Embed(
@@ -37,61 +46,66 @@ class AdminCommands(commands.Cog):
             )
             embed.set_footer(text=f"Action performed by {interaction.user.display_name}")
             
-            await interaction.response.send_message(embed=embed)
-            print(f"🔨 Admin {interaction.user.display_name} deleted {party_count} parties in {interaction.guild.name}")
+            await ctx.send(embed=embed)
+            logger.info("🔨 Admin %s deleted %d parties in %s", interaction.user.display_name, party_count, get_guild_name(interaction))
             
         except Exception as e:
-            print(f"❌ Error in admin_clear_parties: {e}")
-            await interaction.response.send_message("❌ Failed to clear parties!", ephemeral=True)
+            logger.error("❌ Error in admin_clear_parties: %s", e)
+            await ctx.send("❌ Failed to clear parties!", ephemeral=True)
     
     @app_commands.command(name="admin-party-stats", description="📊 Admin: View detailed party statistics")
+    @interaction_pipeline('command.admin_party_stats', lane='admin')
     async def admin_party_stats(self, interaction: discord.Interaction):
         """View detailed party statistics (Admin only)"""
+        ctx = get_context(interaction)
         try:
             # Check if user has administrator permissions
-            if not interaction.user.guild_permissions.administrator:
-                await interaction.response.send_message("❌ **Admin Only** - You need Administrator permissions to use this command.", ephemeral=True)
+            if not interaction.permissions.administrator:
+                await ctx.send("❌ **Admin Only** - You need Administrator permissions to use this command.", ephemeral=True)
                 return
             
             # Get all parties for this guild
-            party_list = party_ops.get_guild_parties(interaction.guild.id)
+            party_list = await ctx.storage(party_ops.get_guild_parties, interaction.guild_id)
             
             # Calculate statistics
             stats = calculate_party_stats(party_list)
             
             # Create embed
-            embed = format_admin_stats_embed(stats, interaction.guild.name)
+            embed = format_admin_stats_embed(stats, get_guild_name(interaction))
             embed.set_footer(text=f"Generated by {interaction.user.display_name}")
             
-            await interaction.response.send_message(embed=embed)
+            await ctx.send(embed=embed)
             
         except Exception as e:
-            print(f"❌ Error in admin_party_stats: {e}")
-            await interaction.response.send_message("❌ Failed to get statistics!", ephemeral=True)
+            logger.error("❌ Error in admin_party_stats: %s", e)
+            await ctx.send("❌ Failed to get statistics!", ephemeral=True)
     
     @app_commands.command(name="admin-delete-party", description="🗑️ Admin: Force delete any party by ID")
     @app_commands.describe(party_id="Party ID to delete (first 8 chars shown in /parties)")
+    @interaction_pipeline('command.admin_delete_party')
     async def admin_delete_party(self, interaction: discord.Interaction, party_id: str):
         """Force delete a party by ID (Admin only)"""
+        ctx = get_context(interaction)
         try:
             # Check if user has administrator permissions
-            if not interaction.user.guild_permissions.administrator:
-                await interaction.response.send_message("❌ **Admin Only** - You need Administrator permissions to use this command.", ephemeral=True)
+            if not interaction.permissions.administrator:
+                await ctx.send("❌ **Admin Only** - You need Administrator permissions to use this command.", ephemeral=True)
                 return
             
             # Find party by partial ID
-            party_data = party_ops.find_party_by_partial_id(interaction.guild.id, party_id)
+            party_data = await ctx.storage(party_ops.find_party_by_partial_id, interaction.guild_id, party_id)
             
             if not party_data:
-                await interaction.response.send_message(f"❌ Party with ID starting with **{party_id}** not found in this server.", ephemeral=True)
+                await ctx.send(f"❌ Party with ID starting with **{party_id}** not found in this server.", ephemeral=True)
                 return
             
             party_name = party_data.get('party_name', 'Unknown')
             creator_id = party_data.get('created_by')
             full_party_id = party_data['id']
+            ctx.party_id = full_party_id
             
             # Delete party
-            success = party_ops.delete_party(full_party_id)
+            success = await ctx.storage(party_ops.delete_party, full_party_id)
             
             if success:
                 embed = discord.Embed(
@@ -102,14 +116,74 @@ class AdminCommands(commands.Cog):
                 embed.add_field(name="Original Creator", value=f"<@{creator_id}>", inline=True)
                 embed.set_footer(text=f"Deleted by Admin {interaction.user.display_name}")
                 
-                await interaction.response.send_message(embed=embed)
-                print(f"🗑️ Admin {interaction.user.display_name} deleted party {full_party_id} ({party_name})")
+                await ctx.send(embed=embed)
+                logger.info("🗑️ Admin %s deleted party %s (%s)", interaction.user.display_name, full_party_id, party_name)
+            else:
+                await ctx.send("❌ Failed to delete party!", ephemeral=True)
+            
+        except Exception as e:
+            logger.error("❌ Error in admin_delete_party: %s", e)
+            await ctx.send("❌ Failed to delete party!", ephemeral=True)
+    
+    @app_commands.command(name="admin-cluster-stats", description="🧩 Admin: View shard and process stats for every cluster")
+    @interaction_pipeline('command.admin_cluster_stats', ephemeral=True)
+    async def admin_cluster_stats(self, interaction: discord.Interaction):
+        """View per-cluster shard, guild, latency and memory stats (Admin only)"""
+        ctx = get_context(interaction)
+        try:
+            # Check if user has administrator permissions
+            if not interaction.permissions.administrator:
+                await ctx.send("❌ **Admin Only** - You need Administrator permissions to use this command.", ephemeral=True)
+                return
+            
+            # In cluster mode ask every process over IPC, otherwise report this process only
+            cluster = getattr(self.bot, 'cluster', None)
+            if cluster is not None:
+                stats = await cluster.broadcast('stats')
             else:
-                await interaction.response.send_message("❌ Failed to delete party!", ephemeral=True)
+                stats = [collect_process_stats(self.bot)]
+            
+            embed = format_cluster_stats_embed(stats)
+            embed.set_footer(text=f"Generated by {interaction.user.display_name}")
+            
+            await ctx.send(embed=embed, ephemeral=True)
+        
+        except Exception as e:
+            logger.error("❌ Error in admin_cluster_stats: %s", e)
+            await ctx.send("❌ Failed to get cluster statistics!", ephemeral=True)
+
+    @app_commands.command(name="admin-profile", description="🔬 Admin: Profile CPU or memory for a few seconds")
+    @app_commands.describe(mode="What to profile", seconds=f"How long to profile (max {profiler.max_seconds}s)")
+    @app_commands.choices(mode=[
+        app_commands.Choice(name="CPU (cProfile)", value="cpu"),
+        app_commands.Choice(name="Memory (tracemalloc)", value="memory")
+    ])
+    @interaction_pipeline('command.admin_profile', ephemeral=True, lane='admin')
+    async def admin_profile(self, interaction: discord.Interaction, mode: str = 'cpu', seconds: int = 10):
+        """Profile this process and upload the report as a file (Admin only)"""
+        ctx = get_context(interaction)
+        try:
+            # Check if user has administrator permissions
+            if not interaction.permissions.administrator:
+                await ctx.send("❌ **Admin Only** - You need Administrator permissions to use this command.", ephemeral=True)
+                return
+            
+            if profiler.running is not None:
+                await ctx.send(f"⏳ A {profiler.running} profile is already running, try again shortly.", ephemeral=True)
+                return
+            
+            seconds = profiler.clamp(seconds)
+            await ctx.send(f"🔬 Profiling **{mode}** for {seconds}s...", ephemeral=True)
+            result = await profiler.run(mode, seconds)
             
+            report = discord.File(io.BytesIO(result.report.encode('utf-8')), filename=result.filename)
+            await ctx.send(f"🔬 **{mode.upper()} profile** - {result.summary}", file=report, ephemeral=True)
+        
+        except ProfileBusy as e:
+            await ctx.send(f"⏳ {e}, try again shortly.", ephemeral=True)
         except Exception as e:
-            print(f"❌ Error in admin_delete_party: {e}")
-            await interaction.response.send_message("❌ Failed to delete party!", ephemeral=True)
+            logger.error("❌ Error in admin_profile: %s", e)
+            await ctx.send("❌ Failed to run the profile!", ephemeral=True)
 
 async def setup(bot):
     """Setup function for the cog"""
@@ -1,13 +1,17 @@
 """
 Party-related slash commands
 """
+import logging
 import discord
 from discord import app_commands
 from discord.ext import commands
 from database.party_operations import party_ops
 from ui.views import PartyView
-from utils.helpers import parse_time_string, format_party_embed, format_party_list_embed
+from utils.helpers import parse_time_string, format_party_embed, format_party_list_embed, get_guild_name
 from config.settings import EMBED_COLOR
+from utils.interactions import interaction_pipeline, get_context
+
+logger = logging.getLogger(__name__)
 
 class PartyCommands(commands.Cog):
     """Party management commands"""
@@ -21,29 +25,33 @@ class PartyCommands(commands.Cog):
         starttime="When does the party start? Use your timezone (e.g. 'Tomorrow 7PM UTC+3', 'Friday 8PM UTC-5')",
         ping="Optional: Who to ping (e.g. @everyone, @Raiders, @PvP Team)"
     )
+    @interaction_pipeline('command.create_party')
     async def create_party(self, interaction: discord.Interaction, name: str, starttime: str, ping: str = None):
         """Create a new party"""
+        ctx = get_context(interaction)
         try:
             # Parse the time and convert to Discord timestamp if possible
-            parsed_timestamp = parse_time_string(starttime)
+            parsed_timestamp = parse_time_string(starttime, interaction.guild_id)
             
             # Create party in database
-            party_id = party_ops.create_party(
-                guild_id=interaction.guild.id,
-                channel_id=interaction.channel.id,
+            party_id = await ctx.storage(
+                party_ops.create_party,
+                guild_id=interaction.guild_id,
+                channel_id=interaction.channel_id,
                 party_name=name,
                 party_timestamp=parsed_timestamp,
                 created_by=interaction.user.id
             )
             
             if not party_id:
-                await interaction.response.send_message("❌ Failed to create party!", ephemeral=True)
+                await ctx.send("❌ Failed to create party!", ephemeral=True)
                 return
+            ctx.party_id = party_id
             
             # Get the created party data for embed
-            party_data = party_ops.get_party(party_id)
+            party_data = await ctx.storage(party_ops.get_party, party_id)
             if not party_data:
-                await interaction.response.send_message("❌ Failed to retrieve party data!", ephemeral=True)
+                await ctx.send("❌ Failed to retrieve party data!", ephemeral=True)
                 return
             
             # Create embed
@@ -53,42 +61,43 @@ class PartyCommands(commands.Cog):
             view = PartyView(party_id, interaction.user.id)
             
             # Send message with optional ping text
-            await interaction.response.send_message(content=ping, embed=embed, view=view)
+            message = await ctx.send(content=ping, embed=embed, view=view, fetch=True)
             
             # Save message ID
-            message = await interaction.original_response()
-            party_ops.update_message_id(party_id, message.id)
+            await ctx.storage(party_ops.update_message_id, party_id, message.id)
             
             ping_info = f" with ping: {ping}" if ping else ""
-            print(f"✅ Party created: {name} at {starttime}{ping_info}")
+            logger.info("✅ Party created: %s at %s%s", name, starttime, ping_info, extra={'party_id': party_id})
             
         except Exception as e:
-            print(f"❌ Error creating party: {e}")
-            await interaction.response.send_message("❌ Failed to create party!", ephemeral=True)
+            logger.error("❌ Error creating party: %s", e)
+            await ctx.send("❌ Failed to create party!", ephemeral=True)
     
     @app_commands.command(name="parties", description="List all parties")
+    @interaction_pipeline('command.list_parties')
     async def list_parties(self, interaction: discord.Interaction):
         """List all parties in the server"""
+        ctx = get_context(interaction)
         try:
-            print(f"🔍 User {interaction.user.display_name} requested parties for guild {interaction.guild.id}")
+            logger.debug("🔍 User %s requested parties for guild %s", interaction.user.display_name, interaction.guild_id)
             
             # Get all parties for this guild
-            party_list = party_ops.get_guild_parties(interaction.guild.id)
+            party_list = await ctx.storage(party_ops.get_guild_parties, interaction.guild_id)
             
-            print(f"📊 Query returned {len(party_list)} parties")
+            logger.debug("📊 Query returned %d parties", len(party_list))
             
             if not party_list:
-                await interaction.response.send_message("📭 No parties found!\n\n*If you just created a party, try the `/admin-debug-db` command to check the database.*", ephemeral=True)
+                await ctx.send("📭 No parties found!\n\n*If you just created a party, try the `/admin-debug-db` command to check the database.*", ephemeral=True)
                 return
             
             # Create embed
-            embed = format_party_list_embed(party_list, interaction.guild.name)
+            embed = format_party_list_embed(party_list, get_guild_name(interaction))
             
-            await interaction.response.send_message(embed=embed)
+            await ctx.send(embed=embed)
             
         except Exception as e:
-            print(f"❌ Error listing parties: {e}")
-            await interaction.response.send_message("❌ Failed to list parties! Try `/admin-debug-db` to check the database.", ephemeral=True)
+            logger.error("❌ Error listing parties: %s", e)
+            await ctx.send("❌ Failed to list parties! Try `/admin-debug-db` to check the database.", ephemeral=True)
 
 async def setup(bot):
     """Setup function for the cog"""
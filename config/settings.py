@@ -12,22 +12,190 @@ load_dotenv()
 DISCORD_TOKEN = os.getenv('DISCORD_TOKEN')
 COMMAND_PREFIX = '!'
 
+# Slash Command Sync
+# COMMAND_SYNC: 'auto' (sync when the command tree hash changed), 'force' or 'off'
+# DEV_GUILD_IDS: comma separated guild ids; when set, commands sync to those guilds only (instant updates).
+# Global commands registered earlier stay registered, so use a separate application for development
+COMMAND_SYNC = os.getenv('COMMAND_SYNC', 'auto').lower()
+DEV_GUILD_IDS = [int(guild_id) for guild_id in os.getenv('DEV_GUILD_IDS', '').split(',') if guild_id.strip().isdigit()]
+
+# Cluster Mode Configuration (python -m cluster)
+# SHARD_COUNT=0 uses Discord's recommended shard count
+CLUSTER_COUNT = int(os.getenv('CLUSTER_COUNT', '2'))
+SHARD_COUNT = int(os.getenv('SHARD_COUNT', '0'))
+IDENTIFY_INTERVAL = float(os.getenv('IDENTIFY_INTERVAL', '5.0'))
+CLUSTER_STARTUP_TIMEOUT = float(os.getenv('CLUSTER_STARTUP_TIMEOUT', '60'))
+
+# HTTP Interactions Mode Configuration (python -m http_interactions)
+# Served on METRICS_HOST:METRICS_PORT next to /metrics; DISCORD_PUBLIC_KEY is the application's hex Ed25519 key
+DISCORD_PUBLIC_KEY = os.getenv('DISCORD_PUBLIC_KEY')
+INTERACTIONS_PATH = os.getenv('INTERACTIONS_PATH', '/interactions')
+INTERACTIONS_MAX_SKEW = float(os.getenv('INTERACTIONS_MAX_SKEW', '300'))
+
 # Firebase Configuration
 FIREBASE_SERVICE_ACCOUNT = os.getenv('FIREBASE_SERVICE_ACCOUNT')
 
+# Leader Election Configuration
+# LEASE_BACKEND: 'firestore' (shared by every replica) or 'memory' (single process / local testing)
+LEASE_BACKEND = os.getenv('LEASE_BACKEND', 'firestore').lower()
+LEASE_COLLECTION = os.getenv('LEASE_COLLECTION', 'leases')
+LEASE_TTL = float(os.getenv('LEASE_TTL', '30'))
+
+# Party Cache Configuration
+# Party documents are cached per process; INVALIDATION_BUS ('none', 'memory' or 'redis') tells the
+# other replicas to drop their copy after a write. PARTY_CACHE_TTL=0 disables the cache.
+PARTY_CACHE_SIZE = int(os.getenv('PARTY_CACHE_SIZE', '2048'))
+PARTY_CACHE_TTL = float(os.getenv('PARTY_CACHE_TTL', '5'))
+# Deleted/archived party ids are remembered so clicks on stale messages skip the storage read
+TOMBSTONE_CACHE_SIZE = int(os.getenv('TOMBSTONE_CACHE_SIZE', '10000'))
+TOMBSTONE_TTL = float(os.getenv('TOMBSTONE_TTL', '86400'))
+INVALIDATION_BUS = os.getenv('INVALIDATION_BUS', 'none').lower()
+INVALIDATION_CHANNEL = os.getenv('INVALIDATION_CHANNEL', 'party-bot:invalidations')
+REDIS_URL = os.getenv('REDIS_URL', 'redis://localhost:6379/0')
+
+# Logging Configuration
+# LOG_LEVELS format: "logger=LEVEL,logger=LEVEL" (e.g. "ui.views=DEBUG,discord=WARNING")
+LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO')
+LOG_LEVELS = os.getenv('LOG_LEVELS', '')
+LOG_FORMAT = os.getenv('LOG_FORMAT', 'text').lower()
+
+# Metrics Server Configuration
+METRICS_ENABLED = os.getenv('METRICS_ENABLED', 'true').lower() == 'true'
+METRICS_HOST = os.getenv('METRICS_HOST', '0.0.0.0')
+METRICS_PORT = int(os.getenv('METRICS_PORT', os.getenv('PORT', '8080')))
+
+# Tracing Configuration
+# TRACE_EXPORTER: 'none', 'file' (JSON lines at TRACE_FILE) or 'otlp' (OTLP/HTTP JSON)
+TRACE_SAMPLE_RATE = float(os.getenv('TRACE_SAMPLE_RATE', '0'))
+TRACE_EXPORTER = os.getenv('TRACE_EXPORTER', 'none').lower()
+TRACE_FILE = os.getenv('TRACE_FILE', 'traces.jsonl')
+TRACE_OTLP_ENDPOINT = os.getenv('TRACE_OTLP_ENDPOINT', 'http://localhost:4318/v1/traces')
+TRACE_SERVICE_NAME = os.getenv('TRACE_SERVICE_NAME', 'party-bot')
+
+# Interaction Recording (opt-in)
+# Each process appends one anonymized line per handled interaction to its own file, named after
+# RECORD_FILE plus start time and pid (e.g. interactions-20260101-120000-42.trace), for replay.py.
+# Ids are replaced by keyed hashes; set RECORD_SALT to correlate ids across restarts.
+RECORD_INTERACTIONS = os.getenv('RECORD_INTERACTIONS', 'false').lower() == 'true'
+RECORD_FILE = os.getenv('RECORD_FILE', 'interactions.trace')
+RECORD_SALT = os.getenv('RECORD_SALT', '')
+
+# On-demand Profiling
+# /admin-profile and GET /debug/profile on the metrics server; the route answers loopback
+# clients only, or any client sending PROFILE_TOKEN in the X-Profile-Token header
+PROFILE_MAX_SECONDS = int(os.getenv('PROFILE_MAX_SECONDS', '60'))
+PROFILE_TOP_N = int(os.getenv('PROFILE_TOP_N', '40'))
+PROFILE_TOKEN = os.getenv('PROFILE_TOKEN', '')
+
+# Event Loop Watchdog
+# A heartbeat task measures scheduling lag every WATCHDOG_INTERVAL seconds; when the loop is
+# blocked for WATCHDOG_THRESHOLD seconds a helper thread captures the blocking stack
+WATCHDOG_ENABLED = os.getenv('WATCHDOG_ENABLED', 'true').lower() == 'true'
+WATCHDOG_INTERVAL = float(os.getenv('WATCHDOG_INTERVAL', '0.1'))
+WATCHDOG_THRESHOLD = float(os.getenv('WATCHDOG_THRESHOLD', '0.25'))
+
+# Gateway Profile
+# BOT_PROFILE: 'standard' (default intents plus members/message content, full caches) or
+# 'lean' (guild events only, no member cache or chunking, small message cache)
+BOT_PROFILE = os.getenv('BOT_PROFILE', 'standard').lower()
+LEAN_MAX_MESSAGES = int(os.getenv('LEAN_MAX_MESSAGES', '100'))
+
 # Discord Intents
-def get_bot_intents():
+def get_bot_intents(profile: str = BOT_PROFILE):
     """Configure and return Discord intents"""
+    if profile == 'lean':
+        # Cogs only read interaction payloads; guild events keep channels and guild joins/leaves
+        intents = discord.Intents.none()
+        intents.guilds = True
+        return intents
+    
     intents = discord.Intents.default()
     intents.message_content = True
     intents.guilds = True
     intents.members = True
     return intents
 
+def get_cache_options(profile: str = BOT_PROFILE) -> dict:
+    """Client cache keyword arguments for the profile"""
+    if profile == 'lean':
+        return {
+            'member_cache_flags': discord.MemberCacheFlags.none(),
+            'chunk_guilds_at_startup': False,
+            'max_messages': LEAN_MAX_MESSAGES
+        }
+    return {}
+
+# Time Zone Configuration
+# GUILD_TIMEZONES format: "guild_id:zone,guild_id:zone" (e.g. "1234:UTC+3,5678:Europe/Berlin")
+DEFAULT_TIMEZONE = os.getenv('DEFAULT_TIMEZONE', 'UTC')
+
+def _parse_guild_timezones(raw: str) -> dict:
+    """Parse the GUILD_TIMEZONES environment variable into a {guild_id: zone} dict"""
+    zones = {}
+    for entry in raw.split(','):
+        guild_id, _, zone = entry.strip().partition(':')
+        if guild_id.strip().isdigit() and zone.strip():
+            zones[int(guild_id)] = zone.strip()
+    return zones
+
+GUILD_TIMEZONES = _parse_guild_timezones(os.getenv('GUILD_TIMEZONES', ''))
+
+# Interaction Pipeline Configuration (seconds)
+# Handlers whose expected backend time exceeds the budget defer before doing any work;
+# all others defer automatically if they have not responded by the deadline.
+INTERACTION_DEFER_BUDGET = float(os.getenv('INTERACTION_DEFER_BUDGET', '1.0'))
+INTERACTION_DEFER_DEADLINE = float(os.getenv('INTERACTION_DEFER_DEADLINE', '2.0'))
+STORAGE_CALL_TIMEOUT = float(os.getenv('STORAGE_CALL_TIMEOUT', '5.0'))
+
+# Backend Work Scheduling
+# Storage and REST work runs in priority lanes (interactive > admin > background), round robin
+# between guilds within a lane. WORK_LANE_LIMITS format: "lane=N,lane=N"
+WORK_CONCURRENCY = int(os.getenv('WORK_CONCURRENCY', '16'))
+WORK_LANE_LIMITS = os.getenv('WORK_LANE_LIMITS', 'interactive=16,admin=2,background=4')
+
+# Click Admission Control
+# Each user gets CLICK_BURST clicks per party, refilled at CLICK_RATE per second
+CLICK_RATE = float(os.getenv('CLICK_RATE', '0.5'))
+CLICK_BURST = int(os.getenv('CLICK_BURST', '3'))
+
+# Party Scheduler Configuration
+# Members get a DM REMINDER_LEAD_MINUTES before a party starts; signups lock at the start time.
+# The leader reloads events due within the next 2 * SCHEDULER_REFRESH seconds every SCHEDULER_REFRESH seconds.
+REMINDER_LEAD_MINUTES = float(os.getenv('REMINDER_LEAD_MINUTES', '15'))
+SCHEDULER_REFRESH = float(os.getenv('SCHEDULER_REFRESH', '60'))
+DM_CONCURRENCY = int(os.getenv('DM_CONCURRENCY', '5'))
+
+# Archival Configuration
+# Parties whose start time is more than ARCHIVE_GRACE_HOURS in the past are moved to ARCHIVE_COLLECTION.
+# Archived documents get an expire_at field; enable a Firestore TTL policy on it to delete them after
+# ARCHIVE_RETENTION_DAYS.
+ARCHIVE_COLLECTION = os.getenv('ARCHIVE_COLLECTION', 'parties_archive')
+ARCHIVE_GRACE_HOURS = float(os.getenv('ARCHIVE_GRACE_HOURS', '6'))
+ARCHIVE_RETENTION_DAYS = float(os.getenv('ARCHIVE_RETENTION_DAYS', '30'))
+ARCHIVE_SWEEP_INTERVAL = float(os.getenv('ARCHIVE_SWEEP_INTERVAL', '600'))
+# Parties read and archived per step (archive_parties splits them into Firestore-sized write batches)
+ARCHIVE_BATCH_SIZE = int(os.getenv('ARCHIVE_BATCH_SIZE', '200'))
+# Each process reloads the set of posted party message ids this often, so chat message deletes
+# are matched locally instead of querying Firestore for every deleted message
+PARTY_MESSAGE_REFRESH = float(os.getenv('PARTY_MESSAGE_REFRESH', '900'))
+
+# Schema Migrations (python -m migrations)
+# Documents are read and written in pages of MIGRATION_PAGE_SIZE (max 500, one write batch per page);
+# MIGRATION_RATE caps documents per second (0 = unthrottled)
+MIGRATION_PAGE_SIZE = min(500, int(os.getenv('MIGRATION_PAGE_SIZE', '200')))
+MIGRATION_RATE = float(os.getenv('MIGRATION_RATE', '0'))
+
+# Startup Configuration
+# Warn when module imports take longer than this many seconds
+IMPORT_TIME_BUDGET = float(os.getenv('IMPORT_TIME_BUDGET', '1.5'))
+WARMUP_STORAGE = os.getenv('WARMUP_STORAGE', 'true').lower() == 'true'
+
 # Party Configuration Constants
 DEFAULT_TANK_SLOTS = 2
 DEFAULT_HEALER_SLOTS = 2
 DEFAULT_DPS_SLOTS = 4
+# Users a full role can queue before further clicks are turned away
+WAITLIST_SIZE = int(os.getenv('WAITLIST_SIZE', '25'))
 
 # Embed Colors
 EMBED_COLOR = 0x5865F2
@@ -37,4 +205,7 @@ SUCCESS_COLOR = 0x57F287
 # Validation Constants
 MAX_PARTY_NAME_LENGTH = 50
 MAX_STARTTIME_LENGTH = 100
-MAX_SLOT_VALUE = 99
\ No newline at end of file
+MAX_SLOT_VALUE = 99
+
+# Cache Sizes
+TIME_PARSE_CACHE_SIZE = 1024
\ No newline at end of file
@@ -0,0 +1,94 @@
+"""
+Small bot-wide state documents (e.g. the hash of the last synced command tree)
+"""
+import logging
+from typing import Dict, Optional
+from database.firebase_client import get_firestore
+from monitoring.metrics import timed_operation, record_firestore_error
+
+logger = logging.getLogger(__name__)
+
+class BotStateOperations:
+    """Reads and writes documents in the bot_state collection"""
+    
+    def __init__(self, collection: str = 'bot_state'):
+        self.collection = collection
+        self._db = None
+    
+    @property
+    def db(self):
+        """Get database client with lazy initialization"""
+        if self._db is None:
+            from database.firebase_client import get_db
+            self._db = get_db()
+        return self._db
+    
+    @timed_operation('get_command_hash')
+    def get_command_hash(self, application_id: int, scope: str) -> Optional[str]:
+        """Hash of the command tree last synced for scope ('global' or a guild id)"""
+        try:
+            doc = self.db.collection(self.collection).document(f'commands_{application_id}').get()
+            return (doc.to_dict() or {}).get(scope) if doc.exists else None
+        except Exception as e:
+            record_firestore_error('get_command_hash')
+            logger.error("❌ Error getting command hash: %s", e)
+            return None
+    
+    @timed_operation('set_command_hash')
+    def set_command_hash(self, application_id: int, scope: str, digest: str) -> bool:
+        """Remember the hash of the command tree just synced for scope"""
+        try:
+            self.db.collection(self.collection).document(f'commands_{application_id}').set(
+                {scope: digest, 'updated_at': get_firestore().SERVER_TIMESTAMP}, merge=True)
+            return True
+        except Exception as e:
+            record_firestore_error('set_command_hash')
+            logger.error("❌ Error saving command hash: %s", e)
+            return False
+
+    @timed_operation('get_migration_state')
+    def get_migration_state(self, version: int) -> Dict:
+        """Checkpoint of a schema migration (empty if it never ran)"""
+        try:
+            doc = self.db.collection(self.collection).document(f'migration_{version:04d}').get()
+            return (doc.to_dict() or {}) if doc.exists else {}
+        except Exception as e:
+            record_firestore_error('get_migration_state')
+            logger.error("❌ Error getting migration state: %s", e)
+            raise
+    
+    @timed_operation('save_migration_state')
+    def save_migration_state(self, version: int, state: Dict):
+        """Persist a schema migration checkpoint"""
+        try:
+            self.db.collection(self.collection).document(f'migration_{version:04d}').set(
+                {**state, 'updated_at': get_firestore().SERVER_TIMESTAMP}, merge=True)
+        except Exception as e:
+            record_firestore_error('save_migration_state')
+            logger.error("❌ Error saving migration state: %s", e)
+            raise
+    
+    @timed_operation('get_schema_version')
+    def get_schema_version(self) -> int:
+        """Version of the last schema migration that completed"""
+        try:
+            doc = self.db.collection(self.collection).document('schema').get()
+            return (doc.to_dict() or {}).get('version', 0) if doc.exists else 0
+        except Exception as e:
+            record_firestore_error('get_schema_version')
+            logger.error("❌ Error getting schema version: %s", e)
+            raise
+    
+    @timed_operation('set_schema_version')
+    def set_schema_version(self, version: int):
+        """Record that every migration up to version has completed"""
+        try:
+            self.db.collection(self.collection).document('schema').set(
+                {'version': version, 'updated_at': get_firestore().SERVER_TIMESTAMP}, merge=True)
+        except Exception as e:
+            record_firestore_error('set_schema_version')
+            logger.error("❌ Error saving schema version: %s", e)
+            raise
+
+# Global instance
+bot_state = BotStateOperations()
@@ -1,11 +1,15 @@
 """
 Firebase client initialization and management
 """
+import logging
 import json
-import firebase_admin
-from firebase_admin import credentials, firestore
+import threading
 from config.settings import FIREBASE_SERVICE_ACCOUNT
 
+logger = logging.getLogger(__name__)
+
+_init_lock = threading.Lock()
+
 class FirebaseClient:
     """Firebase client singleton"""
     _instance = None
@@ -20,13 +24,24 @@ class FirebaseClient:
         """Initialize Firebase connection"""
         if self._db is not None:
             return self._db
-            
+        
+        # Storage calls run in worker threads, so guard against concurrent first use
+        with _init_lock:
+            if self._db is not None:
+                return self._db
+            return self._initialize()
+    
+    def _initialize(self):
+        """Create the Firestore client (caller holds _init_lock)"""
+        # firebase-admin and the Firestore/gRPC stack take seconds to import, so load them on first use
+        import firebase_admin
+        from firebase_admin import credentials, firestore
         try:
             # Check if app is already initialized
             try:
                 firebase_admin.get_app()
                 self._db = firestore.client()
-                print("✅ Firebase already initialized!")
+                logger.info("✅ Firebase already initialized!")
                 return self._db
             except ValueError:
                 # App not initialized, initialize it
@@ -35,13 +50,23 @@ class FirebaseClient:
                 firebase_admin.initialize_app(cred)
                 
                 self._db = firestore.client()
-                print("✅ Firebase initialized!")
+                logger.info("✅ Firebase initialized!")
                 return self._db
                 
         except Exception as e:
-            print(f"❌ Firebase initialization failed: {e}")
+            logger.error("❌ Firebase initialization failed: %s", e)
             raise e
     
+    def warm_up(self):
+        """Create the client and make one small read so the gRPC channel is connected"""
+        db = self.initialize()
+        db.collection('parties').limit(1).get()
+    
+    @property
+    def is_initialized(self) -> bool:
+        """Whether the Firestore client has been created"""
+        return self._db is not None
+    
     @property
     def db(self):
         """Get the database client"""
@@ -52,6 +77,11 @@ class FirebaseClient:
 # Global instance
 firebase_client = FirebaseClient()
 
+def get_firestore():
+    """The firebase_admin.firestore module (sentinels, transactions), imported on first use"""
+    from firebase_admin import firestore
+    return firestore
+
 def get_db():
     """Get the Firebase database client"""
     return firebase_client.initialize()  # Call initialize() directly to ensure connection
\ No newline at end of file
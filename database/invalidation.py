@@ -0,0 +1,132 @@
+"""
+Cache invalidation bus shared by bot replicas
+
+After a write, PartyOperations drops its own cached copy of the party and
+publishes the party id; every other replica subscribed to the bus drops theirs.
+Messages carry the publish time so receivers can report propagation lag.
+"""
+import os
+import json
+import time
+import uuid
+import logging
+import threading
+from typing import Callable, Dict, List
+from config.settings import INVALIDATION_BUS, INVALIDATION_CHANNEL, REDIS_URL
+from monitoring.metrics import registry
+
+logger = logging.getLogger(__name__)
+
+INVALIDATIONS_PUBLISHED = registry.counter(
+    "party_bot_invalidations_published_total", "Party invalidations published to other replicas", ["bus"])
+INVALIDATIONS_RECEIVED = registry.counter(
+    "party_bot_invalidations_received_total", "Party invalidations received from other replicas", ["bus"])
+INVALIDATION_LAG = registry.histogram(
+    "party_bot_invalidation_lag_seconds", "Time from publishing an invalidation to applying it on another replica",
+    ["bus"], buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5))
+
+Subscriber = Callable[[str, bool], None]
+
+class InvalidationBus:
+    """Base bus: publishes nothing and delivers nothing (single replica)"""
+    name = 'none'
+    
+    def __init__(self):
+        self.origin = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        self._subscribers: List[Subscriber] = []
+    
+    def subscribe(self, callback: Subscriber):
+        """Call callback(party_id, deleted) for invalidations published by other replicas"""
+        self._subscribers.append(callback)
+    
+    def publish(self, party_id: str, deleted: bool = False):
+        pass
+    
+    def close(self):
+        pass
+    
+    def _encode(self, party_id: str, deleted: bool) -> str:
+        return json.dumps({'party_id': party_id, 'deleted': deleted, 'origin': self.origin, 'sent_at': time.time()})
+    
+    def _deliver(self, raw):
+        """Apply a message from the bus, skipping our own"""
+        try:
+            message = json.loads(raw)
+        except (TypeError, ValueError):
+            logger.warning("Dropping malformed invalidation: %r", raw)
+            return
+        if message.get('origin') == self.origin:
+            return
+        INVALIDATIONS_RECEIVED.labels(bus=self.name).inc()
+        INVALIDATION_LAG.labels(bus=self.name).observe(max(0.0, time.time() - message.get('sent_at', time.time())))
+        for callback in self._subscribers:
+            try:
+                callback(message['party_id'], message.get('deleted', False))
+            except Exception as e:
+                logger.error("❌ Invalidation subscriber failed: %s", e)
+
+class InProcessBus(InvalidationBus):
+    """Stand-in for Redis: buses created with the same channel in this process see each other"""
+    name = 'memory'
+    _channels: Dict[str, List['InProcessBus']] = {}
+    _lock = threading.Lock()
+    
+    def __init__(self, channel: str = INVALIDATION_CHANNEL):
+        super().__init__()
+        self.channel = channel
+        with self._lock:
+            self._channels.setdefault(channel, []).append(self)
+    
+    def publish(self, party_id: str, deleted: bool = False):
+        raw = self._encode(party_id, deleted)
+        INVALIDATIONS_PUBLISHED.labels(bus=self.name).inc()
+        with self._lock:
+            peers = list(self._channels.get(self.channel, []))
+        for peer in peers:
+            peer._deliver(raw)
+    
+    def close(self):
+        with self._lock:
+            peers = self._channels.get(self.channel, [])
+            if self in peers:
+                peers.remove(self)
+
+class RedisBus(InvalidationBus):
+    """Redis pub/sub bus; the subscription is drained by a background thread"""
+    name = 'redis'
+    
+    def __init__(self, url: str = REDIS_URL, channel: str = INVALIDATION_CHANNEL):
+        super().__init__()
+        import redis
+        self.channel = channel
+        self._client = redis.Redis.from_url(url)
+        self._pubsub = self._client.pubsub(ignore_subscribe_messages=True)
+        self._pubsub.subscribe(**{channel: lambda message: self._deliver(message['data'])})
+        self._thread = self._pubsub.run_in_thread(sleep_time=1.0, daemon=True)
+        logger.info("📡 Subscribed to invalidations on %s", channel)
+    
+    def publish(self, party_id: str, deleted: bool = False):
+        try:
+            self._client.publish(self.channel, self._encode(party_id, deleted))
+            INVALIDATIONS_PUBLISHED.labels(bus=self.name).inc()
+        except Exception as e:
+            # Other replicas fall back to the cache TTL
+            logger.warning("Failed to publish invalidation for %s: %s", party_id, e)
+    
+    def close(self):
+        self._thread.stop()
+        self._pubsub.close()
+        self._client.close()
+
+def create_invalidation_bus(backend: str = INVALIDATION_BUS) -> InvalidationBus:
+    """Bus for the configured backend"""
+    if backend == 'redis':
+        try:
+            return RedisBus()
+        except Exception as e:
+            # Without the bus other replicas' copies expire after PARTY_CACHE_TTL
+            logger.error("❌ Failed to connect invalidation bus, falling back to cache TTL only: %s", e)
+            return InvalidationBus()
+    if backend == 'memory':
+        return InProcessBus()
+    return InvalidationBus()
@@ -0,0 +1,191 @@
+"""
+Lease documents for leader election between bot replicas
+
+A lease names a piece of work (e.g. "restore_views") and records which replica
+holds it, until when, and a fencing token. The token increases every time the
+lease changes hands, so work started under an old token can be told apart from
+work by the current holder even if the old holder has not noticed it lost the lease.
+"""
+import time
+import logging
+import threading
+from typing import Dict, Optional
+from database.firebase_client import get_firestore
+from config.settings import LEASE_BACKEND, LEASE_COLLECTION
+from monitoring.metrics import timed_operation, record_firestore_error
+
+logger = logging.getLogger(__name__)
+
+class Lease:
+    """A lease held by this replica"""
+    
+    def __init__(self, name: str, holder: str, token: int, expires_at: float):
+        self.name = name
+        self.holder = holder
+        self.token = token
+        self.expires_at = expires_at
+    
+    @property
+    def valid(self) -> bool:
+        """Locally known to be unexpired (the store has the final word, see validate)"""
+        return time.time() < self.expires_at
+    
+    def __repr__(self) -> str:
+        return f"Lease({self.name!r}, holder={self.holder!r}, token={self.token})"
+
+def _grant(name: str, current: Dict, holder: str, ttl: float, now: float) -> Optional[Lease]:
+    """Decide an acquisition against the stored lease state; None if someone else holds it"""
+    current_holder = current.get('holder')
+    live = current.get('expires_at', 0) > now
+    if live and current_holder != holder:
+        return None
+    token = current.get('token', 0)
+    if not (live and current_holder == holder):
+        token += 1
+    return Lease(name, holder, token, now + ttl)
+
+def _owns(current: Dict, lease: Lease, now: float) -> bool:
+    return (current.get('holder') == lease.holder and current.get('token') == lease.token
+            and current.get('expires_at', 0) > now)
+
+class InMemoryLeaseStore:
+    """Process-local lease store for tests and single-process runs"""
+    
+    def __init__(self):
+        self._leases: Dict[str, Dict] = {}
+        self._lock = threading.Lock()
+    
+    def acquire(self, name: str, holder: str, ttl: float) -> Optional[Lease]:
+        with self._lock:
+            lease = _grant(name, self._leases.get(name, {}), holder, ttl, time.time())
+            if lease is not None:
+                self._leases[name] = {'holder': holder, 'token': lease.token, 'expires_at': lease.expires_at}
+            return lease
+    
+    def renew(self, lease: Lease, ttl: float) -> Optional[Lease]:
+        with self._lock:
+            now = time.time()
+            current = self._leases.get(lease.name, {})
+            if not _owns(current, lease, now):
+                return None
+            current['expires_at'] = lease.expires_at = now + ttl
+            return lease
+    
+    def release(self, lease: Lease) -> bool:
+        with self._lock:
+            current = self._leases.get(lease.name, {})
+            if not _owns(current, lease, time.time()):
+                return False
+            current['expires_at'] = 0
+            return True
+    
+    def validate(self, name: str, token: int) -> bool:
+        """Fencing check: token is the current, unexpired token of the lease"""
+        with self._lock:
+            current = self._leases.get(name, {})
+            return current.get('token') == token and current.get('expires_at', 0) > time.time()
+
+class FirestoreLeaseStore:
+    """Leases stored as documents in the party database, updated in transactions"""
+    
+    def __init__(self, collection: str = LEASE_COLLECTION):
+        self.collection = collection
+        self._db = None
+    
+    @property
+    def db(self):
+        """Get database client with lazy initialization"""
+        if self._db is None:
+            from database.firebase_client import get_db
+            self._db = get_db()
+        return self._db
+    
+    def _ref(self, name: str):
+        return self.db.collection(self.collection).document(name)
+    
+    @timed_operation('acquire_lease')
+    def acquire(self, name: str, holder: str, ttl: float) -> Optional[Lease]:
+        """Take the lease; None if another holder owns it. Storage errors propagate so callers can retry"""
+        ref = self._ref(name)
+        firestore = get_firestore()
+        
+        @firestore.transactional
+        def attempt(transaction):
+            snapshot = ref.get(transaction=transaction)
+            current = (snapshot.to_dict() or {}) if snapshot.exists else {}
+            lease = _grant(name, current, holder, ttl, time.time())
+            if lease is not None:
+                transaction.set(ref, {
+                    'holder': holder,
+                    'token': lease.token,
+                    'expires_at': lease.expires_at,
+                    'updated_at': firestore.SERVER_TIMESTAMP
+                })
+            return lease
+        
+        try:
+            return attempt(self.db.transaction())
+        except Exception as e:
+            record_firestore_error('acquire_lease')
+            logger.error("❌ Error acquiring lease %s: %s", name, e)
+            raise
+    
+    @timed_operation('renew_lease')
+    def renew(self, lease: Lease, ttl: float) -> Optional[Lease]:
+        """Extend a held lease; None if it was lost. Storage errors propagate so callers can retry"""
+        ref = self._ref(lease.name)
+        firestore = get_firestore()
+        
+        @firestore.transactional
+        def attempt(transaction):
+            snapshot = ref.get(transaction=transaction)
+            now = time.time()
+            if not snapshot.exists or not _owns(snapshot.to_dict(), lease, now):
+                return None
+            transaction.update(ref, {'expires_at': now + ttl, 'updated_at': firestore.SERVER_TIMESTAMP})
+            lease.expires_at = now + ttl
+            return lease
+        
+        try:
+            return attempt(self.db.transaction())
+        except Exception:
+            record_firestore_error('renew_lease')
+            raise
+    
+    @timed_operation('release_lease')
+    def release(self, lease: Lease) -> bool:
+        ref = self._ref(lease.name)
+        firestore = get_firestore()
+        
+        @firestore.transactional
+        def attempt(transaction):
+            snapshot = ref.get(transaction=transaction)
+            if not snapshot.exists or not _owns(snapshot.to_dict(), lease, time.time()):
+                return False
+            transaction.update(ref, {'expires_at': 0, 'updated_at': firestore.SERVER_TIMESTAMP})
+            return True
+        
+        try:
+            return attempt(self.db.transaction())
+        except Exception as e:
+            record_firestore_error('release_lease')
+            logger.error("❌ Error releasing lease %s: %s", lease.name, e)
+            return False
+    
+    @timed_operation('validate_lease')
+    def validate(self, name: str, token: int) -> bool:
+        """Fencing check: token is the current, unexpired token of the lease"""
+        try:
+            snapshot = self._ref(name).get()
+            current = snapshot.to_dict() if snapshot.exists else {}
+            return current.get('token') == token and current.get('expires_at', 0) > time.time()
+        except Exception as e:
+            record_firestore_error('validate_lease')
+            logger.error("❌ Error validating lease %s: %s", name, e)
+            return False
+
+def create_lease_store(backend: str = LEASE_BACKEND):
+    """Lease store for the configured backend"""
+    if backend == 'memory':
+        return InMemoryLeaseStore()
+    return FirestoreLeaseStore()
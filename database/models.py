@@ -0,0 +1,149 @@
+"""
+Typed party model, parsed once from a Firestore document
+
+Consumers read slot counts, member ids and per-role lists from the model instead of
+re-applying defaults, converting ids and re-bucketing members on every render.
+"""
+from typing import Any, Dict, List, Optional, Tuple, Union
+from config.settings import DEFAULT_TANK_SLOTS, DEFAULT_HEALER_SLOTS, DEFAULT_DPS_SLOTS
+
+ROLES = ('tank', 'healer', 'dps', 'cant_attend')
+SLOT_ROLES = ('tank', 'healer', 'dps')
+
+class Member:
+    """One signed-up member (or waitlist entry, joined_at then being the time queued)"""
+    
+    __slots__ = ('user_id', 'username', 'role', 'joined_at')
+    
+    def __init__(self, user_id: int, username: str, role: str, joined_at: Any = None):
+        self.user_id = user_id
+        self.username = username
+        self.role = role
+        self.joined_at = joined_at
+    
+    @classmethod
+    def from_dict(cls, user_id: int, data: Dict) -> 'Member':
+        return cls(user_id, data.get('username', 'Unknown'), data.get('role', 'unknown'), data.get('joined_at'))
+    
+    def __repr__(self) -> str:
+        return f"Member({self.user_id}, {self.username!r}, {self.role!r})"
+
+class Party:
+    """A party document with defaults applied and members bucketed by role"""
+    
+    __slots__ = ('id', 'guild_id', 'channel_id', 'message_id', 'name', 'party_timestamp', 'start_ts',
+                 'created_by', 'signups_closed', 'slots', 'members', 'roles', 'waitlist', 'revision')
+    
+    def __init__(self, party_id: str, name: str, party_timestamp: Any = None, created_by: Optional[int] = None,
+                 guild_id: Optional[int] = None, channel_id: Optional[int] = None, message_id: Optional[int] = None,
+                 signups_closed: bool = False, slots: Optional[Dict[str, int]] = None,
+                 members: Optional[List[Member]] = None, waitlist: Optional[Dict[str, List[Member]]] = None,
+                 revision: int = 0):
+        self.id = party_id
+        self.name = name
+        self.guild_id = guild_id
+        self.channel_id = channel_id
+        self.message_id = message_id
+        self.party_timestamp = party_timestamp
+        self.created_by = created_by
+        self.signups_closed = signups_closed
+        # Bumped by every write, so renders of one party can be put in order
+        self.revision = revision
+        self.slots = slots or {'tank': DEFAULT_TANK_SLOTS, 'healer': DEFAULT_HEALER_SLOTS, 'dps': DEFAULT_DPS_SLOTS}
+        
+        # Numeric start time, None when the party has a free-text time
+        try:
+            self.start_ts = int(party_timestamp) if party_timestamp else None
+        except (ValueError, TypeError):
+            self.start_ts = None
+        
+        self.members: Dict[int, Member] = {}
+        self.roles: Dict[str, List[Member]] = {'tank': [], 'healer': [], 'dps': [], 'cant_attend': []}
+        roles = self.roles
+        for member in members or ():
+            self.members[member.user_id] = member
+            bucket = roles.get(member.role)
+            if bucket is not None:
+                bucket.append(member)
+        
+        # Users queued for a full role, in promotion order
+        self.waitlist: Dict[str, List[Member]] = {role: [] for role in SLOT_ROLES}
+        for role, queue in (waitlist or {}).items():
+            if role in self.waitlist:
+                self.waitlist[role] = list(queue)
+    
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'Party':
+        """Parse a party document (as returned by PartyOperations)"""
+        return cls(
+            data.get('id', ''),
+            data.get('party_name', 'Unknown Party'),
+            party_timestamp=data.get('party_timestamp'),
+            created_by=data.get('created_by'),
+            guild_id=data.get('guild_id'),
+            channel_id=data.get('channel_id'),
+            message_id=data.get('message_id'),
+            signups_closed=bool(data.get('signups_closed')),
+            slots={
+                'tank': data.get('tank_slots', DEFAULT_TANK_SLOTS),
+                'healer': data.get('healer_slots', DEFAULT_HEALER_SLOTS),
+                'dps': data.get('dps_slots', DEFAULT_DPS_SLOTS)
+            },
+            members=[Member(int(user_id), member.get('username', 'Unknown'), member.get('role', 'unknown'),
+                            member.get('joined_at')) for user_id, member in data.get('members', {}).items()],
+            waitlist={role: [Member(int(entry['user_id']), entry.get('username', 'Unknown'), role, entry.get('queued_at'))
+                             for entry in queue] for role, queue in (data.get('waitlist') or {}).items()},
+            revision=data.get('revision', 0)
+        )
+    
+    @classmethod
+    def coerce(cls, party: Union['Party', Dict]) -> 'Party':
+        """Accept either a parsed Party or a raw document"""
+        return party if isinstance(party, Party) else cls.from_dict(party)
+    
+    def count(self, role: str) -> int:
+        return len(self.roles.get(role, ()))
+    
+    @property
+    def counts(self) -> Dict[str, int]:
+        """Members per role"""
+        return {role: len(members) for role, members in self.roles.items()}
+    
+    @property
+    def total_members(self) -> int:
+        """Members holding a slot (can't attend is not counted)"""
+        return sum(len(self.roles[role]) for role in SLOT_ROLES)
+    
+    @property
+    def total_slots(self) -> int:
+        return sum(self.slots.values())
+    
+    def is_role_full(self, role: str) -> bool:
+        """Whether a role has no free slot (can't attend never fills up)"""
+        if role == 'cant_attend':
+            return False
+        max_slots = self.slots.get(role, 0)
+        return max_slots == 0 or self.count(role) >= max_slots
+    
+    def member_role(self, user_id: int) -> Optional[str]:
+        member = self.members.get(user_id)
+        return member.role if member else None
+    
+    def queue_length(self, role: str) -> int:
+        return len(self.waitlist.get(role, ()))
+    
+    def queue_position(self, user_id: int) -> Optional[Tuple[str, int]]:
+        """(role, 1-based position) of a queued user, None when not on any waitlist"""
+        for role, queue in self.waitlist.items():
+            for position, entry in enumerate(queue, 1):
+                if entry.user_id == user_id:
+                    return role, position
+        return None
+    
+    @property
+    def creator_name(self) -> str:
+        creator = self.members.get(self.created_by)
+        return creator.username if creator else 'Unknown'
+    
+    def __repr__(self) -> str:
+        return f"Party({self.id!r}, {self.name!r}, members={len(self.members)})"
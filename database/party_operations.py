@@ -1,16 +1,108 @@
 """
 Party database operations
 """
-from typing import Dict, List, Optional, Tuple, Any
-from firebase_admin import firestore
-from database.firebase_client import get_db
-from config.settings import DEFAULT_TANK_SLOTS, DEFAULT_HEALER_SLOTS, DEFAULT_DPS_SLOTS
+import time
+import logging
+import datetime
+import threading
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple, Any
+from database.firebase_client import get_db, get_firestore
+from config.settings import (DEFAULT_TANK_SLOTS, DEFAULT_HEALER_SLOTS, DEFAULT_DPS_SLOTS, PARTY_CACHE_SIZE,
+                             PARTY_CACHE_TTL, ARCHIVE_COLLECTION, REMINDER_LEAD_MINUTES, TOMBSTONE_CACHE_SIZE,
+                             TOMBSTONE_TTL, WAITLIST_SIZE)
+from database.invalidation import InvalidationBus, create_invalidation_bus
+from database.models import Party, SLOT_ROLES
+from monitoring.metrics import registry, timed_operation, record_firestore_error, register_cache
+from utils.cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+WAITLIST_EVENTS = registry.counter(
+    "party_bot_waitlist_events_total", "Waitlist changes by role: queued, promoted into a slot or left the queue",
+    ["role", "event"])
+
+DEFAULT_SLOTS = {'tank': DEFAULT_TANK_SLOTS, 'healer': DEFAULT_HEALER_SLOTS, 'dps': DEFAULT_DPS_SLOTS}
+
+# Firestore rejects write batches with more than this many writes
+BATCH_WRITE_LIMIT = 500
+
+# (outcome, changed fields or None for no write, promoted (user_id, role) pairs)
+SignupChange = Tuple[str, Optional[Dict], List[Tuple[str, str]]]
+
+def schedule_fields(party_timestamp: Any, now: Optional[float] = None) -> Dict:
+    """Scheduler fields for a start time: the reminder time and the next pending event"""
+    now = time.time() if now is None else now
+    if not isinstance(party_timestamp, (int, float)):
+        # Free-text or no start time: no events, and signups (re)open like on a new party
+        return {'reminder_at': None, 'next_event_at': None, 'reminder_sent': False, 'signups_closed': False}
+    if party_timestamp <= now:
+        # Already started: close signups now, the close event will not fire any more
+        return {'reminder_at': None, 'next_event_at': None, 'reminder_sent': True, 'signups_closed': True}
+    reminder_at = int(party_timestamp - REMINDER_LEAD_MINUTES * 60)
+    # Too close to the start for a reminder: the next event is the signup close
+    reminder_due = reminder_at > now
+    return {
+        'reminder_at': reminder_at,
+        'next_event_at': reminder_at if reminder_due else int(party_timestamp),
+        'reminder_sent': not reminder_due,
+        'signups_closed': False
+    }
+
+def _role_count(members: Dict, role: str) -> int:
+    return sum(1 for member in members.values() if member.get('role') == role)
+
+def _unqueue(waitlist: Dict, user_id: str) -> Optional[str]:
+    """Remove a user from every waitlist, returns the role they were queued for"""
+    removed = None
+    for role, queue in waitlist.items():
+        kept = [entry for entry in queue if entry.get('user_id') != user_id]
+        if len(kept) != len(queue):
+            waitlist[role] = kept
+            removed = role
+    return removed
+
+def fill_open_slots(party_data: Dict, joined_at: Any = None) -> List[Tuple[str, str]]:
+    """Move waitlisted users into free slots of party_data (in place), returns promoted (user_id, role)
+    
+    A promoted user who held another slot role frees that slot, so roles are re-checked until
+    nothing moves.
+    """
+    members = party_data.setdefault('members', {})
+    waitlist = party_data.setdefault('waitlist', {})
+    promoted = []
+    moved = True
+    while moved:
+        moved = False
+        for role in SLOT_ROLES:
+            queue = waitlist.get(role) or []
+            limit = party_data.get(f'{role}_slots', DEFAULT_SLOTS[role])
+            while queue and _role_count(members, role) < limit:
+                entry = queue.pop(0)
+                user_id = entry['user_id']
+                previous = members.get(user_id, {}).get('role')
+                members[user_id] = {'username': entry.get('username', 'Unknown'), 'role': role, 'joined_at': joined_at}
+                promoted.append((user_id, role))
+                moved = moved or previous in SLOT_ROLES
+    return promoted
 
 class PartyOperations:
     """Handle all party-related database operations"""
     
     def __init__(self):
         self._db = None
+        self._bus = None
+        self._bus_lock = threading.Lock()
+        self._generation = 0
+        self.cache = TTLCache(PARTY_CACHE_SIZE, PARTY_CACHE_TTL)
+        self.models = TTLCache(PARTY_CACHE_SIZE, PARTY_CACHE_TTL)
+        self.tombstones = TTLCache(TOMBSTONE_CACHE_SIZE, TOMBSTONE_TTL)
+        # Message ids of posted parties (None until loaded); may hold stale ids, which only cost a query
+        self.message_ids: Optional[Set[int]] = None
+        self._recent_message_ids: Set[int] = set()
+        self._message_ids_lock = threading.Lock()
+        register_cache('party', self.cache)
+        register_cache('party_model', self.models)
+        register_cache('party_tombstones', self.tombstones)
     
     @property
     def db(self):
@@ -20,6 +112,116 @@ class PartyOperations:
             self._db = get_db()
         return self._db
     
+    @property
+    def bus(self) -> InvalidationBus:
+        """Get the invalidation bus"""
+        return self.start_invalidation()
+    
+    def start_invalidation(self) -> InvalidationBus:
+        """Subscribe to other replicas' writes (once) and return the bus"""
+        if self._bus is None:
+            with self._bus_lock:
+                if self._bus is None:
+                    bus = create_invalidation_bus()
+                    bus.subscribe(self._drop_cached)
+                    self._bus = bus
+        return self._bus
+    
+    def _drop_cached(self, party_id: str, deleted: bool = False):
+        # Bumping the generation keeps reads that were in flight from re-caching the old document
+        with self._bus_lock:
+            self._generation += 1
+        self.cache.pop(party_id)
+        self.models.pop(party_id)
+        if deleted:
+            self.tombstones.set(party_id, True)
+        else:
+            # Written, so it exists again (e.g. restored from an export)
+            self.tombstones.pop(party_id)
+    
+    def invalidate(self, party_id: str, deleted: bool = False):
+        """Drop the cached party here and on every other replica; deleted also records a tombstone"""
+        self._drop_cached(party_id, deleted)
+        self.bus.publish(party_id, deleted)
+    
+    def is_deleted(self, party_id: str) -> bool:
+        """Whether the party is known to be deleted or archived (no storage read)"""
+        return self.tombstones.get(party_id, False)
+    
+    def remember_message_ids(self, message_ids: Iterable[Any]):
+        """Record posted party messages (kept across the next reload)"""
+        ids = {int(message_id) for message_id in message_ids if message_id}
+        with self._message_ids_lock:
+            self._recent_message_ids |= ids
+            if self.message_ids is not None:
+                self.message_ids |= ids
+    
+    def forget_message_ids(self, message_ids: Iterable[Any]):
+        """Drop messages of deleted or archived parties"""
+        ids = {int(message_id) for message_id in message_ids if message_id}
+        with self._message_ids_lock:
+            self._recent_message_ids -= ids
+            if self.message_ids is not None:
+                self.message_ids -= ids
+    
+    def may_be_party_message(self, message_ids: Iterable[int]) -> bool:
+        """False only when the set is loaded and none of the messages is a party message (no storage read)"""
+        with self._message_ids_lock:
+            known = self.message_ids
+            if known is None:
+                return True
+            return any(message_id in known for message_id in message_ids)
+    
+    @timed_operation('load_party_message_ids')
+    def load_message_ids(self) -> Optional[int]:
+        """Reload the message ids of all posted parties with an id-only query, returns how many"""
+        try:
+            with self._message_ids_lock:
+                self._recent_message_ids = set()
+            query = self.db.collection('parties').where('message_id', '!=', None).select(['message_id'])
+            loaded = {party_doc.get('message_id') for party_doc in query.stream()}
+            loaded.discard(None)
+            # Parties posted while the query ran are not in its results
+            with self._message_ids_lock:
+                self.message_ids = loaded | self._recent_message_ids
+                return len(self.message_ids)
+            
+        except Exception as e:
+            record_firestore_error('load_party_message_ids')
+            logger.error("❌ Error loading party message IDs: %s", e)
+            return None
+    
+    def peek_queue_position(self, party_id: str, user_id: int, role: str) -> Optional[int]:
+        """A user's position on a role's waitlist from the cached party, None when unknown (no storage read)"""
+        if PARTY_CACHE_TTL <= 0:
+            return None
+        model = self.models.get(party_id)
+        if model is not None:
+            queued = model.queue_position(user_id)
+            return queued[1] if queued and queued[0] == role else None
+        cached = self.cache.get(party_id)
+        if cached is None:
+            return None
+        queue = (cached.get('waitlist') or {}).get(role) or []
+        for position, entry in enumerate(queue, 1):
+            if entry.get('user_id') == str(user_id):
+                return position
+        return None
+    
+    def peek_member_role(self, party_id: str, user_id: int) -> Optional[str]:
+        """A member's role from the cached party, None when not cached or not a member (no storage read)"""
+        if PARTY_CACHE_TTL <= 0:
+            return None
+        model = self.models.get(party_id)
+        if model is not None:
+            return model.member_role(user_id)
+        cached = self.cache.get(party_id)
+        if cached is None:
+            return None
+        member = cached.get('members', {}).get(str(user_id))
+        return member.get('role') if member else None
+    
+    @timed_operation('create_party')
     def create_party(self, guild_id: int, channel_id: int, party_name: str, 
                     party_timestamp: Any, created_by: int) -> str:
         """Create a new party in the database"""
@@ -34,34 +236,71 @@ class PartyOperations:
                 'healer_slots': DEFAULT_HEALER_SLOTS,
                 'dps_slots': DEFAULT_DPS_SLOTS,
                 'created_by': created_by,
-                'created_at': firestore.SERVER_TIMESTAMP,
-                'members': {}
+                'created_at': get_firestore().SERVER_TIMESTAMP,
+                'members': {},
+                'signups_closed': False
             }
+            party_data.update(schedule_fields(party_timestamp))
             
             # Add party to Firebase
             doc_time, party_ref = self.db.collection('parties').add(party_data)
             return party_ref.id
             
         except Exception as e:
-            print(f"❌ Error creating party: {e}")
+            record_firestore_error('create_party')
+            logger.error("❌ Error creating party: %s", e, extra={'guild_id': guild_id})
             return None
     
+    @timed_operation('get_party')
     def get_party(self, party_id: str) -> Optional[Dict]:
         """Get party data by ID"""
+        if self.is_deleted(party_id):
+            return None
+        if PARTY_CACHE_TTL > 0:
+            cached = self.cache.get(party_id)
+            if cached is not None:
+                return dict(cached)
+        
         try:
+            # Subscribe before reading so a write elsewhere during the read is not missed
+            self.start_invalidation()
+            generation = self._generation
             party_ref = self.db.collection('parties').document(party_id)
             party_doc = party_ref.get()
             
             if party_doc.exists:
                 party_data = party_doc.to_dict()
                 party_data['id'] = party_doc.id
-                return party_data
+                if PARTY_CACHE_TTL > 0 and generation == self._generation:
+                    self.cache.set(party_id, party_data)
+                return dict(party_data)
+            
+            # Party ids are never reused (a restore re-publishes them), so a missing document stays missing
+            self.tombstones.set(party_id, True)
             return None
             
         except Exception as e:
-            print(f"❌ Error getting party: {e}")
+            record_firestore_error('get_party')
+            logger.error("❌ Error getting party: %s", e, extra={'party_id': party_id})
+            return None
+    
+    def get_party_model(self, party_id: str) -> Optional[Party]:
+        """Get a party as a parsed Party; the model is cached next to the document so it is parsed once"""
+        if PARTY_CACHE_TTL > 0:
+            model = self.models.get(party_id)
+            if model is not None:
+                return model
+        
+        generation = self._generation
+        party_data = self.get_party(party_id)
+        if party_data is None:
             return None
+        model = Party.from_dict(party_data)
+        if PARTY_CACHE_TTL > 0 and generation == self._generation:
+            self.models.set(party_id, model)
+        return model
     
+    @timed_operation('update_party')
     def update_party(self, party_id: str, updates: Dict) -> bool:
         """Update party data"""
         try:
@@ -70,73 +309,216 @@ class PartyOperations:
             # Check if party exists
             party_doc = party_ref.get()
             if not party_doc.exists:
-                print(f"❌ Party {party_id} not found during update")
+                logger.warning("❌ Party %s not found during update", party_id)
                 return False
             
             # Add timestamp to updates
-            updates['updated_at'] = firestore.SERVER_TIMESTAMP
+            updates['updated_at'] = get_firestore().SERVER_TIMESTAMP
+            updates['revision'] = get_firestore().Increment(1)
+            if 'party_timestamp' in updates:
+                updates.update(schedule_fields(updates['party_timestamp']))
             
             # Update party
             party_ref.update(updates)
-            print(f"✅ Successfully updated party {party_id}")
+            self.invalidate(party_id)
+            if updates.get('message_id'):
+                self.remember_message_ids([updates['message_id']])
+            logger.debug("✅ Successfully updated party %s", party_id, extra={'fields': list(updates)})
+            
+            # More slots: move queued users in
+            if any(f'{role}_slots' in updates for role in SLOT_ROLES) and (party_doc.to_dict() or {}).get('waitlist'):
+                self.promote_waitlist(party_id)
             return True
             
         except Exception as e:
-            print(f"❌ Error updating party {party_id}: {e}")
+            record_firestore_error('update_party')
+            logger.error("❌ Error updating party %s: %s", party_id, e)
             return False
     
     def update_message_id(self, party_id: str, message_id: int) -> bool:
         """Update the message ID for a party"""
         return self.update_party(party_id, {'message_id': message_id})
     
-    def add_member(self, party_id: str, user_id: int, username: str, role: str) -> bool:
-        """Add or update a member in a party"""
+    def _signup_transaction(self, party_id: str,
+                            change: Callable[[Dict], SignupChange]) -> Tuple[str, Optional[Dict]]:
+        """Read the party, apply change and write the fields it returns, all in one transaction"""
+        firestore = get_firestore()
+        party_ref = self.db.collection('parties').document(party_id)
+        
+        @firestore.transactional
+        def run(transaction):
+            snapshot = party_ref.get(transaction=transaction)
+            if not snapshot.exists:
+                return 'not_found', None, [], False
+            party_data = snapshot.to_dict()
+            party_data['id'] = party_id
+            party_data.setdefault('members', {})
+            party_data['waitlist'] = {role: list(queue) for role, queue in (party_data.get('waitlist') or {}).items()}
+            outcome, updates, promoted = change(party_data)
+            if updates:
+                updates['updated_at'] = firestore.SERVER_TIMESTAMP
+                updates['revision'] = party_data['revision'] = party_data.get('revision', 0) + 1
+                transaction.update(party_ref, updates)
+            return outcome, party_data, promoted, bool(updates)
+        
+        # Subscribe before the transaction reads, so a newer write elsewhere always bumps the generation
+        self.start_invalidation()
+        generation = self._generation
+        outcome, party_data, promoted, written = run(self.db.transaction())
+        if party_data is None:
+            self.tombstones.set(party_id, True)
+            return outcome, None
+        for user_id, role in promoted:
+            WAITLIST_EVENTS.labels(role=role, event='promoted').inc()
+            logger.info("⏫ Promoted %s from the %s waitlist of party %s", user_id, role, party_id)
+        if written:
+            self.invalidate(party_id)
+            self._seed_cache(party_id, party_data, generation)
+        return outcome, party_data
+    
+    def _seed_cache(self, party_id: str, party_data: Dict, generation: int):
+        """Cache the state a transaction just wrote, so the next click is answered without a read
+        
+        generation is read before the transaction: if anything besides this write's own invalidation
+        happened since (a concurrent signup here, a bus message from another replica), the written
+        state may already be stale and the next read goes to storage instead.
+        """
+        if PARTY_CACHE_TTL <= 0:
+            return
+        server_timestamp = get_firestore().SERVER_TIMESTAMP
+        now = datetime.datetime.now(datetime.timezone.utc)
+        cached = dict(party_data)
+        cached['members'] = {
+            member_id: dict(member, joined_at=now) if member.get('joined_at') is server_timestamp else member
+            for member_id, member in party_data.get('members', {}).items()
+        }
+        model = Party.from_dict(cached)
+        # Checked and stored under the lock _drop_cached bumps the generation with, so a drop cannot interleave
+        with self._bus_lock:
+            if self._generation != generation + 1:
+                return
+            self.cache.set(party_id, cached)
+            self.models.set(party_id, model)
+    
+    @timed_operation('join_role')
+    def join_role(self, party_id: str, user_id: int, username: str, role: str) -> Tuple[str, Optional[Dict]]:
+        """Sign a user up for a role, queueing them on its waitlist when the role is full
+        
+        Returns (outcome, party): 'joined', 'unchanged', 'queued', 'already_queued', 'queue_full',
+        'no_slots', 'closed', 'not_found' or 'error'. Switching away from a slot role promotes that
+        role's waitlist in the same transaction.
+        """
+        user_id_str = str(user_id)
+        joined_at = get_firestore().SERVER_TIMESTAMP
+        
+        def change(party_data: Dict) -> SignupChange:
+            members, waitlist = party_data['members'], party_data['waitlist']
+            previous = members.get(user_id_str, {}).get('role')
+            if previous == role:
+                # Keep joined_at (and the user's place in the role's order); only drop other queues
+                if _unqueue(waitlist, user_id_str) is None:
+                    return 'unchanged', None, []
+                return 'joined', {'waitlist': waitlist}, []
+            if role != 'cant_attend':
+                if party_data.get('signups_closed'):
+                    return 'closed', None, []
+                limit = party_data.get(f'{role}_slots', DEFAULT_SLOTS[role])
+                if limit == 0:
+                    return 'no_slots', None, []
+                if _role_count(members, role) >= limit:
+                    queue = waitlist.setdefault(role, [])
+                    if any(entry.get('user_id') == user_id_str for entry in queue):
+                        return 'already_queued', None, []
+                    if len(queue) >= WAITLIST_SIZE:
+                        return 'queue_full', None, []
+                    # One queue per user: a new queue replaces the old one
+                    _unqueue(waitlist, user_id_str)
+                    queue.append({'user_id': user_id_str, 'username': username, 'queued_at': time.time()})
+                    return 'queued', {'waitlist': waitlist}, []
+            
+            unqueued = _unqueue(waitlist, user_id_str)
+            members[user_id_str] = {'username': username, 'role': role, 'joined_at': joined_at}
+            promoted = fill_open_slots(party_data, joined_at) if previous in SLOT_ROLES else []
+            updates = {f'members.{member_id}': members[member_id]
+                       for member_id in [user_id_str] + [member_id for member_id, _ in promoted]}
+            if unqueued or promoted:
+                updates['waitlist'] = waitlist
+            return 'joined', updates, promoted
+        
         try:
-            party_ref = self.db.collection('parties').document(party_id)
+            outcome, party_data = self._signup_transaction(party_id, change)
+            if outcome == 'queued':
+                WAITLIST_EVENTS.labels(role=role, event='queued').inc()
+            logger.debug("✅ %s for %s as %s in party %s", outcome, username, role, party_id)
+            return outcome, party_data
             
-            # Check if party exists
-            party_doc = party_ref.get()
-            if not party_doc.exists:
-                print(f"❌ Party {party_id} not found when adding member")
-                return False
+        except Exception as e:
+            record_firestore_error('join_role')
+            logger.error("❌ Error joining party %s: %s", party_id, e)
+            return 'error', None
+    
+    @timed_operation('leave_party')
+    def leave_party(self, party_id: str, user_id: int) -> Tuple[str, Optional[Dict]]:
+        """Remove a user from a party and its waitlists, promoting the head of the freed role's queue
+        
+        Returns (outcome, party): 'left', 'unqueued', 'not_member', 'not_found' or 'error'.
+        """
+        user_id_str = str(user_id)
+        firestore = get_firestore()
+        left_queue = {}
+        
+        def change(party_data: Dict) -> SignupChange:
+            members, waitlist = party_data['members'], party_data['waitlist']
+            unqueued = left_queue['role'] = _unqueue(waitlist, user_id_str)
+            member = members.pop(user_id_str, None)
+            if member is None:
+                if unqueued is None:
+                    return 'not_member', None, []
+                return 'unqueued', {'waitlist': waitlist}, []
             
-            # Add/update member
-            user_id_str = str(user_id)
-            party_ref.update({
-                f'members.{user_id_str}': {
-                    'username': username,
-                    'role': role,
-                    'joined_at': firestore.SERVER_TIMESTAMP
-                }
-            })
-            print(f"✅ Added {username} as {role} to party {party_id}")
-            return True
+            updates = {f'members.{user_id_str}': firestore.DELETE_FIELD}
+            promoted = []
+            if member.get('role') in SLOT_ROLES:
+                promoted = fill_open_slots(party_data, firestore.SERVER_TIMESTAMP)
+                updates.update({f'members.{member_id}': members[member_id] for member_id, _ in promoted})
+            if unqueued or promoted:
+                updates['waitlist'] = waitlist
+            return 'left', updates, promoted
+        
+        try:
+            outcome, party_data = self._signup_transaction(party_id, change)
+            if left_queue.get('role'):
+                WAITLIST_EVENTS.labels(role=left_queue['role'], event='left').inc()
+            return outcome, party_data
             
         except Exception as e:
-            print(f"❌ Error adding member to party {party_id}: {e}")
-            return False
+            record_firestore_error('leave_party')
+            logger.error("❌ Error leaving party: %s", e, extra={'party_id': party_id})
+            return 'error', None
     
-    def remove_member(self, party_id: str, user_id: int) -> bool:
-        """Remove a member from a party"""
+    @timed_operation('promote_waitlist')
+    def promote_waitlist(self, party_id: str) -> bool:
+        """Fill free slots from the waitlists (after slot counts change), True when anyone moved"""
+        joined_at = get_firestore().SERVER_TIMESTAMP
+        
+        def change(party_data: Dict) -> SignupChange:
+            promoted = fill_open_slots(party_data, joined_at)
+            if not promoted:
+                return 'unchanged', None, []
+            updates = {f'members.{member_id}': party_data['members'][member_id] for member_id, _ in promoted}
+            updates['waitlist'] = party_data['waitlist']
+            return 'promoted', updates, promoted
+        
         try:
-            party_ref = self.db.collection('parties').document(party_id)
-            
-            # Check if party exists
-            party_doc = party_ref.get()
-            if not party_doc.exists:
-                return False
-            
-            # Remove member
-            user_id_str = str(user_id)
-            party_ref.update({
-                f'members.{user_id_str}': firestore.DELETE_FIELD
-            })
-            return True
+            outcome, _ = self._signup_transaction(party_id, change)
+            return outcome == 'promoted'
             
         except Exception as e:
-            print(f"❌ Error removing member from party: {e}")
+            record_firestore_error('promote_waitlist')
+            logger.error("❌ Error promoting waitlist: %s", e, extra={'party_id': party_id})
             return False
     
+    @timed_operation('get_guild_parties')
     def get_guild_parties(self, guild_id: int) -> List[Dict]:
         """Get all parties for a guild"""
         try:
@@ -160,9 +542,11 @@ class PartyOperations:
             return party_list
             
         except Exception as e:
-            print(f"❌ Error getting guild parties: {e}")
+            record_firestore_error('get_guild_parties')
+            logger.error("❌ Error getting guild parties: %s", e, extra={'guild_id': guild_id})
             return []
     
+    @timed_operation('delete_party')
     def delete_party(self, party_id: str) -> bool:
         """Delete a party"""
         try:
@@ -175,12 +559,16 @@ class PartyOperations:
             
             # Delete party
             party_ref.delete()
+            self.invalidate(party_id, deleted=True)
+            self.forget_message_ids([(party_doc.to_dict() or {}).get('message_id')])
             return True
             
         except Exception as e:
-            print(f"❌ Error deleting party: {e}")
+            record_firestore_error('delete_party')
+            logger.error("❌ Error deleting party: %s", e, extra={'party_id': party_id})
             return False
     
+    @timed_operation('delete_guild_parties')
     def delete_guild_parties(self, guild_id: int) -> int:
         """Delete all parties for a guild, returns count deleted"""
         try:
@@ -191,14 +579,18 @@ class PartyOperations:
             party_count = 0
             for party_doc in parties:
                 party_doc.reference.delete()
+                self.invalidate(party_doc.id, deleted=True)
+                self.forget_message_ids([(party_doc.to_dict() or {}).get('message_id')])
                 party_count += 1
             
             return party_count
             
         except Exception as e:
-            print(f"❌ Error deleting guild parties: {e}")
+            record_firestore_error('delete_guild_parties')
+            logger.error("❌ Error deleting guild parties: %s", e, extra={'guild_id': guild_id})
             return 0
     
+    @timed_operation('get_parties_with_message_ids')
     def get_parties_with_message_ids(self) -> List[Dict]:
         """Get all parties that have message IDs (for view restoration)"""
         try:
@@ -211,43 +603,202 @@ class PartyOperations:
                 party_data['id'] = party_doc.id
                 party_list.append(party_data)
             
+            self.remember_message_ids(party_data.get('message_id') for party_data in party_list)
             return party_list
             
         except Exception as e:
-            print(f"❌ Error getting parties with message IDs: {e}")
+            record_firestore_error('get_parties_with_message_ids')
+            logger.error("❌ Error getting parties with message IDs: %s", e)
             return []
     
-    def is_role_full(self, party_data: Dict, role: str) -> bool:
-        """Check if a specific role is full in a party"""
-        if role == 'cant_attend':
-            return False  # Can't attend has no limit
-        
-        members = party_data.get('members', {})
-        role_slots = {
-            'tank': party_data.get('tank_slots', DEFAULT_TANK_SLOTS),
-            'healer': party_data.get('healer_slots', DEFAULT_HEALER_SLOTS),
-            'dps': party_data.get('dps_slots', DEFAULT_DPS_SLOTS)
-        }
+    @timed_operation('get_scheduled_parties')
+    def get_scheduled_parties(self, until: float) -> List[Dict]:
+        """Get parties with a pending scheduler event due before until, soonest first"""
+        try:
+            query = (self.db.collection('parties')
+                     .where('next_event_at', '<=', int(until))
+                     .order_by('next_event_at'))
+            
+            party_list = []
+            for party_doc in query.stream():
+                party_data = party_doc.to_dict()
+                party_data['id'] = party_doc.id
+                party_list.append(party_data)
+            
+            return party_list
+            
+        except Exception as e:
+            record_firestore_error('get_scheduled_parties')
+            logger.error("❌ Error getting scheduled parties: %s", e)
+            return []
+    
+    @timed_operation('claim_party_event')
+    def claim_party_event(self, party_id: str, event_at: int) -> Optional[Tuple[str, Dict]]:
+        """Atomically mark the party's pending event as done; returns (kind, party) or None if already handled"""
+        try:
+            firestore = get_firestore()
+            party_ref = self.db.collection('parties').document(party_id)
+            
+            @firestore.transactional
+            def claim(transaction):
+                snapshot = party_ref.get(transaction=transaction)
+                if not snapshot.exists:
+                    return None
+                party_data = snapshot.to_dict()
+                if party_data.get('next_event_at') != event_at:
+                    return None  # Rescheduled or handled by another replica
+                
+                party_timestamp = party_data.get('party_timestamp')
+                if not party_data.get('reminder_sent') and time.time() < party_timestamp:
+                    kind, updates = 'reminder', {'reminder_sent': True, 'next_event_at': int(party_timestamp)}
+                else:
+                    kind, updates = 'close', {'reminder_sent': True, 'signups_closed': True, 'next_event_at': None}
+                updates['revision'] = party_data.get('revision', 0) + 1
+                transaction.update(party_ref, updates)
+                party_data.update(updates)
+                party_data['id'] = party_id
+                return kind, party_data
+            
+            result = claim(self.db.transaction())
+            if result is not None:
+                self.invalidate(party_id)
+            return result
+            
+        except Exception as e:
+            record_firestore_error('claim_party_event')
+            logger.error("❌ Error claiming scheduled event: %s", e, extra={'party_id': party_id})
+            return None
+    
+    @timed_operation('get_parties_by_message_ids')
+    def get_parties_by_message_ids(self, message_ids: List[int]) -> List[Dict]:
+        """Get parties posted as any of the given messages"""
+        try:
+            party_list = []
+            message_ids = list(message_ids)
+            # 'in' filters take at most 30 values
+            for start in range(0, len(message_ids), 30):
+                query = self.db.collection('parties').where('message_id', 'in', message_ids[start:start + 30])
+                for party_doc in query.stream():
+                    party_data = party_doc.to_dict()
+                    party_data['id'] = party_doc.id
+                    party_list.append(party_data)
+            
+            return party_list
+            
+        except Exception as e:
+            record_firestore_error('get_parties_by_message_ids')
+            logger.error("❌ Error getting parties by message IDs: %s", e)
+            return []
+    
+    @timed_operation('get_channel_parties')
+    def get_channel_parties(self, channel_id: int) -> List[Dict]:
+        """Get all parties posted in a channel"""
+        try:
+            query = self.db.collection('parties').where('channel_id', '==', channel_id)
+            
+            party_list = []
+            for party_doc in query.stream():
+                party_data = party_doc.to_dict()
+                party_data['id'] = party_doc.id
+                party_list.append(party_data)
+            
+            return party_list
+            
+        except Exception as e:
+            record_firestore_error('get_channel_parties')
+            logger.error("❌ Error getting channel parties: %s", e)
+            return []
+    
+    @timed_operation('get_parties_started_before')
+    def get_parties_started_before(self, cutoff: int, limit: int) -> List[Dict]:
+        """Get up to limit parties whose parsed start time is before cutoff, oldest first"""
+        try:
+            # Range filters only match numbers, so unparsed (string) start times are never selected
+            query = (self.db.collection('parties')
+                     .where('party_timestamp', '<', cutoff)
+                     .order_by('party_timestamp')
+                     .limit(limit))
+            
+            party_list = []
+            for party_doc in query.stream():
+                party_data = party_doc.to_dict()
+                party_data['id'] = party_doc.id
+                party_list.append(party_data)
+            
+            return party_list
+            
+        except Exception as e:
+            record_firestore_error('get_parties_started_before')
+            logger.error("❌ Error getting past parties: %s", e)
+            return []
+    
+    @timed_operation('archive_parties')
+    def archive_parties(self, party_list: List[Dict], expire_at: datetime.datetime, reason: str) -> int:
+        """Move parties to the archive collection in write batches, returns count archived
         
-        max_slots = role_slots.get(role, 0)
-        if max_slots == 0:
-            return True  # No slots means full
+        Batches commit in order, so after a failure the archived parties are the head of party_list.
+        """
+        if not party_list:
+            return 0
+        archived = []
+        try:
+            firestore = get_firestore()
+            # Each party is two writes (archive set + delete)
+            chunk_size = BATCH_WRITE_LIMIT // 2
+            for start in range(0, len(party_list), chunk_size):
+                chunk = party_list[start:start + chunk_size]
+                batch = self.db.batch()
+                for party_data in chunk:
+                    record = {key: value for key, value in party_data.items() if key != 'id'}
+                    record.update({
+                        'archived_at': firestore.SERVER_TIMESTAMP,
+                        'archive_reason': reason,
+                        'expire_at': expire_at
+                    })
+                    batch.set(self.db.collection(ARCHIVE_COLLECTION).document(party_data['id']), record)
+                    batch.delete(self.db.collection('parties').document(party_data['id']))
+                batch.commit()
+                archived.extend(chunk)
+            
+        except Exception as e:
+            record_firestore_error('archive_parties')
+            logger.error("❌ Error archiving %d parties: %s", len(party_list) - len(archived), e)
         
-        current_count = sum(1 for member in members.values() if member.get('role') == role)
-        return current_count >= max_slots
+        # Chunks committed before a failure stay archived
+        for party_data in archived:
+            self.invalidate(party_data['id'], deleted=True)
+        self.forget_message_ids(party_data.get('message_id') for party_data in archived)
+        return len(archived)
+    
+    def set_view_states(self, view_states: Dict[str, str]) -> int:
+        """Record the view state last attached to each party's message, returns count written"""
+        written = 0
+        party_ids = list(view_states)
+        try:
+            # Only restore_views reads this field, from a fresh query: the party caches are left alone
+            for start in range(0, len(party_ids), BATCH_WRITE_LIMIT):
+                batch = self.db.batch()
+                for party_id in party_ids[start:start + BATCH_WRITE_LIMIT]:
+                    batch.update(self.db.collection('parties').document(party_id), {'view_state': view_states[party_id]})
+                batch.commit()
+                written += len(party_ids[start:start + BATCH_WRITE_LIMIT])
+            return written
+            
+        except Exception as e:
+            # A party deleted mid-restore fails its batch; those messages are simply edited again next time
+            record_firestore_error('set_view_states')
+            logger.warning("❌ Error recording view state for %d parties: %s", len(party_ids) - written, e)
+            return written
+    
+    def is_role_full(self, party_data: Dict, role: str) -> bool:
+        """Check if a specific role is full in a party"""
+        return Party.from_dict(party_data).is_role_full(role)
     
     def get_member_counts_by_role(self, party_data: Dict) -> Dict[str, int]:
         """Get count of members by role"""
-        members = party_data.get('members', {})
-        counts = {'tank': 0, 'healer': 0, 'dps': 0, 'cant_attend': 0}
-        
-        for member in members.values():
-            role = member.get('role', 'unknown')
-            if role in counts:
-                counts[role] += 1
-        
-        return counts
+        return Party.from_dict(party_data).counts
     
+    @timed_operation('find_party_by_partial_id')
     def find_party_by_partial_id(self, guild_id: int, partial_id: str) -> Optional[Dict]:
         """Find a party by partial ID within a guild"""
         try:
@@ -264,7 +815,8 @@ class PartyOperations:
             return None
             
         except Exception as e:
-            print(f"❌ Error finding party by partial ID: {e}")
+            record_firestore_error('find_party_by_partial_id')
+            logger.error("❌ Error finding party by partial ID: %s", e, extra={'guild_id': guild_id})
             return None
 
 # Global instance
@@ -1,44 +1,80 @@
 """
 Discord bot event handlers
 """
+import asyncio
+import logging
 import discord
 from discord.ext import commands
 from database.firebase_client import firebase_client
+from database.lease import Lease
 from database.party_operations import party_ops
-from ui.views import PartyView
+from events.orphan_reaper import archive_orphans
+from jobs.runner import get_job_runner
+from monitoring.boot import boot
+from monitoring.metrics import discord_call
+from ui.views import PartyView, is_dispatched, parse_party_custom_id
+from utils.work_scheduler import work_scheduler
+
+logger = logging.getLogger(__name__)
 
 class BotEvents(commands.Cog):
     """Bot event handlers"""
     
     def __init__(self, bot):
         self.bot = bot
+        # Runs on one replica only; the others route clicks lazily through on_interaction
+        get_job_runner(bot).register('restore_views', self.restore_views)
+    
+    async def cog_unload(self):
+        await get_job_runner(self.bot).stop()
     
     @commands.Cog.listener()
     async def on_ready(self):
         """Called when the bot is ready"""
-        print(f'🎮 {self.bot.user} is online!')
+        logger.info("🎮 %s is online!", self.bot.user)
+        if not boot.reported:
+            boot.mark('gateway_ready')
+            boot.report()
         
-        # Initialize Firebase
-        firebase_client.initialize()
+        # Initialize Firebase (already done by the setup_hook warmup unless it failed)
+        await asyncio.to_thread(firebase_client.initialize)
         
-        try:
-            # Sync slash commands
-            synced = await self.bot.tree.sync()
-            print(f"⚡ Synced {len(synced)} commands")
-        except Exception as e:
-            print(f"❌ Sync failed: {e}")
+        # Slash commands are synced once per boot in setup_hook (utils.command_sync), not on every ready
+        
+        # Start leader-elected background jobs (restore_views among them)
+        get_job_runner(self.bot).start()
+    
+    @commands.Cog.listener()
+    async def on_interaction(self, interaction: discord.Interaction):
+        """Route party button clicks that arrive before this process has built the party's view"""
+        if interaction.type != discord.InteractionType.component:
+            return
+        custom_id = interaction.data.get('custom_id')
+        parsed = parse_party_custom_id(custom_id)
+        # The view store is the only authority on whether a view already handled this click
+        if parsed is None or is_dispatched(self.bot, interaction):
+            return
         
-        # Restore views after restart
-        await self.restore_views()
+        view = PartyView(parsed[0], None)
+        self.bot.add_view(view)
+        item = discord.utils.get(view.children, custom_id=custom_id)
+        if item is not None and await view.interaction_check(interaction):
+            await item.callback(interaction)
     
-    async def restore_views(self):
-        """Restore views for all active parties after bot restart"""
+    async def restore_views(self, lease: Lease):
+        """Re-attach views for all active parties after a restart (leader only)"""
         try:
             # Get all parties with message IDs
-            parties = party_ops.get_parties_with_message_ids()
+            parties = await work_scheduler.run('background', None, party_ops.get_parties_with_message_ids)
             
             restored_count = 0
+            unchanged_count = 0
+            orphaned = []
+            view_states = {}
             for party_data in parties:
+                if not lease.valid:
+                    logger.warning("Lease %s expired, stopping view restoration", lease.name)
+                    break
                 try:
                     party_id = party_data['id']
                     channel_id = party_data.get('channel_id')
@@ -46,19 +82,34 @@ class BotEvents(commands.Cog):
                     creator_id = party_data.get('created_by')
                     
                     if channel_id and message_id:
-                        channel = self.bot.get_channel(channel_id)
-                        if channel:
-                            message = await channel.fetch_message(message_id)
-                            view = PartyView(party_id, creator_id)
-                            await message.edit(view=view)
-                            restored_count += 1
+                        # Only messages whose attached view differs from the party's state need an edit;
+                        # clicks on the rest are routed lazily through on_interaction
+                        state_key = PartyView.state_key(party_data)
+                        if party_data.get('view_state') == state_key:
+                            unchanged_count += 1
+                            continue
+                        
+                        # Messages from before deterministic custom ids need the new view attached once
+                        message = self.bot.get_partial_messageable(channel_id).get_partial_message(message_id)
+                        view = PartyView(party_id, creator_id).apply_state(party_data)
+                        async with work_scheduler.slot('background', party_data.get('guild_id')):
+                            with discord_call('edit_message'):
+                                await message.edit(view=view)
+                        view_states[party_id] = state_key
+                        restored_count += 1
+                except discord.NotFound:
+                    # The message or channel is gone: archive instead of retrying on every restart
+                    orphaned.append(party_data)
                 except Exception as e:
-                    print(f"Failed to restore view for party {party_data.get('id', 'unknown')}: {e}")
+                    logger.warning("Failed to restore view for party %s: %s", party_data.get('id', 'unknown'), e)
             
-            print(f"✅ Restored {restored_count} party views")
+            logger.info("✅ Restored %d party views (%d already up to date)", restored_count, unchanged_count)
+            if view_states:
+                await work_scheduler.run('background', None, party_ops.set_view_states, view_states)
+            await archive_orphans(orphaned, 'message_deleted')
             
         except Exception as e:
-            print(f"❌ Failed to restore views: {e}")
+            logger.error("❌ Failed to restore views: %s", e)
 
 async def setup(bot):
     """Setup function for the cog"""
@@ -0,0 +1,162 @@
+"""
+Orphan reaper: archives parties whose message, channel or guild is gone
+
+Gateway listeners handle deletes as they happen (raw message deletes need the
+guild_messages intent, which the lean profile leaves off). Deleted message ids are
+first matched against a local set of party message ids, so ordinary chat deletes
+cost no query. The reconciliation pass finds parties orphaned while the bot was
+offline, or posted by another replica since this one last reloaded the set:
+
+    python -m events.orphan_reaper [--dry-run]
+"""
+import sys
+import asyncio
+import logging
+import argparse
+from typing import Dict, List, Set
+import discord
+from discord.ext import commands
+from config.settings import DISCORD_TOKEN, ARCHIVE_BATCH_SIZE, PARTY_MESSAGE_REFRESH
+from database.party_operations import party_ops
+from jobs.archive import expire_at
+from monitoring.metrics import registry
+from utils.work_scheduler import work_scheduler
+
+logger = logging.getLogger(__name__)
+
+PARTIES_REAPED = registry.counter(
+    "party_bot_orphaned_parties_total", "Parties archived because their message, channel or guild was deleted",
+    ["reason"])
+
+async def archive_orphans(party_list: List[Dict], reason: str) -> int:
+    """Archive parties in batches, returns count archived"""
+    archived = 0
+    for start in range(0, len(party_list), ARCHIVE_BATCH_SIZE):
+        batch = party_list[start:start + ARCHIVE_BATCH_SIZE]
+        archived += await work_scheduler.run('background', batch[0].get('guild_id'), party_ops.archive_parties,
+                                             batch, expire_at(), reason)
+    if archived:
+        PARTIES_REAPED.labels(reason=reason).inc(archived)
+        logger.info("🧹 Archived %d orphaned parties (%s)", archived, reason)
+    return archived
+
+class OrphanReaper(commands.Cog):
+    """Archives parties when their message, channel or guild is deleted"""
+    
+    def __init__(self, bot):
+        self.bot = bot
+        self._refresh_task = None
+    
+    async def cog_load(self):
+        self._refresh_task = asyncio.create_task(self.refresh_message_ids())
+    
+    async def cog_unload(self):
+        if self._refresh_task is not None:
+            self._refresh_task.cancel()
+    
+    async def refresh_message_ids(self):
+        """Keep the local set of party message ids loaded (until loaded, every delete is queried)"""
+        while True:
+            count = await work_scheduler.run('background', None, party_ops.load_message_ids)
+            if count is not None:
+                logger.debug("Loaded %d party message ids", count)
+            await asyncio.sleep(PARTY_MESSAGE_REFRESH)
+    
+    @commands.Cog.listener()
+    async def on_raw_message_delete(self, payload: discord.RawMessageDeleteEvent):
+        # Almost every deleted message is ordinary chat: match locally before querying
+        if not party_ops.may_be_party_message([payload.message_id]):
+            return
+        parties = await work_scheduler.run('background', payload.guild_id, party_ops.get_parties_by_message_ids,
+                                           [payload.message_id])
+        await archive_orphans(parties, 'message_deleted')
+    
+    @commands.Cog.listener()
+    async def on_raw_bulk_message_delete(self, payload: discord.RawBulkMessageDeleteEvent):
+        known = party_ops.message_ids
+        message_ids = list(payload.message_ids) if known is None else [
+            message_id for message_id in payload.message_ids if message_id in known]
+        if not message_ids:
+            return
+        parties = await work_scheduler.run('background', payload.guild_id, party_ops.get_parties_by_message_ids,
+                                           message_ids)
+        await archive_orphans(parties, 'message_deleted')
+    
+    @commands.Cog.listener()
+    async def on_guild_channel_delete(self, channel: discord.abc.GuildChannel):
+        parties = await work_scheduler.run('background', channel.guild.id, party_ops.get_channel_parties, channel.id)
+        await archive_orphans(parties, 'channel_deleted')
+    
+    @commands.Cog.listener()
+    async def on_guild_remove(self, guild: discord.Guild):
+        parties = await work_scheduler.run('background', guild.id, party_ops.get_guild_parties, guild.id)
+        await archive_orphans(parties, 'guild_removed')
+
+async def find_orphans(client: discord.Client, concurrency: int = 5) -> Dict[str, List[Dict]]:
+    """Check every posted party against Discord, grouped by orphan reason"""
+    parties = await asyncio.to_thread(party_ops.get_parties_with_message_ids)
+    orphans: Dict[str, List[Dict]] = {'guild_removed': [], 'message_deleted': []}
+    missing_guilds: Set[int] = set()
+    checked_guilds: Set[int] = set()
+    slots = asyncio.Semaphore(concurrency)
+    
+    # One lookup per guild first: every party in a guild the bot left is orphaned
+    for guild_id in {party_data.get('guild_id') for party_data in parties if party_data.get('guild_id')}:
+        try:
+            await client.fetch_guild(guild_id)
+        except (discord.NotFound, discord.Forbidden):
+            missing_guilds.add(guild_id)
+        checked_guilds.add(guild_id)
+    
+    async def check(party_data: Dict):
+        if party_data.get('guild_id') in missing_guilds:
+            orphans['guild_removed'].append(party_data)
+            return
+        async with slots:
+            try:
+                channel = client.get_partial_messageable(party_data['channel_id'])
+                await channel.fetch_message(party_data['message_id'])
+            except discord.NotFound:
+                # Unknown message or unknown channel
+                orphans['message_deleted'].append(party_data)
+            except discord.HTTPException as e:
+                logger.warning("Could not check party message: %s", e, extra={'party_id': party_data['id']})
+    
+    await asyncio.gather(*(check(party_data) for party_data in parties))
+    logger.info("🔎 Checked %d parties in %d guilds", len(parties), len(checked_guilds))
+    return orphans
+
+async def reconcile(dry_run: bool = False):
+    """Log in over REST, find orphaned parties and archive them"""
+    client = discord.Client(intents=discord.Intents.none())
+    await client.login(DISCORD_TOKEN)
+    try:
+        orphans = await find_orphans(client)
+    finally:
+        await client.close()
+    
+    for reason, party_list in orphans.items():
+        logger.info("%s: %d orphaned parties", reason, len(party_list))
+        if not dry_run:
+            await archive_orphans(party_list, reason)
+
+def main():
+    parser = argparse.ArgumentParser(description="Archive parties whose message, channel or guild is gone")
+    parser.add_argument('--dry-run', action='store_true', help='only report what would be archived')
+    args = parser.parse_args()
+    if not DISCORD_TOKEN:
+        logger.critical("❌ No Discord token found in environment variables!")
+        sys.exit(1)
+    asyncio.run(reconcile(args.dry_run))
+
+async def setup(bot):
+    """Setup function for the cog"""
+    await bot.add_cog(OrphanReaper(bot))
+
+if __name__ == "__main__":
+    from monitoring.log_config import setup_logging, shutdown_logging
+    setup_logging()
+    try:
+        main()
+    finally:
+        shutdown_logging()
@@ -0,0 +1,2 @@
+# http_interactions/__init__.py
+"""HTTP interactions endpoint mode for the Discord Party Bot"""
@@ -0,0 +1,13 @@
+"""
+Entry point for HTTP interactions mode: python -m http_interactions
+"""
+from monitoring.boot import boot  # first import: starts the boot clock
+from http_interactions.server import main
+from monitoring.log_config import setup_logging, shutdown_logging
+
+if __name__ == "__main__":
+    setup_logging()
+    try:
+        main()
+    finally:
+        shutdown_logging()
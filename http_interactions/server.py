@@ -0,0 +1,163 @@
+"""
+Interactions endpoint: receives interactions over HTTP instead of the gateway
+
+Any number of replicas can run behind a load balancer; none of them keeps a
+gateway connection or guild cache. Each request is verified, handed to the same
+cogs, views and modals the gateway bot uses, and answered once the handler has
+acknowledged the interaction through the REST callback (or the defer deadline passed).
+
+Run with: python -m http_interactions
+"""
+import sys
+import json
+import time
+import signal
+import asyncio
+import logging
+from typing import Optional
+import discord
+from aiohttp import web
+from discord.ext import commands
+from config.settings import (DISCORD_TOKEN, DISCORD_PUBLIC_KEY, INTERACTIONS_PATH, METRICS_HOST, METRICS_PORT,
+                             INTERACTION_DEFER_DEADLINE)
+from database.firebase_client import firebase_client
+from http_interactions.verify import SignatureVerifier
+from monitoring.boot import boot
+from monitoring.metrics import registry, install_rate_limit_counter
+from monitoring.server import MetricsServer
+from monitoring.tracing import tracer
+from monitoring.recorder import recorder
+from monitoring.watchdog import watchdog
+from ui.modals import PartyEditModal
+
+logger = logging.getLogger(__name__)
+
+PING = 1
+MODAL_SUBMIT = 5
+
+HTTP_INTERACTIONS = registry.counter(
+    "party_bot_http_interactions_total", "Interactions received over HTTP by outcome", ["outcome"])
+HTTP_ACK_LATENCY = registry.histogram(
+    "party_bot_http_interaction_ack_seconds", "Time from receiving an HTTP interaction to its acknowledgement")
+
+class InteractionEndpoint:
+    """Verifies interaction requests and dispatches them into the bot's handlers"""
+    
+    def __init__(self, bot: commands.Bot, public_key: str,
+                 response_timeout: float = INTERACTION_DEFER_DEADLINE + 0.5):
+        self.bot = bot
+        self.verifier = SignatureVerifier(public_key)
+        self.response_timeout = response_timeout
+    
+    def add_routes(self, app: web.Application):
+        app.router.add_post(INTERACTIONS_PATH, self.handle)
+    
+    async def handle(self, request: web.Request) -> web.Response:
+        started = time.perf_counter()
+        body = await request.read()
+        if not self.verifier.verify(request.headers.get('X-Signature-Ed25519'),
+                                    request.headers.get('X-Signature-Timestamp'), body):
+            HTTP_INTERACTIONS.labels(outcome='bad_signature').inc()
+            return web.Response(status=401, text='invalid request signature')
+        
+        payload = json.loads(body)
+        if payload.get('type') == PING:
+            HTTP_INTERACTIONS.labels(outcome='ping').inc()
+            return web.json_response({'type': 1})
+        
+        interaction = await self.dispatch(payload)
+        acknowledged = interaction is not None and await self.wait_for_response(interaction)
+        HTTP_ACK_LATENCY.observe(time.perf_counter() - started)
+        HTTP_INTERACTIONS.labels(outcome='acknowledged' if acknowledged else 'unacknowledged').inc()
+        if not acknowledged:
+            logger.warning("Interaction %s was not acknowledged within %.1fs", payload.get('id'), self.response_timeout)
+        # The response itself went through the interaction callback route
+        return web.Response(status=202)
+    
+    def register_stateless_handlers(self, payload: dict):
+        """Rebuild the edit modal a submit is addressed to (party buttons are routed by BotEvents)"""
+        if payload.get('type') != MODAL_SUBMIT:
+            return
+        modal = PartyEditModal.from_custom_id((payload.get('data') or {}).get('custom_id', ''))
+        if modal is not None:
+            self.bot._connection.store_view(modal)
+    
+    async def dispatch(self, payload: dict) -> Optional[discord.Interaction]:
+        """Feed the payload through the same parser the gateway uses and return the Interaction"""
+        self.register_stateless_handlers(payload)
+        interaction_id = int(payload['id'])
+        # wait_for registers its listener immediately, before the parser dispatches the event
+        waiter = self.bot.wait_for('interaction', check=lambda i: i.id == interaction_id, timeout=1.0)
+        self.bot._connection.parse_interaction_create(payload)
+        try:
+            return await waiter
+        except asyncio.TimeoutError:
+            return None
+    
+    async def wait_for_response(self, interaction: discord.Interaction) -> bool:
+        """Wait until the handler has responded or deferred"""
+        deadline = time.monotonic() + self.response_timeout
+        while not interaction.response.is_done():
+            if time.monotonic() >= deadline:
+                return False
+            await asyncio.sleep(0.02)
+        return True
+
+def readiness_checks(bot: commands.Bot):
+    """Build the checks reported by the /readyz route"""
+    def checks() -> dict:
+        return {
+            'discord_logged_in': bot.user is not None,
+            'firebase_initialized': firebase_client.is_initialized
+        }
+    return checks
+
+async def serve():
+    """Log in over REST only and serve interactions until interrupted"""
+    from main import create_bot, load_extensions
+    
+    boot.mark_imports()
+    bot = create_bot()
+    with boot.phase('extensions'):
+        if not await load_extensions(bot):
+            logger.critical("❌ Failed to load extensions!")
+            sys.exit(1)
+    install_rate_limit_counter()
+    
+    # No gateway connection: login sets up the REST client, application id and bot user
+    await bot.login(DISCORD_TOKEN)
+    
+    endpoint = InteractionEndpoint(bot, DISCORD_PUBLIC_KEY)
+    server = MetricsServer(METRICS_HOST, METRICS_PORT, readiness_checks(bot))
+    endpoint.add_routes(server.app)
+    
+    stop_event = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sig, stop_event.set)
+        except NotImplementedError:
+            pass
+    
+    try:
+        await server.start()
+        watchdog.start()
+        logger.info("🌐 Serving interactions at %s:%s%s", METRICS_HOST, METRICS_PORT, INTERACTIONS_PATH)
+        boot.mark('server_start')
+        boot.report()
+        await stop_event.wait()
+    finally:
+        watchdog.stop()
+        await server.stop()
+        await bot.close()
+        tracer.shutdown()
+        recorder.shutdown()
+
+def main():
+    if not DISCORD_TOKEN:
+        logger.critical("❌ No Discord token found in environment variables!")
+        sys.exit(1)
+    if not DISCORD_PUBLIC_KEY:
+        logger.critical("❌ DISCORD_PUBLIC_KEY is required for HTTP interactions mode!")
+        sys.exit(1)
+    asyncio.run(serve())
@@ -0,0 +1,160 @@
+"""
+Sign and send synthetic interaction payloads to a local interactions endpoint
+
+    python -m http_interactions.sign keygen
+    python -m http_interactions.sign send --key <private hex> ping
+    python -m http_interactions.sign send --key <private hex> command parties
+    python -m http_interactions.sign send --key <private hex> command create-party name=Raid starttime="Friday 8PM"
+    python -m http_interactions.sign send --key <private hex> click party:<party_id>:join_tank
+
+Start the server with DISCORD_PUBLIC_KEY set to the public half printed by keygen.
+Synthetic interactions carry a fake token, so the server routes and handles them
+(storage calls included) but Discord rejects the final callback.
+"""
+import sys
+import json
+import time
+import random
+import argparse
+import datetime
+import urllib.error
+import urllib.request
+from typing import Dict, List, Optional, Tuple
+from nacl.signing import SigningKey
+
+COMMAND = 2
+COMPONENT = 3
+
+def generate_keypair() -> Tuple[str, str]:
+    """Return a new (private, public) Ed25519 key pair as hex"""
+    key = SigningKey.generate()
+    return key.encode().hex(), key.verify_key.encode().hex()
+
+def sign_body(private_key: str, body: bytes, timestamp: Optional[int] = None) -> Dict[str, str]:
+    """Build the signature headers Discord would send for this body"""
+    timestamp = str(int(time.time()) if timestamp is None else timestamp)
+    signature = SigningKey(bytes.fromhex(private_key)).sign(timestamp.encode() + body).signature
+    return {'X-Signature-Ed25519': signature.hex(), 'X-Signature-Timestamp': timestamp}
+
+def _snowflake() -> str:
+    # Current time in the snowflake layout so ids look like fresh interactions
+    return str(((int(time.time() * 1000) - 1420070400000) << 22) | random.getrandbits(22))
+
+def _base_payload(interaction_type: int, guild_id: str, channel_id: str, user_id: str,
+                  application_id: str, permissions: str) -> dict:
+    now = datetime.datetime.now(datetime.timezone.utc).isoformat()
+    return {
+        'id': _snowflake(),
+        'application_id': application_id,
+        'type': interaction_type,
+        'token': 'synthetic-' + _snowflake(),
+        'version': 1,
+        'guild_id': guild_id,
+        'channel_id': channel_id,
+        'app_permissions': permissions,
+        'locale': 'en-US',
+        'guild_locale': 'en-US',
+        'member': {
+            'user': {'id': user_id, 'username': 'synthetic', 'discriminator': '0', 'global_name': 'Synthetic',
+                     'avatar': None},
+            'roles': [],
+            'joined_at': now,
+            'deaf': False,
+            'mute': False,
+            'flags': 0,
+            'permissions': permissions
+        }
+    }
+
+def ping_payload() -> dict:
+    return {'id': _snowflake(), 'application_id': '0', 'type': 1, 'token': 'synthetic', 'version': 1}
+
+def command_payload(name: str, options: List[Tuple[str, str]], **ids) -> dict:
+    """A slash command invocation with string options"""
+    payload = _base_payload(COMMAND, **ids)
+    payload['data'] = {
+        'id': _snowflake(),
+        'name': name,
+        'type': 1,
+        'options': [{'name': key, 'type': 3, 'value': value} for key, value in options]
+    }
+    return payload
+
+def component_payload(custom_id: str, message_id: Optional[str] = None, **ids) -> dict:
+    """A button click on a bot message"""
+    payload = _base_payload(COMPONENT, **ids)
+    payload['data'] = {'custom_id': custom_id, 'component_type': 2}
+    payload['message'] = {
+        'id': message_id or _snowflake(),
+        'channel_id': ids['channel_id'],
+        'author': {'id': ids['application_id'], 'username': 'party-bot', 'discriminator': '0', 'avatar': None,
+                   'bot': True},
+        'content': '',
+        'timestamp': datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        'edited_timestamp': None,
+        'tts': False,
+        'mention_everyone': False,
+        'mentions': [],
+        'mention_roles': [],
+        'attachments': [],
+        'embeds': [],
+        'pinned': False,
+        'type': 0,
+        'flags': 0,
+        'components': []
+    }
+    return payload
+
+def send(url: str, private_key: str, payload: dict) -> Tuple[int, str]:
+    """POST a signed payload and return (status, body)"""
+    body = json.dumps(payload).encode()
+    headers = {'Content-Type': 'application/json', **sign_body(private_key, body)}
+    request = urllib.request.Request(url, data=body, headers=headers, method='POST')
+    try:
+        with urllib.request.urlopen(request, timeout=10) as response:
+            return response.status, response.read().decode()
+    except urllib.error.HTTPError as e:
+        return e.code, e.read().decode()
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = parser.add_subparsers(dest='action', required=True)
+    sub.add_parser('keygen', help='print a new key pair')
+    
+    send_parser = sub.add_parser('send', help='sign and POST a synthetic interaction')
+    send_parser.add_argument('--url', default='http://localhost:8080/interactions')
+    send_parser.add_argument('--key', required=True, help='private key (hex) matching DISCORD_PUBLIC_KEY')
+    send_parser.add_argument('--guild-id', default='100000000000000001')
+    send_parser.add_argument('--channel-id', default='100000000000000002')
+    send_parser.add_argument('--user-id', default='100000000000000003')
+    send_parser.add_argument('--application-id', default='100000000000000004')
+    send_parser.add_argument('--permissions', default='8', help='member permission bits (8 = administrator)')
+    send_parser.add_argument('--message-id', default=None, help='message id for clicks')
+    send_parser.add_argument('kind', choices=['ping', 'command', 'click'])
+    send_parser.add_argument('target', nargs='?', help='command name or component custom id')
+    send_parser.add_argument('options', nargs='*', help='command options as name=value')
+    args = parser.parse_args(argv)
+    
+    if args.action == 'keygen':
+        private_key, public_key = generate_keypair()
+        print(f"private: {private_key}\npublic:  {public_key}")
+        return
+    
+    ids = {'guild_id': args.guild_id, 'channel_id': args.channel_id, 'user_id': args.user_id,
+           'application_id': args.application_id, 'permissions': args.permissions}
+    if args.kind == 'ping':
+        payload = ping_payload()
+    elif not args.target:
+        parser.error(f"{args.kind} needs a target")
+    elif args.kind == 'command':
+        payload = command_payload(args.target, [tuple(option.split('=', 1)) for option in args.options], **ids)
+    else:
+        payload = component_payload(args.target, args.message_id, **ids)
+    
+    started = time.perf_counter()
+    status, body = send(args.url, args.key, payload)
+    print(f"{status} in {(time.perf_counter() - started) * 1000:.1f}ms {body}")
+    sys.exit(0 if status < 400 else 1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,28 @@
+"""
+Ed25519 request signature verification for the interactions endpoint
+"""
+import time
+from typing import Optional
+from nacl.signing import VerifyKey
+from nacl.exceptions import BadSignatureError
+from config.settings import INTERACTIONS_MAX_SKEW
+
+class SignatureVerifier:
+    """Checks Discord's X-Signature-Ed25519 / X-Signature-Timestamp headers"""
+    
+    def __init__(self, public_key: str, max_skew: float = INTERACTIONS_MAX_SKEW):
+        self._key = VerifyKey(bytes.fromhex(public_key))
+        self.max_skew = max_skew
+    
+    def verify(self, signature: Optional[str], timestamp: Optional[str], body: bytes) -> bool:
+        """True if the body was signed by Discord and the timestamp is recent"""
+        if not signature or not timestamp:
+            return False
+        try:
+            # Reject stale timestamps so captured requests cannot be replayed later
+            if abs(time.time() - int(timestamp)) > self.max_skew:
+                return False
+            self._key.verify(timestamp.encode() + body, bytes.fromhex(signature))
+            return True
+        except (ValueError, BadSignatureError):
+            return False
@@ -0,0 +1,2 @@
+# jobs/__init__.py
+"""Leader-elected background jobs for the Discord Party Bot"""
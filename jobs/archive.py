@@ -0,0 +1,84 @@
+"""
+Archive sweeper: moves parties that started more than a grace period ago out of
+the hot `parties` collection, in batches, and disables their buttons
+
+Runs as a leader-elected job, so one replica sweeps at a time.
+"""
+import time
+import asyncio
+import logging
+import datetime
+from typing import Dict, List
+from config.settings import (ARCHIVE_GRACE_HOURS, ARCHIVE_RETENTION_DAYS, ARCHIVE_SWEEP_INTERVAL,
+                             ARCHIVE_BATCH_SIZE)
+from database.lease import Lease
+from database.party_operations import party_ops
+from jobs.runner import get_job_runner
+from monitoring.metrics import registry, discord_call
+from ui.views import PartyView
+from utils.work_scheduler import work_scheduler
+
+logger = logging.getLogger(__name__)
+
+PARTIES_ARCHIVED = registry.counter(
+    "party_bot_parties_archived_total", "Parties moved to the archive collection", ["reason"])
+
+class ArchiveSweeper:
+    """Archives past parties in batches"""
+    
+    def __init__(self, bot, grace_hours: float = ARCHIVE_GRACE_HOURS, batch_size: int = ARCHIVE_BATCH_SIZE):
+        self.bot = bot
+        self.grace_seconds = grace_hours * 3600
+        self.batch_size = batch_size
+    
+    async def sweep(self, lease: Lease):
+        """Archive every party past its start time plus grace, one batch at a time"""
+        cutoff = int(time.time() - self.grace_seconds)
+        store = get_job_runner(self.bot).store
+        total = 0
+        while True:
+            batch = await work_scheduler.run('background', None, party_ops.get_parties_started_before, cutoff,
+                                             self.batch_size)
+            if not batch:
+                break
+            # Fencing: only the current lease holder may move documents
+            if not await asyncio.to_thread(store.validate, lease.name, lease.token):
+                logger.warning("Lease %s no longer held, stopping archive sweep", lease.name)
+                break
+            
+            archived = await work_scheduler.run('background', None, party_ops.archive_parties, batch, expire_at(),
+                                                'expired')
+            if archived == 0:
+                break
+            PARTIES_ARCHIVED.labels(reason='expired').inc(archived)
+            total += archived
+            # The archived parties are the head of the batch; a shorter count means a write failed
+            await close_party_messages(self.bot, batch[:archived])
+            if archived < len(batch) or len(batch) < self.batch_size:
+                break
+        
+        if total:
+            logger.info("🗄️ Archived %d past parties", total)
+
+def expire_at() -> datetime.datetime:
+    """TTL deadline for documents archived now"""
+    return datetime.datetime.now(datetime.timezone.utc) + datetime.timedelta(days=ARCHIVE_RETENTION_DAYS)
+
+async def close_party_messages(bot, party_list: List[Dict]):
+    """Disable the buttons on the messages of parties that were archived"""
+    for party_data in party_list:
+        channel_id = party_data.get('channel_id')
+        message_id = party_data.get('message_id')
+        if not (channel_id and message_id):
+            continue
+        try:
+            message = bot.get_partial_messageable(channel_id).get_partial_message(message_id)
+            async with work_scheduler.slot('background', party_data.get('guild_id')):
+                with discord_call('edit_message'):
+                    await message.edit(view=PartyView.closed(party_data['id'], party_data.get('created_by')))
+        except Exception as e:
+            logger.warning("Failed to close message of archived party: %s", e, extra={'party_id': party_data['id']})
+
+async def setup(bot):
+    """Register the sweeper with the bot's job runner"""
+    get_job_runner(bot).register('archive_sweep', ArchiveSweeper(bot).sweep, interval=ARCHIVE_SWEEP_INTERVAL)
@@ -0,0 +1,135 @@
+"""
+Runs background jobs on exactly one replica at a time
+
+Each registered job has its own lease. Every replica's runner keeps trying to
+acquire it; the holder runs the job and renews the lease every ttl/3 seconds.
+If a renewal fails past the lease expiry the job is cancelled, and another
+replica takes over once the lease lapses. One-shot jobs (interval=None) run once
+per acquisition and the holder keeps the lease, so followers do not repeat them.
+"""
+import os
+import time
+import socket
+import asyncio
+import logging
+from typing import Awaitable, Callable, Dict, Optional
+from config.settings import LEASE_TTL
+from database.lease import Lease, create_lease_store
+from monitoring.metrics import registry
+
+logger = logging.getLogger(__name__)
+
+JOB_LEADER = registry.gauge(
+    "party_bot_job_leader", "1 while this replica holds the job's lease", ["job"])
+JOB_RUNS = registry.counter(
+    "party_bot_job_runs_total", "Background job runs by outcome", ["job", "outcome"])
+JOB_DURATION = registry.histogram(
+    "party_bot_job_seconds", "Duration of background job runs", ["job"])
+
+JobFunc = Callable[[Lease], Awaitable[None]]
+
+class Job:
+    """A registered background job"""
+    
+    def __init__(self, name: str, func: JobFunc, interval: Optional[float] = None):
+        self.name = name
+        self.func = func
+        self.interval = interval
+        self.lease: Optional[Lease] = None
+
+class JobRunner:
+    """Acquires, renews and releases one lease per job"""
+    
+    def __init__(self, store=None, holder: Optional[str] = None, ttl: float = LEASE_TTL):
+        self.store = store if store is not None else create_lease_store()
+        self.holder = holder or f"{socket.gethostname()}:{os.getpid()}"
+        self.ttl = ttl
+        self.jobs: Dict[str, Job] = {}
+        self._tasks: Dict[str, asyncio.Task] = {}
+    
+    def register(self, name: str, func: JobFunc, interval: Optional[float] = None):
+        """Register a job; it starts with the runner (or immediately if already running)"""
+        job = Job(name, func, interval)
+        self.jobs[name] = job
+        if self._tasks:
+            self._tasks[name] = asyncio.ensure_future(self._elect(job))
+    
+    def start(self):
+        """Start competing for every registered job's lease"""
+        for name, job in self.jobs.items():
+            if name not in self._tasks:
+                self._tasks[name] = asyncio.ensure_future(self._elect(job))
+    
+    async def stop(self):
+        """Cancel all jobs and release the leases this replica holds"""
+        tasks, self._tasks = list(self._tasks.values()), {}
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        for job in self.jobs.values():
+            if job.lease is not None:
+                await asyncio.to_thread(self.store.release, job.lease)
+                job.lease = None
+    
+    def is_leader(self, name: str) -> bool:
+        job = self.jobs.get(name)
+        return job is not None and job.lease is not None and job.lease.valid
+    
+    async def _elect(self, job: Job):
+        """Retry acquisition until this replica holds the lease, then run and renew"""
+        while True:
+            try:
+                lease = await asyncio.to_thread(self.store.acquire, job.name, self.holder, self.ttl)
+            except Exception:
+                lease = None  # Storage unreachable: logged by the store, try again later
+            if lease is None:
+                await asyncio.sleep(self.ttl / 2)
+                continue
+            
+            job.lease = lease
+            JOB_LEADER.labels(job=job.name).set(1)
+            logger.info("👑 Acquired lease %s (token %d)", job.name, lease.token)
+            work = asyncio.ensure_future(self._work(job, lease))
+            try:
+                await self._renew_until_lost(lease, work)
+            finally:
+                work.cancel()
+                job.lease = None
+                JOB_LEADER.labels(job=job.name).set(0)
+            logger.warning("Lost lease %s (token %d)", job.name, lease.token)
+    
+    async def _renew_until_lost(self, lease: Lease, work: asyncio.Future):
+        while True:
+            await asyncio.sleep(self.ttl / 3)
+            try:
+                if await asyncio.to_thread(self.store.renew, lease, self.ttl) is None:
+                    return
+            except Exception as e:
+                # Keep running while the lease has not expired; a later renewal may still succeed
+                logger.warning("Failed to renew lease %s: %s", lease.name, e)
+                if not lease.valid:
+                    return
+    
+    async def _work(self, job: Job, lease: Lease):
+        while True:
+            start = time.perf_counter()
+            try:
+                await job.func(lease)
+                JOB_RUNS.labels(job=job.name, outcome='success').inc()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                JOB_RUNS.labels(job=job.name, outcome='error').inc()
+                logger.exception("❌ Job %s failed: %s", job.name, e)
+            finally:
+                JOB_DURATION.labels(job=job.name).observe(time.perf_counter() - start)
+            if job.interval is None:
+                return
+            await asyncio.sleep(job.interval)
+
+def get_job_runner(bot) -> JobRunner:
+    """The bot's job runner, created on first use"""
+    runner = getattr(bot, 'job_runner', None)
+    if runner is None:
+        runner = bot.job_runner = JobRunner()
+    return runner
@@ -0,0 +1,154 @@
+"""
+Party scheduler: start reminders and signup auto-close from one min-heap timer
+
+Pending events live on the party documents (next_event_at, reminder_sent,
+signups_closed), so the queue survives restarts: the leader reloads everything
+due within the next refresh window with a single query on next_event_at and
+keeps it in a heap, sleeping until the earliest entry. Events are claimed in a
+transaction before they fire, so a replica that lost the lease cannot fire twice.
+"""
+import time
+import heapq
+import asyncio
+import logging
+from typing import Dict, List, Optional, Tuple
+import discord
+from config.settings import SCHEDULER_REFRESH, DM_CONCURRENCY
+from database.lease import Lease
+from database.models import Member, Party, SLOT_ROLES
+from database.party_operations import party_ops
+from jobs.runner import get_job_runner
+from monitoring.metrics import registry, discord_call
+from ui.views import PartyView, render_party_message
+from utils.work_scheduler import work_scheduler
+
+logger = logging.getLogger(__name__)
+
+SCHEDULED_EVENTS = registry.gauge(
+    "party_bot_scheduled_events", "Party events queued in the scheduler heap")
+EVENTS_FIRED = registry.counter(
+    "party_bot_scheduled_events_fired_total", "Scheduler events fired", ["kind"])
+EVENT_LATENESS = registry.histogram(
+    "party_bot_scheduled_event_lateness_seconds", "Delay between an event's due time and firing it",
+    buckets=(0.1, 0.5, 1.0, 5.0, 15.0, 60.0, 300.0, 900.0))
+REMINDER_DMS = registry.counter(
+    "party_bot_reminder_dms_total", "Start reminder DMs by outcome", ["outcome"])
+
+ROLE_NAMES = {'tank': 'Tank', 'healer': 'Healer', 'dps': 'DPS'}
+
+class PartyScheduler:
+    """Min-heap of (due time, party id) driven by a single sleeping task"""
+    
+    def __init__(self, bot, refresh: float = SCHEDULER_REFRESH, dm_concurrency: int = DM_CONCURRENCY):
+        self.bot = bot
+        self.refresh = refresh
+        self._heap: List[Tuple[int, str]] = []
+        # Latest due time per party; heap entries that disagree are stale and skipped
+        self._due: Dict[str, int] = {}
+        self._wakeup = asyncio.Event()
+        self._dm_slots = asyncio.Semaphore(dm_concurrency)
+    
+    def schedule(self, party_id: str, due: Optional[int]):
+        """Queue (or reschedule) a party's next event"""
+        if due is None:
+            self._due.pop(party_id, None)
+        elif self._due.get(party_id) != due:
+            self._due[party_id] = due
+            heapq.heappush(self._heap, (due, party_id))
+            if self._heap[0] == (due, party_id):
+                self._wakeup.set()
+        SCHEDULED_EVENTS.set(len(self._due))
+    
+    async def reload(self):
+        """Rebuild the queue from the store (one indexed query)"""
+        parties = await work_scheduler.run('background', None, party_ops.get_scheduled_parties,
+                                           time.time() + 2 * self.refresh)
+        self._heap.clear()
+        self._due.clear()
+        for party_data in parties:
+            self.schedule(party_data['id'], party_data.get('next_event_at'))
+        logger.debug("Scheduler loaded %d pending events", len(parties))
+    
+    async def run(self, lease: Lease):
+        """Fire due events until cancelled (the runner cancels this when the lease is lost)"""
+        next_reload = 0.0
+        tasks = set()
+        try:
+            while True:
+                now = time.time()
+                if now >= next_reload:
+                    await self.reload()
+                    next_reload = now + self.refresh
+                
+                while self._heap and self._heap[0][0] <= now:
+                    due, party_id = heapq.heappop(self._heap)
+                    if self._due.get(party_id) != due:
+                        continue
+                    del self._due[party_id]
+                    task = asyncio.ensure_future(self.fire(party_id, due))
+                    tasks.add(task)
+                    task.add_done_callback(tasks.discard)
+                SCHEDULED_EVENTS.set(len(self._due))
+                
+                wake_at = min(self._heap[0][0], next_reload) if self._heap else next_reload
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), max(0.0, wake_at - time.time()))
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            for task in tasks:
+                task.cancel()
+    
+    async def fire(self, party_id: str, due: int):
+        """Claim the event, then send reminders or close signups"""
+        claimed = await work_scheduler.run('background', None, party_ops.claim_party_event, party_id, due)
+        if claimed is None:
+            return
+        kind, party_data = claimed
+        EVENTS_FIRED.labels(kind=kind).inc()
+        EVENT_LATENESS.observe(max(0.0, time.time() - due))
+        
+        party = Party.from_dict(party_data)
+        if kind == 'reminder':
+            # The close event follows at the start time
+            self.schedule(party_id, party_data.get('next_event_at'))
+            await self.send_reminders(party)
+        else:
+            await self.refresh_message(party)
+    
+    async def send_reminders(self, party: Party):
+        """DM every signed-up member, a few at a time"""
+        members = [member for role in SLOT_ROLES for member in party.roles[role]]
+        await asyncio.gather(*(self._send_reminder(member, party) for member in members))
+        logger.info("⏰ Sent start reminders for party %s to %d members", party.id, len(members))
+    
+    async def _send_reminder(self, member: Member, party: Party):
+        link = f"https://discord.com/channels/{party.guild_id}/{party.channel_id}/{party.message_id}"
+        content = (f"⏰ **{party.name}** starts <t:{party.start_ts}:R>"
+                   f" - you're signed up as **{ROLE_NAMES[member.role]}**.\n{link}")
+        async with self._dm_slots, work_scheduler.slot('background', party.guild_id):
+            try:
+                with discord_call('send_dm'):
+                    channel = await self.bot.create_dm(discord.Object(id=member.user_id))
+                    await channel.send(content)
+                REMINDER_DMS.labels(outcome='sent').inc()
+            except discord.Forbidden:
+                # DMs closed for this user
+                REMINDER_DMS.labels(outcome='forbidden').inc()
+            except discord.HTTPException as e:
+                REMINDER_DMS.labels(outcome='error').inc()
+                logger.warning("Failed to DM reminder: %s", e, extra={'party_id': party.id})
+    
+    async def refresh_message(self, party: Party):
+        """Show the party as started and lock its join buttons"""
+        try:
+            view = PartyView(party.id, party.created_by).apply_state(party)
+            await render_party_message(self.bot, party, view, work_scheduler.slot('background', party.guild_id))
+        except Exception as e:
+            logger.warning("Failed to lock signups on message: %s", e, extra={'party_id': party.id})
+
+async def setup(bot):
+    """Register the scheduler with the bot's job runner"""
+    bot.party_scheduler = PartyScheduler(bot)
+    get_job_runner(bot).register('party_scheduler', bot.party_scheduler.run)
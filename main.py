@@ -2,57 +2,147 @@
 Discord Party Management Bot
 Main entry point and bot setup
 """
+from monitoring.boot import boot  # first import: starts the boot clock
+import logging
 import asyncio
 import sys
+from typing import Callable, List, Optional
 from discord.ext import commands
-from config.settings import DISCORD_TOKEN, COMMAND_PREFIX, get_bot_intents
+from config.settings import (DISCORD_TOKEN, COMMAND_PREFIX, METRICS_ENABLED, METRICS_HOST,
+                             METRICS_PORT, WARMUP_STORAGE, BOT_PROFILE, get_bot_intents, get_cache_options)
+from database.firebase_client import firebase_client
+from monitoring.metrics import install_rate_limit_counter
+from monitoring.server import MetricsServer
+from monitoring.tracing import tracer
+from monitoring.recorder import recorder
+from monitoring.watchdog import watchdog
+from monitoring.log_config import setup_logging, shutdown_logging
+from utils.command_sync import sync_commands
 
-# Create bot instance
-bot = commands.Bot(command_prefix=COMMAND_PREFIX, intents=get_bot_intents())
+logger = logging.getLogger(__name__)
 
-async def load_extensions():
-    """Load all bot extensions/cogs"""
-    extensions = [
-        'events.bot_events',
-        'commands.party_commands',
-        'commands.admin_commands'
-    ]
+EXTENSIONS = [
+    'events.bot_events',
+    'events.orphan_reaper',
+    'commands.party_commands',
+    'commands.admin_commands',
+    'jobs.archive',
+    'jobs.scheduler'
+]
+
+class StartupHooks:
+    """setup_hook shared by the bot classes: runs after login, before the gateway connects"""
     
-    for extension in extensions:
+    async def setup_hook(self):
+        boot.mark('login')
+        # Pay credential parsing and gRPC channel setup now instead of on the first interaction
+        if WARMUP_STORAGE:
+            with boot.phase('storage_warmup'):
+                try:
+                    await asyncio.to_thread(firebase_client.warm_up)
+                except Exception as e:
+                    logger.error("❌ Storage warmup failed: %s", e)
+        
+        with boot.phase('command_sync'):
+            try:
+                await sync_commands(self)
+            except Exception as e:
+                logger.error("❌ Command sync failed: %s", e)
+
+class PartyBot(StartupHooks, commands.Bot):
+    """Single-process bot"""
+
+class ShardedPartyBot(StartupHooks, commands.AutoShardedBot):
+    """Auto-sharded bot used by cluster workers"""
+
+def create_bot(shard_ids: Optional[List[int]] = None, shard_count: Optional[int] = None,
+               profile: str = BOT_PROFILE) -> commands.Bot:
+    """Create the bot; with shard ids it runs an auto-sharded bot over just those shards"""
+    options = get_cache_options(profile)
+    if shard_ids is not None:
+        return ShardedPartyBot(
+            command_prefix=COMMAND_PREFIX,
+            intents=get_bot_intents(profile),
+            shard_ids=shard_ids,
+            shard_count=shard_count,
+            **options
+        )
+    return PartyBot(command_prefix=COMMAND_PREFIX, intents=get_bot_intents(profile), **options)
+
+async def load_extensions(bot: commands.Bot):
+    """Load all bot extensions/cogs"""
+    for extension in EXTENSIONS:
         try:
             await bot.load_extension(extension)
-            print(f"✅ Loaded {extension}")
+            logger.info("✅ Loaded %s", extension)
         except Exception as e:
-            print(f"❌ Failed to load {extension}: {e}")
+            logger.error("❌ Failed to load %s: %s", extension, e)
             return False
     
     return True
 
-async def main():
-    """Main function to start the bot"""
+def readiness_checks(bot: commands.Bot) -> Callable[[], dict]:
+    """Build the checks reported by the /readyz route"""
+    def checks() -> dict:
+        return {
+            'discord_ready': bot.is_ready(),
+            'firebase_initialized': firebase_client.is_initialized
+        }
+    return checks
+
+async def run_bot(bot: commands.Bot, metrics_port: int = METRICS_PORT):
+    """Load extensions, start the metrics endpoint and run the bot until it stops"""
     if not DISCORD_TOKEN:
-        print("❌ No Discord token found in environment variables!")
+        logger.critical("❌ No Discord token found in environment variables!")
         sys.exit(1)
     
+    boot.mark_imports()
+    
     # Load extensions
-    success = await load_extensions()
+    with boot.phase('extensions'):
+        success = await load_extensions(bot)
     if not success:
-        print("❌ Failed to load extensions!")
+        logger.critical("❌ Failed to load extensions!")
         sys.exit(1)
     
+    # Start the metrics endpoint
+    install_rate_limit_counter()
+    metrics_server = None
+    if METRICS_ENABLED:
+        metrics_server = MetricsServer(METRICS_HOST, metrics_port, readiness_checks(bot))
+        try:
+            await metrics_server.start()
+        except OSError as e:
+            logger.error("❌ Failed to start metrics server: %s", e)
+            metrics_server = None
+    watchdog.start()
+    
     # Start the bot
     try:
         await bot.start(DISCORD_TOKEN)
     except KeyboardInterrupt:
-        print("\n🛑 Bot stopped by user")
+        logger.info("🛑 Bot stopped by user")
     except Exception as e:
-        print(f"❌ Bot error: {e}")
+        logger.exception("❌ Bot error: %s", e)
     finally:
         await bot.close()
+        watchdog.stop()
+        if metrics_server:
+            await metrics_server.stop()
+        tracer.shutdown()
+        recorder.shutdown()
+
+async def main():
+    """Main function to start the bot"""
+    await run_bot(create_bot())
 
 if __name__ == "__main__":
+    setup_logging()
+    
     # Run the bot
     try:
         asyncio.run(main())
     except KeyboardInterrupt:
-        print("\n🛑 Shutdown completed")
\ No newline at end of file
+        logger.info("🛑 Shutdown completed")
+    finally:
+        shutdown_logging()
\ No newline at end of file
@@ -0,0 +1 @@
+"""Versioned schema migrations for Firestore collections (run with python -m migrations)"""
@@ -0,0 +1,45 @@
+"""
+Run schema migrations
+
+Usage: python -m migrations [--status] [--dry-run] [--rate DOCS_PER_SEC] [--page-size N] [--target VERSION]
+"""
+import sys
+import argparse
+import logging
+from config.settings import MIGRATION_PAGE_SIZE, MIGRATION_RATE
+from monitoring.log_config import setup_logging, shutdown_logging
+from migrations.runner import MigrationRunner, status
+
+logger = logging.getLogger(__name__)
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Apply versioned schema migrations with checkpoints")
+    parser.add_argument('--status', action='store_true', help='list migrations and their checkpoints')
+    parser.add_argument('--dry-run', action='store_true', help='scan and count changes without writing')
+    parser.add_argument('--rate', type=float, default=MIGRATION_RATE, help='max documents per second (0 = no limit)')
+    parser.add_argument('--page-size', type=int, default=MIGRATION_PAGE_SIZE, help='documents per page/batch (max 500)')
+    parser.add_argument('--target', type=int, default=None, help='stop after this version')
+    args = parser.parse_args()
+    
+    if args.status:
+        for row in status():
+            mark = '✅' if row['applied'] else ('⏸️' if row['status'] == 'running' else '⏳')
+            print(f"{mark} v{row['version']:03d} {row['name']} [{row['collection']}] {row['status']}"
+                  f" ({row['scanned']} scanned, {row['updated']} updated) - {row['description']}")
+        return 0
+    
+    runner = MigrationRunner(page_size=args.page_size, rate=args.rate, dry_run=args.dry_run)
+    try:
+        reports = runner.run(args.target)
+    except Exception as e:
+        logger.critical("❌ Migration failed: %s", e)
+        return 1
+    return 0 if all(report.completed or report.dry_run for report in reports) else 1
+
+if __name__ == "__main__":
+    setup_logging()
+    try:
+        code = main()
+    finally:
+        shutdown_logging()
+    sys.exit(code)
@@ -0,0 +1,229 @@
+"""
+Schema migration runner
+
+Migration scripts live next to this module as vNNN_<name>.py and define:
+- VERSION: int, applied in increasing order
+- COLLECTION: the collection the script walks (e.g. 'parties', 'events')
+- DESCRIPTION: one line for --status
+- migrate(doc_id, data) -> Optional[dict]: the update for one document, None to leave it as is.
+  Must be idempotent: after a crash the last page before the checkpoint is processed again.
+
+Documents are streamed in document-id order, one page at a time; each page is written in one
+batch and followed by a checkpoint in bot_state/migration_NNNN, so an interrupted run resumes
+after the last committed page. A 'migrations' lease keeps two runners from overlapping.
+"""
+import os
+import re
+import time
+import socket
+import logging
+import pkgutil
+import importlib
+from typing import Callable, Dict, List, Optional
+from config.settings import MIGRATION_PAGE_SIZE, MIGRATION_RATE, LEASE_TTL
+from database.bot_state import bot_state
+from database.firebase_client import get_db, get_firestore
+from database.lease import Lease, create_lease_store
+from database.party_operations import party_ops
+
+logger = logging.getLogger(__name__)
+
+SCRIPT_PATTERN = re.compile(r'^v(\d+)_\w+$')
+
+class MigrationScript:
+    """One versioned migration module"""
+    
+    def __init__(self, module):
+        self.module = module
+        self.version: int = module.VERSION
+        self.collection: str = module.COLLECTION
+        self.description: str = getattr(module, 'DESCRIPTION', '')
+        self.migrate: Callable[[str, Dict], Optional[Dict]] = module.migrate
+    
+    @property
+    def name(self) -> str:
+        return self.module.__name__.rpartition('.')[2]
+
+class MigrationReport:
+    """Outcome of running one migration"""
+    
+    def __init__(self, script: MigrationScript, dry_run: bool):
+        self.script = script
+        self.dry_run = dry_run
+        self.scanned = 0
+        self.updated = 0
+        self.pages = 0
+        self.seconds = 0.0
+        self.completed = False
+    
+    @property
+    def docs_per_second(self) -> float:
+        return self.scanned / self.seconds if self.seconds else 0.0
+    
+    def __str__(self) -> str:
+        mode = 'dry run' if self.dry_run else ('done' if self.completed else 'stopped')
+        return (f"{self.script.name}: {self.scanned} scanned, {self.updated} "
+                f"{'would change' if self.dry_run else 'updated'} in {self.seconds:.1f}s "
+                f"({self.docs_per_second:.0f} docs/s, {mode})")
+
+def discover() -> List[MigrationScript]:
+    """All migration scripts in this package, ordered by version"""
+    import migrations
+    scripts = []
+    for module_info in pkgutil.iter_modules(migrations.__path__):
+        if SCRIPT_PATTERN.match(module_info.name):
+            scripts.append(MigrationScript(importlib.import_module(f'migrations.{module_info.name}')))
+    scripts.sort(key=lambda script: script.version)
+    versions = [script.version for script in scripts]
+    if len(set(versions)) != len(versions):
+        raise ValueError(f"Duplicate migration versions: {versions}")
+    return scripts
+
+class MigrationRunner:
+    """Applies pending migrations page by page with checkpoints"""
+    
+    def __init__(self, page_size: int = MIGRATION_PAGE_SIZE, rate: float = MIGRATION_RATE,
+                 dry_run: bool = False, holder: Optional[str] = None):
+        self.page_size = max(1, min(500, page_size))
+        self.rate = rate
+        self.dry_run = dry_run
+        self.holder = holder or f"migrate:{socket.gethostname()}:{os.getpid()}"
+        self.store = create_lease_store()
+        self._lease: Optional[Lease] = None
+    
+    def pending(self, target: Optional[int] = None) -> List[MigrationScript]:
+        """Scripts newer than the stored schema version, up to target"""
+        current = bot_state.get_schema_version()
+        return [script for script in discover()
+                if script.version > current and (target is None or script.version <= target)]
+    
+    def run(self, target: Optional[int] = None) -> List[MigrationReport]:
+        """Apply pending migrations in order; stops at the first one that does not complete"""
+        scripts = self.pending(target)
+        if not scripts:
+            logger.info("✅ Schema is up to date")
+            return []
+        
+        if not self.dry_run:
+            self._lease = self.store.acquire('migrations', self.holder, LEASE_TTL)
+            if self._lease is None:
+                raise RuntimeError("Another migration runner holds the 'migrations' lease")
+        
+        reports = []
+        try:
+            for script in scripts:
+                report = self.apply(script)
+                reports.append(report)
+                logger.info("📦 %s", report)
+                if not (report.completed or self.dry_run):
+                    break
+        finally:
+            if self._lease is not None:
+                self.store.release(self._lease)
+                self._lease = None
+        return reports
+    
+    def _keep_lease(self) -> bool:
+        # Fencing: renew before every write so a runner that lost the lease stops writing
+        if self._lease is None:
+            return True
+        self._lease = self.store.renew(self._lease, LEASE_TTL)
+        return self._lease is not None
+    
+    def _throttle(self, scanned: int, started: float):
+        if self.rate > 0:
+            ahead = scanned / self.rate - (time.perf_counter() - started)
+            if ahead > 0:
+                time.sleep(ahead)
+    
+    def apply(self, script: MigrationScript) -> MigrationReport:
+        """Run one migration from its checkpoint to the end of the collection"""
+        report = MigrationReport(script, self.dry_run)
+        db = get_db()
+        collection = db.collection(script.collection)
+        
+        state = {} if self.dry_run else bot_state.get_migration_state(script.version)
+        if state.get('status') == 'done':
+            report.completed = True
+            return report
+        
+        # Cursor by document id, so resuming works even if that document was deleted since
+        last_doc_id = state.get('last_doc_id')
+        if last_doc_id:
+            logger.info("↩️ Resuming %s after %s (%d scanned before)", script.name, last_doc_id,
+                        state.get('scanned', 0))
+        scanned_before = state.get('scanned', 0)
+        updated_before = state.get('updated', 0)
+        
+        started = time.perf_counter()
+        order = get_firestore().FieldPath.document_id()
+        while True:
+            query = collection.order_by(order).limit(self.page_size)
+            if last_doc_id:
+                query = query.start_after({order: last_doc_id})
+            docs = list(query.stream())
+            if not docs:
+                report.completed = True
+                break
+            
+            batch = db.batch()
+            changed = []
+            for doc in docs:
+                updates = script.migrate(doc.id, doc.to_dict() or {})
+                if updates:
+                    batch.update(doc.reference, updates)
+                    changed.append(doc.id)
+            
+            if not self.dry_run:
+                if not self._keep_lease():
+                    logger.warning("Lease 'migrations' lost, stopping %s", script.name)
+                    break
+                if changed:
+                    batch.commit()
+                    if script.collection == 'parties':
+                        for party_id in changed:
+                            party_ops.invalidate(party_id)
+                bot_state.save_migration_state(script.version, {
+                    'name': script.name,
+                    'status': 'running',
+                    'last_doc_id': docs[-1].id,
+                    'scanned': scanned_before + report.scanned + len(docs),
+                    'updated': updated_before + report.updated + len(changed)
+                })
+            
+            report.pages += 1
+            report.scanned += len(docs)
+            report.updated += len(changed)
+            report.seconds = time.perf_counter() - started
+            logger.info("%s page %d: %d scanned, %d %s (%.0f docs/s)", script.name, report.pages, report.scanned,
+                        report.updated, 'would change' if self.dry_run else 'updated', report.docs_per_second)
+            
+            last_doc_id = docs[-1].id
+            if len(docs) < self.page_size:
+                report.completed = True
+                break
+            self._throttle(report.scanned, started)
+        
+        report.seconds = time.perf_counter() - started
+        if report.completed and not self.dry_run:
+            bot_state.save_migration_state(script.version, {'status': 'done'})
+            bot_state.set_schema_version(script.version)
+        return report
+
+def status() -> List[Dict]:
+    """Every known migration with its stored checkpoint"""
+    current = bot_state.get_schema_version()
+    rows = []
+    for script in discover():
+        state = bot_state.get_migration_state(script.version)
+        rows.append({
+            'version': script.version,
+            'name': script.name,
+            'collection': script.collection,
+            'description': script.description,
+            'applied': script.version <= current,
+            'status': state.get('status', 'pending'),
+            'scanned': state.get('scanned', 0),
+            'updated': state.get('updated', 0)
+        })
+    return rows
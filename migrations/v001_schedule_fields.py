@@ -0,0 +1,19 @@
+"""
+Backfill scheduler fields on parties created before the party scheduler existed
+
+Without next_event_at those parties never get start reminders or a signup close.
+"""
+import time
+from typing import Dict, Optional
+from database.party_operations import schedule_fields
+
+VERSION = 1
+COLLECTION = 'parties'
+DESCRIPTION = "Add reminder_at/next_event_at/signups_closed to parties that predate the scheduler"
+
+def migrate(doc_id: str, data: Dict) -> Optional[Dict]:
+    if 'next_event_at' in data:
+        return None
+    now = time.time()
+    party_timestamp = data.get('party_timestamp')
+    return schedule_fields(party_timestamp, now)
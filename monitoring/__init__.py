@@ -0,0 +1,2 @@
+# monitoring/__init__.py
+"""Metrics and diagnostics package for the Discord Party Bot"""
@@ -0,0 +1,63 @@
+"""
+Boot phase timing: how long imports, extension loading, backend warmup, login
+and the gateway handshake took, logged once at ready and exported as gauges
+"""
+import time
+import logging
+from contextlib import contextmanager
+from typing import Dict
+from config.settings import IMPORT_TIME_BUDGET
+from monitoring.metrics import registry
+
+logger = logging.getLogger(__name__)
+
+BOOT_PHASE_SECONDS = registry.gauge(
+    "party_bot_boot_phase_seconds", "Duration of each startup phase of this process", ["phase"])
+
+class BootTimer:
+    """Records consecutive startup phases, starting from this module's import"""
+    
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.phases: Dict[str, float] = {}
+        self._last = self.started
+        self.reported = False
+    
+    def mark(self, name: str) -> float:
+        """End the phase that began at the previous mark"""
+        now = time.perf_counter()
+        duration = now - self._last
+        self._last = now
+        self.phases[name] = duration
+        BOOT_PHASE_SECONDS.labels(phase=name).set(duration)
+        return duration
+    
+    @contextmanager
+    def phase(self, name: str):
+        """Time a block as its own phase"""
+        self._last = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.mark(name)
+    
+    def mark_imports(self):
+        """End the import phase and warn if it exceeded the budget"""
+        duration = self.mark('imports')
+        if duration > IMPORT_TIME_BUDGET:
+            logger.warning("⏱️ Imports took %.2fs (budget %.2fs); run python -m benchmarks.bench_import_time",
+                           duration, IMPORT_TIME_BUDGET)
+    
+    def report(self):
+        """Log all phases once, when the bot first becomes ready"""
+        if self.reported:
+            return
+        self.reported = True
+        total = time.perf_counter() - self.started
+        BOOT_PHASE_SECONDS.labels(phase='total').set(total)
+        summary = ', '.join(f"{name}={seconds:.2f}s" for name, seconds in self.phases.items())
+        logger.info("🚀 Ready %.2fs after start (%s)", total, summary,
+                    extra={'boot_phases': {name: round(s, 4) for name, s in self.phases.items()}})
+
+# Global timer; importing this module first in an entry point starts the clock
+boot = BootTimer()
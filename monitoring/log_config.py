@@ -0,0 +1,83 @@
+"""
+Logging setup: a queue-based handler so log writes happen off the event loop
+"""
+import sys
+import json
+import queue
+import logging
+import logging.handlers
+from typing import Dict, Optional, TextIO
+from config.settings import LOG_LEVEL, LOG_LEVELS, LOG_FORMAT
+
+# Attributes every LogRecord has; anything else was passed through extra= and is structured data
+_RESERVED_ATTRS = frozenset(vars(logging.LogRecord('', 0, '', 0, '', None, None))) | {'message', 'asctime'}
+
+_listener: Optional[logging.handlers.QueueListener] = None
+
+class JsonFormatter(logging.Formatter):
+    """Formats records as one JSON object per line, including extra= fields"""
+    
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            'ts': self.formatTime(record, '%Y-%m-%dT%H:%M:%S'),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage()
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RESERVED_ATTRS and not key.startswith('_'):
+                entry[key] = value
+        if record.exc_info:
+            entry['exc_info'] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+class TextFormatter(logging.Formatter):
+    """Human readable format that appends extra= fields as key=value pairs"""
+    
+    def __init__(self):
+        super().__init__('%(asctime)s %(levelname)-7s %(name)s: %(message)s', '%Y-%m-%d %H:%M:%S')
+    
+    def format(self, record: logging.LogRecord) -> str:
+        text = super().format(record)
+        extras = [f"{key}={value}" for key, value in record.__dict__.items()
+                  if key not in _RESERVED_ATTRS and not key.startswith('_')]
+        return f"{text} {' '.join(extras)}" if extras else text
+
+def parse_module_levels(raw: str) -> Dict[str, str]:
+    """Parse "database=DEBUG,discord=WARNING" into a {logger: level} dict"""
+    levels = {}
+    for entry in raw.split(','):
+        name, _, level = entry.strip().partition('=')
+        if name.strip() and level.strip():
+            levels[name.strip()] = level.strip().upper()
+    return levels
+
+def setup_logging(level: str = LOG_LEVEL, module_levels: str = LOG_LEVELS, fmt: str = LOG_FORMAT,
+                  stream: Optional[TextIO] = None):
+    """Route all logging through a queue drained by a background thread (to stdout unless stream is given)"""
+    global _listener
+    if _listener is not None:
+        return
+    
+    stream_handler = logging.StreamHandler(stream or sys.stdout)
+    stream_handler.setFormatter(JsonFormatter() if fmt == 'json' else TextFormatter())
+    
+    log_queue = queue.SimpleQueue()
+    _listener = logging.handlers.QueueListener(log_queue, stream_handler, respect_handler_level=True)
+    _listener.start()
+    
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(logging.handlers.QueueHandler(log_queue))
+    root.setLevel(level.upper())
+    
+    for name, module_level in parse_module_levels(module_levels).items():
+        logging.getLogger(name).setLevel(module_level)
+
+def shutdown_logging():
+    """Flush queued records and stop the listener thread"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
@@ -0,0 +1,331 @@
+"""
+In-process metrics registry with Prometheus text exposition
+"""
+import time
+import logging
+import threading
+import inspect
+import contextlib
+import functools
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+from monitoring.tracing import tracer
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+_INF_LABEL = 'le="+Inf"'
+
+def _format_labels(names: Tuple[str, ...], values: Tuple[str, ...], extra: str = "") -> str:
+    """Format label pairs as {a="1",b="2"}"""
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+class _Metric:
+    """Base class for labelled metrics"""
+    metric_type = "untyped"
+    
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._children = {}
+    
+    def labels(self, **labels):
+        """Get the child metric for a set of label values"""
+        key = tuple(str(labels.get(name, "")) for name in self.labelnames)
+        child = self._children.get(key)
+        if child is None:
+            with self._lock:
+                child = self._children.setdefault(key, self._new_child())
+        return child
+    
+    def _new_child(self):
+        raise NotImplementedError
+    
+    def _default(self):
+        """Child used when the metric has no labels"""
+        return self.labels()
+    
+    def collect(self) -> List[str]:
+        """Render this metric in Prometheus text format"""
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.metric_type}"]
+        for key, child in sorted(self._children.items()):
+            lines.extend(child.render(self.name, self.labelnames, key))
+        return lines
+
+class _CounterChild:
+    def __init__(self):
+        self._value = 0.0
+        self._lock = threading.Lock()
+    
+    def inc(self, amount: float = 1.0):
+        with self._lock:
+            self._value += amount
+    
+    @property
+    def value(self) -> float:
+        return self._value
+    
+    def render(self, name, labelnames, key) -> List[str]:
+        return [f"{name}{_format_labels(labelnames, key)} {_format_value(self._value)}"]
+
+class Counter(_Metric):
+    """Monotonically increasing counter"""
+    metric_type = "counter"
+    
+    def _new_child(self):
+        return _CounterChild()
+    
+    def inc(self, amount: float = 1.0):
+        self._default().inc(amount)
+
+class _GaugeChild(_CounterChild):
+    def set(self, value: float):
+        with self._lock:
+            self._value = value
+    
+    def dec(self, amount: float = 1.0):
+        self.inc(-amount)
+
+class Gauge(_Metric):
+    """Value that can go up and down"""
+    metric_type = "gauge"
+    
+    def _new_child(self):
+        return _GaugeChild()
+    
+    def set(self, value: float):
+        self._default().set(value)
+
+class _HistogramChild:
+    def __init__(self, buckets: Tuple[float, ...]):
+        self._buckets = buckets
+        self._counts = [0] * len(buckets)
+        self._sum = 0.0
+        self._count = 0
+        self._lock = threading.Lock()
+    
+    def observe(self, value: float):
+        with self._lock:
+            self._sum += value
+            self._count += 1
+            for i, bound in enumerate(self._buckets):
+                if value <= bound:
+                    self._counts[i] += 1
+                    break
+    
+    def time(self):
+        """Context manager that observes the elapsed time of its block"""
+        return _Timer(self.observe)
+    
+    @property
+    def count(self) -> int:
+        return self._count
+    
+    @property
+    def sum(self) -> float:
+        return self._sum
+    
+    def render(self, name, labelnames, key) -> List[str]:
+        lines = []
+        cumulative = 0
+        for bound, count in zip(self._buckets, self._counts):
+            cumulative += count
+            le = 'le="' + _format_value(bound) + '"'
+            lines.append(f"{name}_bucket{_format_labels(labelnames, key, le)} {cumulative}")
+        lines.append(f"{name}_bucket{_format_labels(labelnames, key, _INF_LABEL)} {self._count}")
+        lines.append(f"{name}_sum{_format_labels(labelnames, key)} {_format_value(self._sum)}")
+        lines.append(f"{name}_count{_format_labels(labelnames, key)} {self._count}")
+        return lines
+
+class Histogram(_Metric):
+    """Distribution of observed values in cumulative buckets"""
+    metric_type = "histogram"
+    
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = (),
+                 buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+    
+    def _new_child(self):
+        return _HistogramChild(self.buckets)
+    
+    def observe(self, value: float):
+        self._default().observe(value)
+    
+    def time(self, **labels):
+        """Context manager that observes the elapsed time of its block"""
+        return self.labels(**labels).time()
+
+class _Timer:
+    """Context manager measuring wall time with perf_counter"""
+    
+    def __init__(self, callback: Callable[[float], None]):
+        self._callback = callback
+        self._start = None
+    
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        self._callback(time.perf_counter() - self._start)
+        return False
+
+class MetricsRegistry:
+    """Holds all metrics and renders them for the /metrics endpoint"""
+    
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._collectors: List[Callable[[], None]] = []
+    
+    def register(self, metric: _Metric) -> _Metric:
+        """Register a metric, returning the existing one if the name is taken"""
+        return self._metrics.setdefault(metric.name, metric)
+    
+    def counter(self, name: str, documentation: str, labelnames: Iterable[str] = ()) -> Counter:
+        return self.register(Counter(name, documentation, labelnames))
+    
+    def gauge(self, name: str, documentation: str, labelnames: Iterable[str] = ()) -> Gauge:
+        return self.register(Gauge(name, documentation, labelnames))
+    
+    def histogram(self, name: str, documentation: str, labelnames: Iterable[str] = (),
+                  buckets: Tuple[float, ...] = DEFAULT_BUCKETS) -> Histogram:
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+    
+    def add_collector(self, collector: Callable[[], None]):
+        """Register a callback that refreshes gauges right before rendering"""
+        self._collectors.append(collector)
+    
+    def get(self, name: str) -> Optional[_Metric]:
+        return self._metrics.get(name)
+    
+    def render(self) -> str:
+        """Render all metrics in Prometheus text format"""
+        for collector in self._collectors:
+            try:
+                collector()
+            except Exception as e:
+                logger.warning("❌ Metrics collector failed: %s", e)
+        
+        lines = []
+        for metric in self._metrics.values():
+            lines.extend(metric.collect())
+        return "\n".join(lines) + "\n"
+
+# Global registry
+registry = MetricsRegistry()
+
+FIRESTORE_LATENCY = registry.histogram(
+    "party_bot_firestore_operation_seconds", "Latency of Firestore operations", ["operation"])
+FIRESTORE_ERRORS = registry.counter(
+    "party_bot_firestore_errors_total", "Firestore operations that raised an error", ["operation"])
+DISCORD_REQUEST_LATENCY = registry.histogram(
+    "party_bot_discord_request_seconds", "Latency of Discord REST calls made by handlers", ["route"])
+DISCORD_RATE_LIMITS = registry.counter(
+    "party_bot_discord_rate_limits_total", "Discord 429 responses seen by the HTTP client", ["scope"])
+INTERACTION_LATENCY = registry.histogram(
+    "party_bot_interaction_seconds", "Time spent in interaction handlers", ["handler"])
+INTERACTION_ERRORS = registry.counter(
+    "party_bot_interaction_errors_total", "Interaction handlers that raised an error", ["handler"])
+CACHE_HITS = registry.gauge("party_bot_cache_hits", "Cache hits since start", ["cache"])
+CACHE_MISSES = registry.gauge("party_bot_cache_misses", "Cache misses since start", ["cache"])
+CACHE_SIZE = registry.gauge("party_bot_cache_entries", "Entries currently cached", ["cache"])
+
+def register_cache(name: str, cache):
+    """Export hit/miss/size gauges for an LRUCache-like object"""
+    def collect():
+        CACHE_HITS.labels(cache=name).set(cache.hits)
+        CACHE_MISSES.labels(cache=name).set(cache.misses)
+        CACHE_SIZE.labels(cache=name).set(len(cache))
+    registry.add_collector(collect)
+
+def timed_operation(operation: str):
+    """Decorator recording latency and a trace span for a synchronous storage operation"""
+    def decorator(func):
+        histogram = FIRESTORE_LATENCY.labels(operation=operation)
+        span_name = f"firestore.{operation}"
+        attribute_positions = _attribute_positions(func, ('party_id', 'guild_id'))
+        
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            attributes = _extract_attributes(attribute_positions, args, kwargs)
+            with tracer.start_span(span_name, **attributes), histogram.time():
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+def _attribute_positions(func, names: Tuple[str, ...]) -> Dict[str, int]:
+    """Map parameter names to their positional index in func's signature"""
+    params = list(inspect.signature(func).parameters)
+    return {name: params.index(name) for name in names if name in params}
+
+def _extract_attributes(positions: Dict[str, int], args: tuple, kwargs: dict) -> dict:
+    attributes = {}
+    for name, index in positions.items():
+        if name in kwargs:
+            attributes[name] = kwargs[name]
+        elif index < len(args):
+            attributes[name] = args[index]
+    return attributes
+
+def record_firestore_error(operation: str):
+    """Count a failed Firestore operation"""
+    FIRESTORE_ERRORS.labels(operation=operation).inc()
+
+def observe_interaction(handler: str):
+    """Decorator recording latency, errors and a root trace span for an interaction handler"""
+    def decorator(func):
+        histogram = INTERACTION_LATENCY.labels(handler=handler)
+        
+        @functools.wraps(func)
+        async def wrapper(self, interaction, *args, **kwargs):
+            root = tracer.start_root(
+                f"interaction.{handler}",
+                command=handler,
+                guild_id=getattr(interaction, 'guild_id', None),
+                party_id=getattr(self, 'party_id', None)
+            )
+            try:
+                with root, histogram.time():
+                    return await func(self, interaction, *args, **kwargs)
+            except Exception:
+                INTERACTION_ERRORS.labels(handler=handler).inc()
+                raise
+        return wrapper
+    return decorator
+
+@contextlib.contextmanager
+def discord_call(route: str, **attributes):
+    """Context manager timing and tracing a Discord REST call"""
+    with tracer.start_span(f"discord.{route}", **attributes), DISCORD_REQUEST_LATENCY.time(route=route):
+        yield
+
+class RateLimitLogHandler(logging.Handler):
+    """Counts the 429 warnings discord.py logs from its HTTP client"""
+    
+    def emit(self, record: logging.LogRecord):
+        try:
+            message = record.getMessage()
+        except Exception:
+            return
+        if "rate limit" in message.lower() or "429" in message:
+            scope = "global" if "global" in message.lower() else "route"
+            DISCORD_RATE_LIMITS.labels(scope=scope).inc()
+
+def install_rate_limit_counter():
+    """Attach the 429 counter to discord.py's HTTP logger"""
+    logger = logging.getLogger("discord.http")
+    if not any(isinstance(h, RateLimitLogHandler) for h in logger.handlers):
+        logger.addHandler(RateLimitLogHandler(level=logging.WARNING))
@@ -0,0 +1,146 @@
+"""
+Bounded on-demand profiling of the running bot
+
+CPU mode enables cProfile on the event loop thread for the window, so it sees every
+handler, view and background task (storage calls running in worker threads show up as
+time awaited, not as their own frames). Memory mode compares tracemalloc snapshots taken
+at the start and end of the window and lists the top allocation sites. Only one profile
+runs at a time; a second request fails fast with ProfileBusy.
+"""
+import io
+import time
+import pstats
+import asyncio
+import cProfile
+import logging
+import datetime
+import tracemalloc
+from typing import Optional
+from config.settings import PROFILE_MAX_SECONDS, PROFILE_TOP_N
+from monitoring.metrics import registry
+
+logger = logging.getLogger(__name__)
+
+PROFILE_MODES = ('cpu', 'memory')
+# Selector waits: time the loop spent idle, not running Python
+IDLE_CALLS = ("<method 'poll' of", "<method 'select' of", "<method 'control' of")
+TRACEMALLOC_FRAMES = 10
+
+PROFILE_RUNS = registry.counter(
+    "party_bot_profiles_total", "On-demand profiles by mode and outcome",
+    ["mode", "outcome"])
+
+class ProfileBusy(Exception):
+    """Another profile is already running"""
+
+class ProfileResult:
+    """A finished profile: a text report and the name to attach it under"""
+    
+    def __init__(self, mode: str, seconds: int, report: str, summary: str):
+        self.mode = mode
+        self.seconds = seconds
+        self.report = report
+        self.summary = summary
+        stamp = datetime.datetime.now(datetime.timezone.utc).strftime('%Y%m%d-%H%M%S')
+        self.filename = f"profile-{mode}-{stamp}.txt"
+
+class Profiler:
+    """Runs one bounded profile at a time on the event loop"""
+    
+    def __init__(self, max_seconds: int = PROFILE_MAX_SECONDS, top_n: int = PROFILE_TOP_N):
+        self.max_seconds = max_seconds
+        self.top_n = top_n
+        self.running: Optional[str] = None
+    
+    def clamp(self, seconds: int) -> int:
+        return max(1, min(self.max_seconds, int(seconds)))
+    
+    async def run(self, mode: str, seconds: int) -> ProfileResult:
+        """Profile for seconds (clamped to max_seconds), raises ProfileBusy if one is running"""
+        if mode not in PROFILE_MODES:
+            raise ValueError(f"Unknown profile mode {mode!r}, expected one of {', '.join(PROFILE_MODES)}")
+        if self.running is not None:
+            PROFILE_RUNS.labels(mode=mode, outcome='busy').inc()
+            raise ProfileBusy(f"A {self.running} profile is already running")
+        seconds = self.clamp(seconds)
+        self.running = mode
+        logger.info("🔬 Starting %s profile for %ds", mode, seconds)
+        try:
+            if mode == 'cpu':
+                result = await self._cpu(seconds)
+            else:
+                result = await self._memory(seconds)
+        except Exception:
+            PROFILE_RUNS.labels(mode=mode, outcome='error').inc()
+            raise
+        finally:
+            self.running = None
+        PROFILE_RUNS.labels(mode=mode, outcome='ok').inc()
+        logger.info("🔬 Finished %s profile: %s", mode, result.summary)
+        return result
+    
+    async def _cpu(self, seconds: int) -> ProfileResult:
+        profile = cProfile.Profile()
+        started = time.perf_counter()
+        profile.enable()
+        try:
+            await asyncio.sleep(seconds)
+        finally:
+            profile.disable()
+        elapsed = time.perf_counter() - started
+        
+        out = io.StringIO()
+        stats = pstats.Stats(profile, stream=out)
+        idle = sum(entry[2] for (_, _, name), entry in stats.stats.items() if name.startswith(IDLE_CALLS))
+        busy = max(0.0, stats.total_tt - idle) / elapsed
+        out.write(f"CPU profile of the event loop thread, {elapsed:.1f}s window\n")
+        out.write(f"{stats.total_calls} calls, {idle:.3f}s idle in the selector, loop {busy:.0%} busy\n\n")
+        out.write(f"=== Top {self.top_n} by own time ===\n")
+        stats.sort_stats(pstats.SortKey.TIME).print_stats(self.top_n)
+        out.write(f"=== Top {self.top_n} by cumulative time ===\n")
+        stats.sort_stats(pstats.SortKey.CUMULATIVE).print_stats(self.top_n)
+        summary = f"{stats.total_calls} calls, loop {busy:.0%} busy over {elapsed:.1f}s"
+        return ProfileResult('cpu', seconds, out.getvalue(), summary)
+    
+    async def _memory(self, seconds: int) -> ProfileResult:
+        # Leave tracemalloc running if someone else started it
+        started_here = not tracemalloc.is_tracing()
+        if started_here:
+            tracemalloc.start(TRACEMALLOC_FRAMES)
+        try:
+            before = tracemalloc.take_snapshot()
+            await asyncio.sleep(seconds)
+            after = tracemalloc.take_snapshot()
+            current, peak = tracemalloc.get_traced_memory()
+        finally:
+            if started_here:
+                tracemalloc.stop()
+        
+        filters = [tracemalloc.Filter(False, tracemalloc.__file__), tracemalloc.Filter(False, '<frozen *>')]
+        before, after = before.filter_traces(filters), after.filter_traces(filters)
+        growth = after.compare_to(before, 'lineno')
+        grown = sum(stat.size_diff for stat in growth)
+        
+        out = io.StringIO()
+        out.write(f"tracemalloc over a {seconds}s window\n")
+        out.write(f"traced now {current / 2 ** 20:.1f} MB, peak {peak / 2 ** 20:.1f} MB, "
+                  f"net change {grown / 2 ** 10:+.1f} KB\n")
+        if not started_here:
+            out.write("(tracemalloc was already running, totals include earlier allocations)\n")
+        out.write(f"\n=== Top {self.top_n} allocation sites by growth during the window ===\n")
+        for stat in growth[:self.top_n]:
+            out.write(f"{stat}\n")
+        out.write(f"\n=== Top {self.top_n} allocation sites by size at the end ===\n")
+        for stat in after.statistics('lineno')[:self.top_n]:
+            out.write(f"{stat}\n")
+        out.write("\n=== Largest growth, with traceback ===\n")
+        for stat in after.compare_to(before, 'traceback')[:3]:
+            out.write(f"{stat.size_diff / 2 ** 10:+.1f} KB in {stat.count_diff:+d} blocks\n")
+            for line in stat.traceback.format():
+                out.write(f"{line}\n")
+            out.write("\n")
+        summary = f"net {grown / 2 ** 10:+.1f} KB over {seconds}s, peak {peak / 2 ** 20:.1f} MB"
+        return ProfileResult('memory', seconds, out.getvalue(), summary)
+
+# Global profiler
+profiler = Profiler()
@@ -0,0 +1,103 @@
+"""
+Opt-in recording of handled interactions for replay.py
+
+One JSON object per line, short keys to keep the file compact:
+    at  start offset from recording start, ms     h   handler (e.g. view.join_tank)
+    k   interaction kind (command/component/modal) ms  handler duration, ms
+    g   guild, u user, p party (keyed hashes)      r   role for join buttons
+    d   how it was acknowledged (immediate/eager_defer/deadline_defer)
+    ok  0 if the handler raised
+No names, message content or raw Discord ids are written.
+
+Each process writes its own file (RECORD_FILE with the start time and pid added), which
+starts with a header line holding the wall clock time that its offsets count from.
+"""
+import os
+import json
+import hmac
+import time
+import hashlib
+from typing import Any, List, Optional
+from config.settings import RECORD_INTERACTIONS, RECORD_FILE, RECORD_SALT
+from monitoring.tracing import BatchSpanProcessor
+
+RECORD_VERSION = 1
+
+ROLE_BY_HANDLER = {
+    'view.join_tank': 'tank',
+    'view.join_healer': 'healer',
+    'view.join_dps': 'dps',
+    'view.cant_attend': 'cant_attend'
+}
+
+KIND_BY_TYPE = {2: 'command', 3: 'component', 5: 'modal'}
+
+class RecordFileExporter:
+    """Appends records to a file as one compact JSON object per line"""
+    
+    def __init__(self, path: str):
+        self.path = path
+    
+    def export(self, records: List[dict]):
+        with open(self.path, 'a', encoding='utf-8') as f:
+            for record in records:
+                f.write(json.dumps(record, separators=(',', ':')) + '\n')
+    
+    def shutdown(self):
+        pass
+
+class InteractionRecorder:
+    """Writes anonymized interaction events from a background thread"""
+    
+    def __init__(self, path: str = RECORD_FILE, salt: str = RECORD_SALT, enabled: bool = RECORD_INTERACTIONS):
+        # Without a configured salt, hashes only correlate within one process lifetime
+        self._key = (salt or os.urandom(16).hex()).encode('utf-8')
+        self._started = time.perf_counter()
+        wall = time.time()
+        # One file per process: restarts and cluster workers never share a file or a time origin
+        root, ext = os.path.splitext(path)
+        self.path = f"{root}-{time.strftime('%Y%m%d-%H%M%S', time.gmtime(wall))}-{os.getpid()}{ext}"
+        self.processor = None
+        if enabled:
+            self.processor = BatchSpanProcessor(RecordFileExporter(self.path))
+            self.processor.on_end({'v': RECORD_VERSION, 'wall': wall, 'pid': os.getpid()})
+    
+    @property
+    def enabled(self) -> bool:
+        return self.processor is not None
+    
+    def anonymize(self, value: Any) -> Optional[str]:
+        """Stable keyed hash of an id, None for missing ids"""
+        if value is None:
+            return None
+        return hmac.new(self._key, str(value).encode('utf-8'), hashlib.sha256).hexdigest()[:12]
+    
+    def record(self, ctx, party_id: Optional[str], ok: bool):
+        """Queue one event for a finished pipeline context"""
+        if self.processor is None:
+            return
+        interaction = ctx.interaction
+        interaction_type = getattr(interaction.type, 'value', interaction.type)
+        event = {
+            'at': round((ctx.started - self._started) * 1000, 1),
+            'h': ctx.handler,
+            'k': KIND_BY_TYPE.get(interaction_type, str(interaction_type)),
+            'g': self.anonymize(interaction.guild_id),
+            'u': self.anonymize(interaction.user.id),
+            'p': self.anonymize(party_id),
+            'ms': round((time.perf_counter() - ctx.started) * 1000, 1),
+            'd': ctx.path,
+            'ok': int(ok)
+        }
+        role = ROLE_BY_HANDLER.get(ctx.handler)
+        if role is not None:
+            event['r'] = role
+        self.processor.on_end(event)
+    
+    def shutdown(self):
+        if self.processor is not None:
+            self.processor.shutdown()
+            self.processor = None
+
+# Global recorder
+recorder = InteractionRecorder()
@@ -0,0 +1,85 @@
+"""
+Small aiohttp server exposing /metrics, /healthz, /readyz and the /debug routes
+"""
+import hmac
+import logging
+from typing import Callable, Optional
+from aiohttp import web
+from config.settings import PROFILE_TOKEN
+from monitoring.metrics import registry
+from monitoring.profiler import profiler, ProfileBusy
+from monitoring.watchdog import watchdog
+
+LOOPBACK = ('127.0.0.1', '::1')
+
+logger = logging.getLogger(__name__)
+
+class MetricsServer:
+    """Serves metrics and health routes next to the bot"""
+    
+    def __init__(self, host: str, port: int, readiness_check: Optional[Callable[[], dict]] = None):
+        self.host = host
+        self.port = port
+        self.readiness_check = readiness_check
+        self.app = web.Application()
+        self.app.router.add_get('/metrics', self.handle_metrics)
+        self.app.router.add_get('/healthz', self.handle_health)
+        self.app.router.add_get('/readyz', self.handle_ready)
+        self.app.router.add_get('/debug/profile', self.handle_profile)
+        self.app.router.add_get('/debug/stalls', self.handle_stalls)
+        self._runner = None
+    
+    async def handle_metrics(self, request: web.Request) -> web.Response:
+        return web.Response(text=registry.render(), content_type='text/plain', charset='utf-8',
+                            headers={'X-Content-Type-Options': 'nosniff'})
+    
+    async def handle_health(self, request: web.Request) -> web.Response:
+        """Liveness: the process and its event loop are responding"""
+        return web.json_response({'status': 'ok'})
+    
+    async def handle_ready(self, request: web.Request) -> web.Response:
+        """Readiness: every check reported by readiness_check is true"""
+        checks = self.readiness_check() if self.readiness_check else {}
+        ready = all(checks.values())
+        return web.json_response({'ready': ready, 'checks': checks}, status=200 if ready else 503)
+    
+    def _may_profile(self, request: web.Request) -> bool:
+        token = request.headers.get('X-Profile-Token', '')
+        if PROFILE_TOKEN and hmac.compare_digest(token, PROFILE_TOKEN):
+            return True
+        return request.remote in LOOPBACK
+    
+    async def handle_profile(self, request: web.Request) -> web.Response:
+        """Run a bounded profile: ?mode=cpu|memory&seconds=N, returns the text report"""
+        if not self._may_profile(request):
+            return web.json_response({'error': 'forbidden'}, status=403)
+        mode = request.query.get('mode', 'cpu')
+        try:
+            seconds = int(request.query.get('seconds', '10'))
+            result = await profiler.run(mode, seconds)
+        except ValueError as e:
+            return web.json_response({'error': str(e)}, status=400)
+        except ProfileBusy as e:
+            return web.json_response({'error': str(e)}, status=409)
+        return web.Response(text=result.report, content_type='text/plain', charset='utf-8',
+                            headers={'Content-Disposition': f'attachment; filename="{result.filename}"'})
+    
+    async def handle_stalls(self, request: web.Request) -> web.Response:
+        """Event loop stalls aggregated by call site"""
+        if not self._may_profile(request):
+            return web.json_response({'error': 'forbidden'}, status=403)
+        return web.Response(text=watchdog.report(), content_type='text/plain', charset='utf-8')
+    
+    async def start(self):
+        """Start listening"""
+        self._runner = web.AppRunner(self.app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, self.host, self.port)
+        await site.start()
+        logger.info("📈 Metrics server listening on %s:%s", self.host, self.port)
+    
+    async def stop(self):
+        """Stop listening"""
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
@@ -0,0 +1,302 @@
+"""
+Lightweight span tracing for interactions, storage calls and Discord requests
+"""
+import logging
+import os
+import json
+import time
+import queue
+import random
+import threading
+import contextvars
+import urllib.request
+from typing import Any, Dict, List, Optional
+from config.settings import (TRACE_SAMPLE_RATE, TRACE_EXPORTER, TRACE_FILE, TRACE_OTLP_ENDPOINT,
+                             TRACE_SERVICE_NAME)
+
+logger = logging.getLogger(__name__)
+
+# Attributes copied from a parent span onto every child span
+PROPAGATED_ATTRIBUTES = ('party_id', 'guild_id', 'command')
+
+_current_span = contextvars.ContextVar('current_span', default=None)
+
+class Span:
+    """A timed operation within a trace"""
+    __slots__ = ('name', 'trace_id', 'span_id', 'parent_id', 'start_ns', 'end_ns',
+                 'attributes', 'status', 'error', 'sampled', '_token')
+    
+    def __init__(self, name: str, trace_id: str, parent_id: Optional[str], sampled: bool,
+                 attributes: Optional[Dict[str, Any]] = None):
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = os.urandom(8).hex()
+        self.parent_id = parent_id
+        self.start_ns = time.time_ns()
+        self.end_ns = None
+        self.attributes = attributes or {}
+        self.status = 'ok'
+        self.error = None
+        self.sampled = sampled
+        self._token = None
+    
+    def set_attribute(self, key: str, value: Any):
+        if value is not None:
+            self.attributes[key] = value
+    
+    def record_error(self, exc: BaseException):
+        self.status = 'error'
+        self.error = f"{type(exc).__name__}: {exc}"
+    
+    @property
+    def duration_ms(self) -> Optional[float]:
+        if self.end_ns is None:
+            return None
+        return (self.end_ns - self.start_ns) / 1e6
+    
+    def to_dict(self) -> dict:
+        """Flat representation written by the file exporter"""
+        return {
+            'name': self.name,
+            'trace_id': self.trace_id,
+            'span_id': self.span_id,
+            'parent_id': self.parent_id,
+            'start_ns': self.start_ns,
+            'end_ns': self.end_ns,
+            'duration_ms': self.duration_ms,
+            'attributes': self.attributes,
+            'status': self.status,
+            'error': self.error
+        }
+    
+    def to_otlp(self) -> dict:
+        """OTLP/JSON span representation"""
+        span = {
+            'traceId': self.trace_id,
+            'spanId': self.span_id,
+            'name': self.name,
+            'kind': 1,
+            'startTimeUnixNano': str(self.start_ns),
+            'endTimeUnixNano': str(self.end_ns),
+            'attributes': [_otlp_attribute(k, v) for k, v in self.attributes.items()],
+            'status': {'code': 2, 'message': self.error} if self.status == 'error' else {'code': 1}
+        }
+        if self.parent_id:
+            span['parentSpanId'] = self.parent_id
+        return span
+
+def _otlp_attribute(key: str, value: Any) -> dict:
+    if isinstance(value, bool):
+        return {'key': key, 'value': {'boolValue': value}}
+    if isinstance(value, int):
+        return {'key': key, 'value': {'intValue': str(value)}}
+    if isinstance(value, float):
+        return {'key': key, 'value': {'doubleValue': value}}
+    return {'key': key, 'value': {'stringValue': str(value)}}
+
+class InMemorySpanExporter:
+    """Keeps finished spans in a list, for tests and local inspection"""
+    
+    def __init__(self):
+        self.spans: List[Span] = []
+    
+    def export(self, spans: List[Span]):
+        self.spans.extend(spans)
+    
+    def clear(self):
+        self.spans.clear()
+    
+    def shutdown(self):
+        pass
+
+class FileSpanExporter:
+    """Appends finished spans to a file as one JSON object per line"""
+    
+    def __init__(self, path: str):
+        self.path = path
+    
+    def export(self, spans: List[Span]):
+        with open(self.path, 'a', encoding='utf-8') as f:
+            for span in spans:
+                f.write(json.dumps(span.to_dict(), default=str) + '\n')
+    
+    def shutdown(self):
+        pass
+
+class OTLPHttpSpanExporter:
+    """Posts spans to an OTLP/HTTP JSON collector (e.g. http://localhost:4318/v1/traces)"""
+    
+    def __init__(self, endpoint: str, service_name: str, timeout: float = 5.0):
+        self.endpoint = endpoint
+        self.service_name = service_name
+        self.timeout = timeout
+    
+    def export(self, spans: List[Span]):
+        payload = {
+            'resourceSpans': [{
+                'resource': {'attributes': [_otlp_attribute('service.name', self.service_name)]},
+                'scopeSpans': [{
+                    'scope': {'name': 'party-bot'},
+                    'spans': [span.to_otlp() for span in spans]
+                }]
+            }]
+        }
+        request = urllib.request.Request(
+            self.endpoint,
+            data=json.dumps(payload).encode('utf-8'),
+            headers={'Content-Type': 'application/json'},
+            method='POST'
+        )
+        with urllib.request.urlopen(request, timeout=self.timeout):
+            pass
+    
+    def shutdown(self):
+        pass
+
+class BatchSpanProcessor:
+    """Hands finished spans to an exporter from a background thread"""
+    
+    def __init__(self, exporter, max_batch: int = 256, flush_interval: float = 2.0, max_queue: int = 10000):
+        self.exporter = exporter
+        self.max_batch = max_batch
+        self.flush_interval = flush_interval
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._dropped = 0
+        self._thread = threading.Thread(target=self._worker, name='span-exporter', daemon=True)
+        self._thread.start()
+    
+    def on_end(self, span: Span):
+        try:
+            self._queue.put_nowait(span)
+        except queue.Full:
+            self._dropped += 1
+    
+    def _worker(self):
+        while True:
+            batch = []
+            try:
+                item = self._queue.get(timeout=self.flush_interval)
+                if item is None:
+                    self._export(batch)
+                    return
+                batch.append(item)
+                while len(batch) < self.max_batch:
+                    item = self._queue.get_nowait()
+                    if item is None:
+                        self._export(batch)
+                        return
+                    batch.append(item)
+            except queue.Empty:
+                pass
+            self._export(batch)
+    
+    def _export(self, batch: List[Span]):
+        if not batch:
+            return
+        try:
+            self.exporter.export(batch)
+        except Exception as e:
+            logger.warning("❌ Failed to export %d spans: %s", len(batch), e)
+    
+    def shutdown(self, timeout: float = 5.0):
+        """Flush queued spans and stop the worker thread"""
+        self._queue.put(None)
+        self._thread.join(timeout)
+        self.exporter.shutdown()
+
+class SimpleSpanProcessor:
+    """Exports each span synchronously as it ends (tests only)"""
+    
+    def __init__(self, exporter):
+        self.exporter = exporter
+    
+    def on_end(self, span: Span):
+        self.exporter.export([span])
+    
+    def shutdown(self):
+        self.exporter.shutdown()
+
+class _SpanContext:
+    """Context manager that activates a span and ends it on exit"""
+    __slots__ = ('tracer', 'span')
+    
+    def __init__(self, tracer: 'Tracer', span: Optional[Span]):
+        self.tracer = tracer
+        self.span = span
+    
+    def __enter__(self) -> Optional[Span]:
+        if self.span is not None:
+            self.span._token = _current_span.set(self.span)
+        return self.span
+    
+    def __exit__(self, exc_type, exc, tb):
+        span = self.span
+        if span is None:
+            return False
+        if exc is not None:
+            span.record_error(exc)
+        span.end_ns = time.time_ns()
+        _current_span.reset(span._token)
+        if span.sampled:
+            self.tracer.processor.on_end(span)
+        return False
+
+class Tracer:
+    """Creates root and child spans and forwards sampled spans to a processor"""
+    
+    def __init__(self, sample_rate: float = 0.0, processor=None):
+        self.sample_rate = sample_rate
+        self.processor = processor
+    
+    @property
+    def enabled(self) -> bool:
+        return self.processor is not None and self.sample_rate > 0
+    
+    def configure(self, sample_rate: Optional[float] = None, exporter=None, synchronous: bool = False):
+        """Replace the sample rate and/or exporter"""
+        if sample_rate is not None:
+            self.sample_rate = sample_rate
+        if exporter is not None:
+            if self.processor is not None:
+                self.processor.shutdown()
+            self.processor = SimpleSpanProcessor(exporter) if synchronous else BatchSpanProcessor(exporter)
+    
+    def start_root(self, name: str, **attributes) -> _SpanContext:
+        """Start a new trace; sampling is decided here and inherited by all children"""
+        if not self.enabled:
+            return _SpanContext(self, None)
+        sampled = random.random() < self.sample_rate
+        span = Span(name, os.urandom(16).hex(), None, sampled,
+                    {k: v for k, v in attributes.items() if v is not None})
+        return _SpanContext(self, span)
+    
+    def start_span(self, name: str, **attributes) -> _SpanContext:
+        """Start a child of the current span; a no-op outside a sampled trace"""
+        parent = _current_span.get()
+        if parent is None or not parent.sampled:
+            return _SpanContext(self, None)
+        
+        span_attributes = {k: parent.attributes[k] for k in PROPAGATED_ATTRIBUTES if k in parent.attributes}
+        span_attributes.update({k: v for k, v in attributes.items() if v is not None})
+        return _SpanContext(self, Span(name, parent.trace_id, parent.span_id, True, span_attributes))
+    
+    def shutdown(self):
+        if self.processor is not None:
+            self.processor.shutdown()
+
+def current_span() -> Optional[Span]:
+    """Get the active span, if any"""
+    return _current_span.get()
+
+def _build_exporter():
+    if TRACE_EXPORTER == 'file':
+        return FileSpanExporter(TRACE_FILE)
+    if TRACE_EXPORTER == 'otlp':
+        return OTLPHttpSpanExporter(TRACE_OTLP_ENDPOINT, TRACE_SERVICE_NAME)
+    return None
+
+# Global tracer
+tracer = Tracer(TRACE_SAMPLE_RATE)
+_default_exporter = _build_exporter()
+if _default_exporter is not None:
+    tracer.configure(exporter=_default_exporter)
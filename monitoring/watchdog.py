@@ -0,0 +1,185 @@
+"""
+Event loop lag watchdog
+
+A heartbeat task sleeps WATCHDOG_INTERVAL seconds at a time and records how late it
+wakes up. A helper thread watches the heartbeat; once it is WATCHDOG_THRESHOLD seconds
+overdue the loop is blocked by synchronous code, so the thread reads the loop thread's
+current frame with sys._current_frames() while the blocking call is still on the stack.
+Stalls are aggregated per call site: the innermost frame in this project's code, since
+the actual blocking leaf is usually inside a library (grpc, requests, ssl).
+"""
+import os
+import sys
+import time
+import asyncio
+import logging
+import threading
+import traceback
+from typing import Dict, List, Optional, Tuple
+from config.settings import WATCHDOG_ENABLED, WATCHDOG_INTERVAL, WATCHDOG_THRESHOLD
+from monitoring.metrics import registry
+
+logger = logging.getLogger(__name__)
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MAX_SITES = 50
+STACK_DEPTH = 12
+
+LOOP_LAG = registry.histogram(
+    "party_bot_event_loop_lag_seconds", "How late the event loop heartbeat woke up",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0))
+LOOP_STALLS = registry.counter(
+    "party_bot_event_loop_stalls_total", "Event loop stalls over the watchdog threshold by blocking call site",
+    ["site"])
+LOOP_STALL_SECONDS = registry.counter(
+    "party_bot_event_loop_stall_seconds_total", "Seconds the event loop was blocked by call site",
+    ["site"])
+
+class StallSite:
+    """Aggregated stalls of one call site"""
+    
+    __slots__ = ('site', 'count', 'total', 'worst', 'leaf', 'stack')
+    
+    def __init__(self, site: str):
+        self.site = site
+        self.count = 0
+        self.total = 0.0
+        self.worst = 0.0
+        self.leaf = ''
+        self.stack: List[str] = []
+
+def _in_project(filename: str) -> bool:
+    return filename.startswith(PROJECT_ROOT) and 'site-packages' not in filename
+
+def describe_stack(frame) -> Tuple[str, str, List[str]]:
+    """(project call site, blocking leaf, formatted stack) for a frame"""
+    summary = traceback.extract_stack(frame, limit=None)
+    # Drop the loop's own frames: the stack of interest starts at the running callback
+    for index in range(len(summary) - 1, -1, -1):
+        entry = summary[index]
+        if entry.name == '_run' and entry.filename.endswith(os.path.join('asyncio', 'events.py')):
+            summary = summary[index + 1:]
+            break
+    if not summary:
+        return 'unknown', 'unknown', []
+    leaf = summary[-1]
+    site = None
+    for entry in reversed(summary):
+        if _in_project(entry.filename):
+            site = entry
+            break
+    site = site or leaf
+    def label(entry) -> str:
+        filename = os.path.relpath(entry.filename, PROJECT_ROOT) if _in_project(entry.filename) else entry.filename
+        return f"{filename}:{entry.lineno} {entry.name}"
+    stack = [f"{label(entry)}: {(entry.line or '').strip()}" for entry in summary[-STACK_DEPTH:]]
+    return label(site), label(leaf), stack
+
+class LoopWatchdog:
+    """Measures loop lag and attributes stalls to the call that blocked the loop"""
+    
+    def __init__(self, interval: float = WATCHDOG_INTERVAL, threshold: float = WATCHDOG_THRESHOLD,
+                 enabled: bool = WATCHDOG_ENABLED):
+        self.enabled = enabled
+        self.interval = interval
+        self.threshold = threshold
+        self.sites: Dict[str, StallSite] = {}
+        self._beat = time.monotonic()
+        self._loop_thread_id: Optional[int] = None
+        self._captured: Optional[Tuple[float, str, str, List[str]]] = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._task: Optional[asyncio.Task] = None
+        self._thread: Optional[threading.Thread] = None
+    
+    def start(self):
+        """Start the heartbeat on the running loop and the watcher thread"""
+        if not self.enabled or self._task is not None:
+            return
+        self._loop_thread_id = threading.get_ident()
+        self._beat = time.monotonic()
+        self._stop.clear()
+        self._task = asyncio.get_running_loop().create_task(self._heartbeat())
+        self._thread = threading.Thread(target=self._watch, name='loop-watchdog', daemon=True)
+        self._thread.start()
+        logger.info("🐕 Loop watchdog started (threshold %.0fms)", self.threshold * 1000)
+    
+    def stop(self):
+        if self._task is None:
+            return
+        self._task.cancel()
+        self._task = None
+        self._stop.set()
+        self._thread.join(timeout=1.0)
+        self._thread = None
+        if self.sites:
+            logger.info("🐕 Loop stalls this run:\n%s", self.report(limit=5))
+    
+    async def _heartbeat(self):
+        while True:
+            beat = time.monotonic()
+            self._beat = beat
+            await asyncio.sleep(self.interval)
+            lag = max(0.0, time.monotonic() - beat - self.interval)
+            LOOP_LAG.observe(lag)
+            if lag >= self.threshold:
+                self._record(beat, lag)
+    
+    def _watch(self):
+        # Poll at a fraction of the threshold so the stack is read while the loop is still blocked
+        poll = max(0.01, self.threshold / 4)
+        while not self._stop.wait(poll):
+            beat = self._beat
+            if time.monotonic() - beat - self.interval < self.threshold:
+                continue
+            with self._lock:
+                if self._captured is not None and self._captured[0] == beat:
+                    continue
+            frame = sys._current_frames().get(self._loop_thread_id)
+            if frame is None:
+                continue
+            site, leaf, stack = describe_stack(frame)
+            del frame
+            with self._lock:
+                self._captured = (beat, site, leaf, stack)
+            logger.warning("🐕 Event loop blocked for over %.0fms at %s (in %s)", self.threshold * 1000, site, leaf)
+    
+    def _record(self, beat: float, lag: float):
+        """Attribute a finished stall to the stack captured during it"""
+        with self._lock:
+            captured, self._captured = self._captured, None
+        if captured is not None and captured[0] == beat:
+            _, site, leaf, stack = captured
+        else:
+            # Shorter than the watcher's poll or the thread was starved: no stack
+            site, leaf, stack = 'unknown', 'unknown', []
+        entry = self.sites.get(site)
+        if entry is None:
+            if len(self.sites) >= MAX_SITES:
+                site = 'other'
+                entry = self.sites.get(site)
+            if entry is None:
+                entry = self.sites[site] = StallSite(site)
+        entry.count += 1
+        entry.total += lag
+        if lag >= entry.worst:
+            entry.worst = lag
+            entry.leaf = leaf
+            entry.stack = stack
+        LOOP_STALLS.labels(site=site).inc()
+        LOOP_STALL_SECONDS.labels(site=site).inc(lag)
+    
+    def report(self, limit: int = 20) -> str:
+        """Call sites by total blocked time, with the stack of each site's worst stall"""
+        if not self.sites:
+            return f"No event loop stalls over {self.threshold * 1000:.0f}ms"
+        ranked = sorted(self.sites.values(), key=lambda entry: entry.total, reverse=True)[:limit]
+        lines = [f"Event loop stalls over {self.threshold * 1000:.0f}ms by call site"]
+        for entry in ranked:
+            lines.append(f"\n{entry.site}: {entry.count} stalls, {entry.total:.2f}s total, worst {entry.worst * 1000:.0f}ms"
+                         f" in {entry.leaf}")
+            lines.extend(f"    {line}" for line in entry.stack)
+        return "\n".join(lines)
+
+# Global watchdog
+watchdog = LoopWatchdog()
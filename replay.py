@@ -0,0 +1,229 @@
+"""
+Replay recorded interactions (monitoring/recorder.py) against a local backend
+    
+    python replay.py interactions-*.trace [--speed 10] [--serial] [--limit 5000] [--keep]
+
+Each recorded event is mapped to the storage calls its handler makes and run through the
+interactive work lane at its original offset divided by --speed, so bursts and per-guild
+contention keep their recorded shape. Several files (cluster workers, restarts) are merged
+on one timeline using each session's header. Anonymized ids become stable synthetic ids, and a
+party is created the first time a trace refers to it. Discord REST calls are not replayed:
+recorded durations include them, replayed durations are backend time only.
+
+Runs only against the Firestore emulator unless --allow-remote is given.
+"""
+import os
+import sys
+import json
+import time
+import asyncio
+import logging
+import argparse
+from collections import defaultdict
+from typing import Dict, Iterator, List, Optional, Tuple
+from database.party_operations import party_ops
+from utils.work_scheduler import work_scheduler
+
+logger = logging.getLogger(__name__)
+
+SYNTHETIC_ID_BASE = 900000000000000000
+SYNTHETIC_CHANNEL_ID = 1
+
+def read_trace(paths: List[str], limit: Optional[int] = None) -> Tuple[List[Dict], List[Dict]]:
+    """Session headers and events of one or more traces, events on one timeline sorted by offset
+    
+    Every header starts a session whose offsets count from its own start, so each session is
+    shifted by its wall clock start relative to the earliest one.
+    """
+    headers: List[Dict] = []
+    sessions: List[Tuple[float, List[Dict]]] = []
+    for path in paths:
+        events: Optional[List[Dict]] = None
+        with open(path, encoding='utf-8') as f:
+            for number, line in enumerate(f, 1):
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    record = json.loads(line)
+                except ValueError as e:
+                    raise ValueError(f"{path}:{number}: {e}") from e
+                if 'h' not in record:
+                    headers.append(record)
+                    events = []
+                    sessions.append((record.get('wall', 0.0), events))
+                    continue
+                if events is None:
+                    raise ValueError(f"{path}:{number}: event before the session header")
+                events.append(record)
+    
+    origin = min((wall for wall, _ in sessions), default=0.0)
+    merged = []
+    for wall, events in sessions:
+        shift = (wall - origin) * 1000
+        merged.extend(dict(event, at=event['at'] + shift) for event in events)
+    merged.sort(key=lambda event: event['at'])
+    return headers, merged[:limit] if limit else merged
+
+def synthetic_id(anonymized: Optional[str]) -> int:
+    """Deterministic Discord-sized id for an anonymized id"""
+    return SYNTHETIC_ID_BASE + int(anonymized or '0', 16) % 10 ** 16
+
+def percentile(samples: List[float], q: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+class Replayer:
+    """Drives recorded events against party_ops and collects per-handler timings"""
+    
+    def __init__(self, speed: float = 1.0, serial: bool = False):
+        self.speed = speed
+        self.serial = serial
+        self.parties: Dict[str, str] = {}
+        self.created: List[str] = []
+        self.recorded: Dict[str, List[float]] = defaultdict(list)
+        self.replayed: Dict[str, List[float]] = defaultdict(list)
+        self.errors: Dict[str, int] = defaultdict(int)
+        self.skipped: Dict[str, int] = defaultdict(int)
+    
+    def _party(self, event: Dict, guild_id: int) -> Optional[str]:
+        """Real party id for the event's anonymized party, created on first use"""
+        anonymized = event.get('p')
+        if anonymized is None:
+            return None
+        party_id = self.parties.get(anonymized)
+        if party_id is None:
+            party_id = party_ops.create_party(guild_id, SYNTHETIC_CHANNEL_ID, f"Replay {anonymized}",
+                                              int(time.time()) + 86400, synthetic_id(event.get('u')))
+            self.parties[anonymized] = party_id
+            self.created.append(party_id)
+        return party_id
+    
+    def _apply(self, event: Dict) -> bool:
+        """The storage calls the recorded handler made, False when it has no mapping"""
+        handler = event['h']
+        guild_id = synthetic_id(event.get('g'))
+        user_id = synthetic_id(event.get('u'))
+        if handler in ('command.list_parties', 'command.admin_party_stats'):
+            party_ops.get_guild_parties(guild_id)
+            return True
+        if handler == 'command.admin_clear_parties':
+            party_ops.delete_guild_parties(guild_id)
+            self.parties = {anon: pid for anon, pid in self.parties.items() if not party_ops.is_deleted(pid)}
+            return True
+        party_id = self._party(event, guild_id)
+        if party_id is None:
+            return False
+        if handler == 'command.create_party':
+            party_ops.get_party(party_id)
+        elif handler in ('view.join_tank', 'view.join_healer', 'view.join_dps', 'view.cant_attend'):
+            party_ops.join_role(party_id, user_id, f"user{user_id % 10000}", event.get('r', 'dps'))
+        elif handler == 'view.leave_party':
+            party_ops.leave_party(party_id, user_id)
+        elif handler == 'modal.edit_party':
+            party_ops.update_party(party_id, {'party_name': f"Replay {event['p']} (edited)"})
+            party_ops.get_party_model(party_id)
+        elif handler in ('view.confirm_delete', 'command.admin_delete_party'):
+            party_ops.delete_party(party_id)
+            self.parties.pop(event['p'], None)
+        elif handler in ('view.edit_party', 'view.delete_party', 'view.cancel_delete'):
+            party_ops.get_party(party_id)
+        else:
+            return False
+        return True
+    
+    async def _run(self, event: Dict):
+        handler = event['h']
+        started = time.perf_counter()
+        try:
+            applied = await work_scheduler.run('interactive', synthetic_id(event.get('g')), self._apply, event)
+        except Exception as e:
+            self.errors[handler] += 1
+            logger.warning("Replay of %s failed: %s", handler, e)
+            return
+        if not applied:
+            self.skipped[handler] += 1
+            return
+        self.replayed[handler].append((time.perf_counter() - started) * 1000)
+        self.recorded[handler].append(event.get('ms', 0.0))
+    
+    async def replay(self, events: List[Dict]) -> float:
+        """Replay events at their recorded offsets scaled by speed, returns wall seconds"""
+        started = time.perf_counter()
+        origin = events[0]['at'] if events else 0.0
+        tasks = []
+        for event in events:
+            if self.serial:
+                await self._run(event)
+                continue
+            delay = (event['at'] - origin) / 1000 / self.speed - (time.perf_counter() - started)
+            if delay > 0:
+                await asyncio.sleep(delay)
+            tasks.append(asyncio.create_task(self._run(event)))
+        await asyncio.gather(*tasks)
+        return time.perf_counter() - started
+    
+    def cleanup(self):
+        """Delete every party created for the replay"""
+        for party_id in self.created:
+            if not party_ops.is_deleted(party_id):
+                party_ops.delete_party(party_id)
+    
+    def report(self, elapsed: float) -> Iterator[str]:
+        yield f"{'handler':<30} {'count':>6} {'rec p50':>9} {'rec p95':>9} {'rep p50':>9} {'rep p95':>9} {'errors':>7}"
+        for handler in sorted(set(self.replayed) | set(self.errors)):
+            recorded, replayed = self.recorded[handler], self.replayed[handler]
+            yield (f"{handler:<30} {len(replayed):>6} {percentile(recorded, 0.5):>7.1f}ms "
+                   f"{percentile(recorded, 0.95):>7.1f}ms {percentile(replayed, 0.5):>7.1f}ms "
+                   f"{percentile(replayed, 0.95):>7.1f}ms {self.errors[handler]:>7}")
+        if self.skipped:
+            yield f"skipped (no storage mapping): {dict(self.skipped)}"
+        total = sum(len(samples) for samples in self.replayed.values())
+        yield f"{total} events in {elapsed:.1f}s ({total / elapsed if elapsed else 0.0:.0f} events/s)"
+
+async def run(args) -> int:
+    headers, events = read_trace(args.paths, args.limit)
+    if not events:
+        logger.error("❌ No events in %s", ', '.join(args.paths))
+        return 1
+    span = (events[-1]['at'] - events[0]['at']) / 1000
+    logger.info("▶️ Replaying %d events from %d sessions (%.1fs recorded) at %sx%s", len(events), len(headers),
+                span, args.speed, ', serial' if args.serial else '')
+    replayer = Replayer(args.speed, args.serial)
+    try:
+        elapsed = await replayer.replay(events)
+    finally:
+        if not args.keep:
+            await asyncio.to_thread(replayer.cleanup)
+    for line in replayer.report(elapsed):
+        print(line)
+    return 0
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Replay a recorded interaction trace")
+    parser.add_argument('paths', nargs='+', help='trace files written with RECORD_INTERACTIONS=true')
+    parser.add_argument('--speed', type=float, default=1.0, help='time compression, 10 = ten times faster')
+    parser.add_argument('--serial', action='store_true', help='run events one at a time, ignoring timing')
+    parser.add_argument('--limit', type=int, default=None, help='replay only the first N events')
+    parser.add_argument('--keep', action='store_true', help='keep the parties created for the replay')
+    parser.add_argument('--allow-remote', action='store_true', help='allow running without the Firestore emulator')
+    args = parser.parse_args()
+    if args.speed <= 0:
+        parser.error('--speed must be positive')
+    if not os.getenv('FIRESTORE_EMULATOR_HOST') and not args.allow_remote:
+        parser.error('set FIRESTORE_EMULATOR_HOST (replay writes and deletes parties) or pass --allow-remote')
+    return asyncio.run(run(args))
+
+if __name__ == "__main__":
+    from monitoring.log_config import setup_logging, shutdown_logging
+    setup_logging()
+    try:
+        code = main()
+    except Exception as e:
+        logger.critical("❌ Replay failed: %s", e)
+        code = 1
+    finally:
+        shutdown_logging()
+    sys.exit(code)
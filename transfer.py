@@ -0,0 +1,216 @@
+"""
+Export and import party data as NDJSON (one document per line)
+
+    python transfer.py export backup.ndjson [--guild ID] [--collections parties,events]
+    python transfer.py import backup.ndjson [--parallel 4] [--batch-size 400] [--new-ids]
+
+Export streams each collection in document-id pages, writing every page before reading the
+next, so memory stays constant regardless of collection size. Import reads the file line by
+line and commits batched writes from a bounded thread pool, keeping document ids by default.
+Use "-" for stdin/stdout; logs go to stderr so they never mix into an export stream.
+"""
+import sys
+import json
+import time
+import logging
+import argparse
+import datetime
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import IO, Deque, Dict, Iterable, Iterator, List, Optional, Tuple
+from database.firebase_client import get_db, get_firestore
+from database.party_operations import party_ops
+
+logger = logging.getLogger(__name__)
+
+COLLECTIONS = ['parties', 'events']
+EXPORT_PAGE_SIZE = 500
+IMPORT_BATCH_SIZE = 400
+IMPORT_PARALLELISM = 4
+COMMIT_ATTEMPTS = 3
+
+Record = Tuple[str, str, Dict]
+
+def _encode(value):
+    # Firestore timestamps come back as datetime subclasses
+    if isinstance(value, datetime.datetime):
+        return {'$datetime': value.isoformat()}
+    raise TypeError(f"Cannot export {type(value).__name__}")
+
+def _decode(obj: Dict):
+    if len(obj) == 1 and '$datetime' in obj:
+        return datetime.datetime.fromisoformat(obj['$datetime'])
+    return obj
+
+def dump_record(collection: str, doc_id: str, data: Dict) -> str:
+    """One NDJSON line for a document"""
+    return json.dumps({'collection': collection, 'id': doc_id, 'data': data}, default=_encode,
+                      ensure_ascii=False, separators=(',', ':'))
+
+def load_record(line: str) -> Record:
+    """Parse one NDJSON line back into (collection, id, data)"""
+    record = json.loads(line, object_hook=_decode)
+    return record['collection'], record['id'], record['data']
+
+def stream_collection(collection: str, guild_id: Optional[int] = None,
+                      page_size: int = EXPORT_PAGE_SIZE) -> Iterator[Tuple[str, Dict]]:
+    """Yield (id, data) for every document, one page in memory at a time"""
+    db = get_db()
+    order = get_firestore().FieldPath.document_id()
+    base = db.collection(collection)
+    if guild_id is not None:
+        base = base.where('guild_id', '==', guild_id)
+    last_id = None
+    while True:
+        query = base.order_by(order).limit(page_size)
+        if last_id is not None:
+            query = query.start_after({order: last_id})
+        page = 0
+        for doc in query.stream():
+            page += 1
+            last_id = doc.id
+            yield doc.id, doc.to_dict() or {}
+        if page < page_size:
+            return
+
+def export_documents(out: IO[str], collections: Iterable[str], guild_id: Optional[int] = None,
+                     page_size: int = EXPORT_PAGE_SIZE) -> Dict[str, int]:
+    """Write every document of the collections to out, returns count per collection"""
+    counts = {}
+    for collection in collections:
+        started = time.perf_counter()
+        count = 0
+        for doc_id, data in stream_collection(collection, guild_id, page_size):
+            out.write(dump_record(collection, doc_id, data))
+            out.write('\n')
+            count += 1
+        counts[collection] = count
+        elapsed = time.perf_counter() - started
+        logger.info("📤 Exported %d %s in %.1fs (%.0f docs/s)", count, collection, elapsed,
+                    count / elapsed if elapsed else 0.0)
+    return counts
+
+def read_records(lines: Iterable[str]) -> Iterator[Record]:
+    for number, line in enumerate(lines, 1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield load_record(line)
+        except (ValueError, KeyError) as e:
+            raise ValueError(f"Line {number}: {e}") from e
+
+def _commit(batch_records: List[Record], preserve_ids: bool) -> int:
+    db = get_db()
+    for attempt in range(1, COMMIT_ATTEMPTS + 1):
+        batch = db.batch()
+        for collection, doc_id, data in batch_records:
+            ref = db.collection(collection).document(doc_id if preserve_ids else None)
+            batch.set(ref, data)
+        try:
+            batch.commit()
+            return len(batch_records)
+        except Exception as e:
+            if attempt == COMMIT_ATTEMPTS:
+                raise
+            logger.warning("Batch of %d failed (attempt %d): %s", len(batch_records), attempt, e)
+            time.sleep(2 ** attempt)
+    return 0
+
+def import_documents(records: Iterable[Record], batch_size: int = IMPORT_BATCH_SIZE,
+                     parallelism: int = IMPORT_PARALLELISM, preserve_ids: bool = True,
+                     invalidate: bool = True) -> Dict[str, int]:
+    """Write records in batches from a thread pool, returns count per collection
+    
+    At most 2 * parallelism batches are held in memory at once.
+    """
+    batch_size = max(1, min(500, batch_size))
+    counts: Dict[str, int] = {}
+    pending: Deque[Tuple[Future, List[Record]]] = deque()
+    started = time.perf_counter()
+    written = 0
+    next_report = batch_size * 25
+    
+    def settle(future: Future, batch_records: List[Record]):
+        nonlocal written, next_report
+        written += future.result()
+        for collection, doc_id, _ in batch_records:
+            counts[collection] = counts.get(collection, 0) + 1
+            if invalidate and preserve_ids and collection == 'parties':
+                # Also clears tombstones left by an earlier delete of the same id
+                party_ops.invalidate(doc_id)
+        if written >= next_report:
+            next_report += batch_size * 25
+            elapsed = time.perf_counter() - started
+            logger.info("📥 %d documents written (%.0f docs/s)", written, written / elapsed if elapsed else 0.0)
+    
+    with ThreadPoolExecutor(max_workers=max(1, parallelism), thread_name_prefix='import') as pool:
+        batch_records: List[Record] = []
+        for record in records:
+            batch_records.append(record)
+            if len(batch_records) < batch_size:
+                continue
+            pending.append((pool.submit(_commit, batch_records, preserve_ids), batch_records))
+            batch_records = []
+            while len(pending) >= 2 * parallelism:
+                settle(*pending.popleft())
+        if batch_records:
+            pending.append((pool.submit(_commit, batch_records, preserve_ids), batch_records))
+        while pending:
+            settle(*pending.popleft())
+    
+    elapsed = time.perf_counter() - started
+    logger.info("📥 Imported %d documents in %.1fs (%.0f docs/s)", written, elapsed,
+                written / elapsed if elapsed else 0.0)
+    return counts
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Export/import party data as NDJSON")
+    commands = parser.add_subparsers(dest='command', required=True)
+    
+    export_parser = commands.add_parser('export', help='write documents to an NDJSON file')
+    export_parser.add_argument('path', help='output file, - for stdout')
+    export_parser.add_argument('--guild', type=int, default=None, help='only this guild (default: whole project)')
+    export_parser.add_argument('--collections', default=','.join(COLLECTIONS), help='comma separated collections')
+    export_parser.add_argument('--page-size', type=int, default=EXPORT_PAGE_SIZE)
+    
+    import_parser = commands.add_parser('import', help='write documents from an NDJSON file')
+    import_parser.add_argument('path', help='input file, - for stdin')
+    import_parser.add_argument('--batch-size', type=int, default=IMPORT_BATCH_SIZE, help='writes per batch (max 500)')
+    import_parser.add_argument('--parallel', type=int, default=IMPORT_PARALLELISM, help='batches committed at once')
+    import_parser.add_argument('--new-ids', action='store_true', help='assign new document ids instead of keeping them')
+    import_parser.add_argument('--no-invalidate', action='store_true',
+                               help='do not publish cache invalidations for imported parties')
+    args = parser.parse_args()
+    
+    if args.command == 'export':
+        collections = [name.strip() for name in args.collections.split(',') if name.strip()]
+        out = sys.stdout if args.path == '-' else open(args.path, 'w', encoding='utf-8')
+        try:
+            counts = export_documents(out, collections, args.guild, args.page_size)
+        finally:
+            if out is not sys.stdout:
+                out.close()
+    else:
+        source = sys.stdin if args.path == '-' else open(args.path, encoding='utf-8')
+        try:
+            counts = import_documents(read_records(source), args.batch_size, args.parallel,
+                                      preserve_ids=not args.new_ids, invalidate=not args.no_invalidate)
+        finally:
+            if source is not sys.stdin:
+                source.close()
+    
+    logger.info("✅ %s complete: %s", args.command.title(), counts)
+    return 0
+
+if __name__ == "__main__":
+    from monitoring.log_config import setup_logging, shutdown_logging
+    setup_logging(stream=sys.stderr)
+    try:
+        code = main()
+    except Exception as e:
+        logger.critical("❌ Transfer failed: %s", e)
+        code = 1
+    finally:
+        shutdown_logging()
+    sys.exit(code)
@@ -1,23 +1,30 @@
 """
 Discord UI Modals
 """
+import logging
 import discord
 import datetime
-from firebase_admin import firestore
+from typing import Optional
 from database.party_operations import party_ops
 from config.settings import MAX_PARTY_NAME_LENGTH, MAX_STARTTIME_LENGTH
-from utils.helpers import parse_time_string, format_party_embed
+from utils.helpers import parse_time_string
+from utils.interactions import interaction_pipeline, get_context
+
+logger = logging.getLogger(__name__)
+
+EDIT_MODAL_PREFIX = 'party_edit'
 
 class PartyEditModal(discord.ui.Modal, title="✏️ Edit Party"):
     """Modal for editing party details"""
     
     def __init__(self, party_id: str, current_name: str, current_starttime: str, 
                  current_tanks: int, current_healers: int, current_dps: int):
-        super().__init__()
+        super().__init__(custom_id=f"{EDIT_MODAL_PREFIX}:{party_id}")
         self.party_id = party_id
         
         self.name_input = discord.ui.TextInput(
             label="🎮 Party Name",
+            custom_id='name',
             default=current_name,
             max_length=MAX_PARTY_NAME_LENGTH
         )
@@ -25,6 +32,7 @@ class PartyEditModal(discord.ui.Modal, title="✏️ Edit Party"):
         
         self.starttime_input = discord.ui.TextInput(
             label="🕐 Party Start Time",
+            custom_id='starttime',
             placeholder="Use your timezone (e.g. 'Tomorrow 7PM UTC+3', 'Friday 8PM UTC-5')",
             default=current_starttime or "",
             required=False,
@@ -34,6 +42,7 @@ class PartyEditModal(discord.ui.Modal, title="✏️ Edit Party"):
         
         self.tank_input = discord.ui.TextInput(
             label="🛡️ Tank Slots",
+            custom_id='tanks',
             default=str(current_tanks),
             max_length=2
         )
@@ -41,6 +50,7 @@ class PartyEditModal(discord.ui.Modal, title="✏️ Edit Party"):
         
         self.healer_input = discord.ui.TextInput(
             label="💚 Healer Slots",
+            custom_id='healers',
             default=str(current_healers),
             max_length=2
         )
@@ -48,13 +58,24 @@ class PartyEditModal(discord.ui.Modal, title="✏️ Edit Party"):
         
         self.dps_input = discord.ui.TextInput(
             label="⚔️ DPS Slots",
+            custom_id='dps',
             default=str(current_dps),
             max_length=2
         )
         self.add_item(self.dps_input)
     
+    @classmethod
+    def from_custom_id(cls, custom_id: str) -> Optional['PartyEditModal']:
+        """Rebuild an edit modal from its custom id so a submit can be handled by any process"""
+        prefix, _, party_id = custom_id.partition(':')
+        if prefix != EDIT_MODAL_PREFIX or not party_id:
+            return None
+        return cls(party_id, '', '', 0, 0, 0)
+    
+    @interaction_pipeline('modal.edit_party')
     async def on_submit(self, interaction: discord.Interaction):
         """Handle modal submission"""
+        ctx = get_context(interaction)
         try:
             # Validate slot inputs
             try:
@@ -62,13 +83,13 @@ class PartyEditModal(discord.ui.Modal, title="✏️ Edit Party"):
                 healer_slots = int(self.healer_input.value)
                 dps_slots = int(self.dps_input.value)
             except ValueError:
-                await interaction.response.send_message("❌ Please enter valid numbers for slots!", ephemeral=True)
+                await ctx.send("❌ Please enter valid numbers for slots!", ephemeral=True)
                 return
             
             # Parse the start time if provided
             starttime_value = None
             if self.starttime_input.value.strip():
-                starttime_value = parse_time_string(self.starttime_input.value.strip())
+                starttime_value = parse_time_string(self.starttime_input.value.strip(), interaction.guild_id)
             
             # Update party in database
             updates = {
@@ -79,36 +100,26 @@ class PartyEditModal(discord.ui.Modal, title="✏️ Edit Party"):
                 'dps_slots': dps_slots
             }
             
-            success = party_ops.update_party(self.party_id, updates)
+            success = await ctx.storage(party_ops.update_party, self.party_id, updates)
             
             if success:
-                await interaction.response.send_message("✅ Party updated successfully!", ephemeral=True)
+                await ctx.send("✅ Party updated successfully!", ephemeral=True)
                 
                 # Get updated party data and refresh the view
-                party_data = party_ops.get_party(self.party_id)
-                if party_data:
-                    embed = format_party_embed(party_data)
-                    
+                party = await ctx.storage(party_ops.get_party_model, self.party_id)
+                if party:
                     # Create a fresh view with the same party ID and creator
-                    from ui.views import PartyView
-                    creator_id = party_data.get('created_by')
-                    view = PartyView(self.party_id, creator_id)
+                    from ui.views import PartyView, render_party_message
+                    view = PartyView(self.party_id, party.created_by).apply_state(party)
                     
                     # Update the original message
-                    channel_id = party_data.get('channel_id')
-                    message_id = party_data.get('message_id')
-                    
-                    if channel_id and message_id:
-                        try:
-                            channel = interaction.client.get_channel(channel_id)
-                            if channel:
-                                message = await channel.fetch_message(message_id)
-                                await message.edit(embed=embed, view=view)
-                        except Exception as e:
-                            print(f"Failed to update message after edit: {e}")
+                    try:
+                        await render_party_message(interaction.client, party, view, ctx.work_slot())
+                    except Exception as e:
+                        logger.warning("Failed to update message after edit: %s", e, extra={'party_id': self.party_id})
             else:
-                await interaction.response.send_message("❌ Update failed! Party not found.", ephemeral=True)
+                await ctx.send("❌ Update failed! Party not found.", ephemeral=True)
             
         except Exception as e:
-            print(f"Error in PartyEditModal: {e}")
-            await interaction.response.send_message("❌ Update failed! Please try again.", ephemeral=True)
\ No newline at end of file
+            logger.error("Error in PartyEditModal: %s", e, extra={'party_id': self.party_id})
+            await ctx.send("❌ Update failed! Please try again.", ephemeral=True)
\ No newline at end of file
@@ -1,12 +1,135 @@
 """
 Discord UI Views
 """
+import asyncio
+import logging
+import weakref
+import functools
 import discord
-from typing import Optional
+from typing import AsyncContextManager, Dict, Optional, Tuple, Union
+from database.models import Party
 from database.party_operations import party_ops
-from config.settings import EMBED_COLOR, DEFAULT_TANK_SLOTS, DEFAULT_HEALER_SLOTS, DEFAULT_DPS_SLOTS, SUCCESS_COLOR
+from config.settings import EMBED_COLOR, SUCCESS_COLOR, INTERACTION_DEFER_DEADLINE
 from utils.helpers import format_party_embed
 from ui.modals import PartyEditModal
+from monitoring.metrics import registry, discord_call
+from utils.interactions import interaction_pipeline, get_context
+from utils.cache import LRUCache
+from utils.admission import admission, ADMISSION_DECISIONS
+
+logger = logging.getLogger(__name__)
+
+# Party buttons carry "party:<party_id>:<action>" custom ids so any process can route a click
+# without having created the view itself (HTTP interactions, restarts, other clusters)
+PARTY_CUSTOM_ID_PREFIX = 'party'
+
+def party_custom_id(party_id: str, action: str) -> str:
+    """Build the custom id of a party button"""
+    return f"{PARTY_CUSTOM_ID_PREFIX}:{party_id}:{action}"
+
+def parse_party_custom_id(custom_id: str) -> Optional[Tuple[str, str]]:
+    """Split a party button custom id into (party_id, action), None for other components"""
+    prefix, _, rest = (custom_id or '').partition(':')
+    party_id, _, action = rest.rpartition(':')
+    if prefix != PARTY_CUSTOM_ID_PREFIX or not party_id or not action:
+        return None
+    return party_id, action
+
+def is_dispatched(client: discord.Client, interaction: discord.Interaction) -> bool:
+    """Whether the client's view store already dispatched this component click to a view
+    
+    Mirrors ViewStore.dispatch_view, which runs before the interaction event: the message's own
+    views first, then persistent views added without a message id.
+    """
+    views = client._connection._view_store._views
+    key = (interaction.data.get('component_type'), interaction.data.get('custom_id'))
+    message_id = interaction.message.id if interaction.message is not None else None
+    return any(key in views.get(entity_id, {}) for entity_id in (message_id, None))
+
+# Highest revision each party's message was rendered at by this process
+_rendered_revisions = LRUCache(4096)
+# One lock per party while any of its renders is in flight (dropped with the last holder)
+_render_locks: 'weakref.WeakValueDictionary[str, asyncio.Lock]' = weakref.WeakValueDictionary()
+
+async def render_party_message(client: discord.Client, party: Party, view: discord.ui.View,
+                               work_slot: AsyncContextManager) -> bool:
+    """Edit the party's message to show party, unless a newer revision was already rendered
+    
+    Renders of one party are serialized, so two writes whose edits race land in revision order
+    instead of leaving the older roster on the message. Returns whether the message was edited.
+    """
+    if not (party.channel_id and party.message_id):
+        return False
+    lock = _render_locks.get(party.id)
+    if lock is None:
+        lock = _render_locks[party.id] = asyncio.Lock()
+    async with lock:
+        if party.revision < _rendered_revisions.get(party.id, 0):
+            return False
+        # Edit through a partial message: no channel cache or fetch round trip needed
+        message = client.get_partial_messageable(party.channel_id).get_partial_message(party.message_id)
+        async with work_slot:
+            with discord_call('edit_message'):
+                await message.edit(embed=format_party_embed(party), view=view)
+        _rendered_revisions.set(party.id, party.revision)
+        return True
+
+# Buttons locked once signups close at the party's start time
+SIGNUP_ACTIONS = ('join_tank', 'join_healer', 'join_dps')
+# Bump when the party buttons change so restore_views re-attaches views to every message
+VIEW_LAYOUT = 1
+
+DEAD_CLICKS = registry.counter(
+    "party_bot_dead_clicks_total", "Clicks on deleted or archived parties answered from the tombstone cache",
+    ["outcome"])
+
+ROLE_NAMES = {'tank': 'Tank', 'healer': 'Healer', 'dps': 'DPS'}
+
+ADMISSION_MESSAGES = {
+    'in_flight': "⏳ Still working on your last click...",
+    'rate_limited': "⏳ Slow down! Try again in a moment."
+}
+
+def admission_control(action: str, role: Optional[str] = None):
+    """Gate a PartyView button: per-user rate limit, one click in flight, same-role clicks answered from cache
+    
+    Goes outside interaction_pipeline so rejected clicks never defer or touch storage.
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        async def wrapper(self, interaction: discord.Interaction, *args, **kwargs):
+            if role is not None and party_ops.peek_member_role(self.party_id, interaction.user.id) == role:
+                ADMISSION_DECISIONS.labels(action=action, outcome='noop').inc()
+                if role == 'cant_attend':
+                    message = "❌ You're already marked as Can't Attend."
+                else:
+                    message = f"✅ You're already signed up as {ROLE_NAMES[role]}."
+                await interaction.response.send_message(message, ephemeral=True)
+                return
+            
+            # Retry clicks while queued for a full role
+            position = party_ops.peek_queue_position(self.party_id, interaction.user.id, role) if role else None
+            if position is not None:
+                ADMISSION_DECISIONS.labels(action=action, outcome='noop').inc()
+                await interaction.response.send_message(
+                    f"⏳ You're #{position} on the {ROLE_NAMES[role]} waitlist - you'll be moved in when a slot frees up.",
+                    ephemeral=True)
+                return
+            
+            key = (interaction.user.id, self.party_id)
+            reason = admission.acquire(key)
+            if reason is not None:
+                ADMISSION_DECISIONS.labels(action=action, outcome=reason).inc()
+                await interaction.response.send_message(ADMISSION_MESSAGES[reason], ephemeral=True)
+                return
+            
+            ADMISSION_DECISIONS.labels(action=action, outcome='admitted').inc()
+            try:
+                return await func(self, interaction, *args, **kwargs)
+            finally:
+                admission.release(key)
+        return wrapper
+    return decorator
 
 class DeleteConfirmView(discord.ui.View):
     """Confirmation view for deleting a party"""
@@ -17,15 +140,14 @@ class DeleteConfirmView(discord.ui.View):
         self.party_name = party_name
     
     @discord.ui.button(label='Yes, Delete', style=discord.ButtonStyle.danger, emoji='🗑️')
+    @interaction_pipeline('view.confirm_delete')
     async def confirm_delete(self, interaction: discord.Interaction, button: discord.ui.Button):
+        ctx = get_context(interaction)
         try:
             # Delete the party
-            success = party_ops.delete_party(self.party_id)
+            success = await ctx.storage(party_ops.delete_party, self.party_id)
             
             if success:
-                # Try to delete the original message too
-                party_data = party_ops.get_party(self.party_id)  # This will return None now
-                
                 embed = discord.Embed(
                     title="🗑️ Party Deleted",
                     description=f"Successfully deleted **{self.party_name}**",
@@ -36,18 +158,20 @@ class DeleteConfirmView(discord.ui.View):
                 for item in self.children:
                     item.disabled = True
                 
-                await interaction.response.edit_message(embed=embed, view=self)
+                await ctx.edit_message(embed=embed, view=self)
                 
-                print(f"🗑️ Party {self.party_id} ({self.party_name}) deleted by {interaction.user.display_name}")
+                logger.info("🗑️ Party %s (%s) deleted by %s", self.party_id, self.party_name, interaction.user.display_name)
             else:
-                await interaction.response.send_message("❌ Failed to delete party!", ephemeral=True)
+                await ctx.send("❌ Failed to delete party!", ephemeral=True)
         
         except Exception as e:
-            print(f"Error in confirm_delete: {e}")
-            await interaction.response.send_message("❌ Delete failed!", ephemeral=True)
+            logger.error("Error in confirm_delete: %s", e, extra={'party_id': self.party_id})
+            await ctx.send("❌ Delete failed!", ephemeral=True)
     
     @discord.ui.button(label='Cancel', style=discord.ButtonStyle.secondary, emoji='❌')
+    @interaction_pipeline('view.cancel_delete')
     async def cancel_delete(self, interaction: discord.Interaction, button: discord.ui.Button):
+        ctx = get_context(interaction)
         # Disable all buttons
         for item in self.children:
             item.disabled = True
@@ -58,70 +182,111 @@ class DeleteConfirmView(discord.ui.View):
             color=0x95A5A6
         )
         
-        await interaction.response.edit_message(embed=embed, view=self)
+        await ctx.edit_message(embed=embed, view=self)
 
 class PartyView(discord.ui.View):
     """View for party interaction buttons"""
     
+    # Deleted parties whose message was already disabled by a dead click
+    _closed_messages = LRUCache(4096)
+    
     def __init__(self, party_id: str, creator_id: Optional[int]):
         super().__init__(timeout=None)
         self.party_id = party_id
         self.creator_id = creator_id
+        for item in self.children:
+            item.custom_id = party_custom_id(party_id, item.callback.callback.__name__)
+    
+    @classmethod
+    def closed(cls, party_id: str, creator_id: Optional[int]) -> 'PartyView':
+        """The party's buttons, all disabled (archived or deleted parties)"""
+        view = cls(party_id, creator_id)
+        for item in view.children:
+            item.disabled = True
+        return view
+    
+    def apply_state(self, party: Union[Party, Dict]) -> 'PartyView':
+        """Disable the join buttons once the party's signups are closed"""
+        closed = party.signups_closed if isinstance(party, Party) else bool(party.get('signups_closed'))
+        for item in self.children:
+            if parse_party_custom_id(item.custom_id)[1] in SIGNUP_ACTIONS:
+                item.disabled = closed
+        return self
+    
+    @staticmethod
+    def state_key(party: Union[Party, Dict]) -> str:
+        """Everything apply_state renders into the message's components, as a comparable string"""
+        closed = party.signups_closed if isinstance(party, Party) else bool(party.get('signups_closed'))
+        return f"v{VIEW_LAYOUT}:{'closed' if closed else 'open'}"
     
     @discord.ui.button(label='Join as Tank', style=discord.ButtonStyle.primary, emoji='🛡️', row=0)
+    @admission_control('join_tank', 'tank')
+    @interaction_pipeline('view.join_tank')
     async def join_tank(self, interaction: discord.Interaction, button: discord.ui.Button):
         await self.join_role(interaction, 'tank')
     
     @discord.ui.button(label='Join as Healer', style=discord.ButtonStyle.success, emoji='💚', row=0)
+    @admission_control('join_healer', 'healer')
+    @interaction_pipeline('view.join_healer')
     async def join_healer(self, interaction: discord.Interaction, button: discord.ui.Button):
         await self.join_role(interaction, 'healer')
     
     @discord.ui.button(label='Join as DPS', style=discord.ButtonStyle.danger, emoji='⚔️', row=0)
+    @admission_control('join_dps', 'dps')
+    @interaction_pipeline('view.join_dps')
     async def join_dps(self, interaction: discord.Interaction, button: discord.ui.Button):
         await self.join_role(interaction, 'dps')
     
     @discord.ui.button(label="Can't Attend", style=discord.ButtonStyle.secondary, emoji='❌', row=1)
+    @admission_control('cant_attend', 'cant_attend')
+    @interaction_pipeline('view.cant_attend')
     async def cant_attend(self, interaction: discord.Interaction, button: discord.ui.Button):
         await self.join_role(interaction, 'cant_attend')
     
     @discord.ui.button(label='Leave Party', style=discord.ButtonStyle.secondary, emoji='🚪', row=1)
+    @admission_control('leave_party')
+    @interaction_pipeline('view.leave_party')
     async def leave_party(self, interaction: discord.Interaction, button: discord.ui.Button):
+        ctx = get_context(interaction)
         try:
-            # Get party data
-            party_data = party_ops.get_party(self.party_id)
-            if not party_data:
-                await interaction.response.send_message("❌ Party not found!", ephemeral=True)
-                return
-            
-            members = party_data.get('members', {})
-            user_id_str = str(interaction.user.id)
-            
-            # Check if user is in party
-            if user_id_str not in members:
-                await interaction.response.send_message("❌ You're not in this party!", ephemeral=True)
-                return
-            
-            # Remove user from party
-            success = party_ops.remove_member(self.party_id, interaction.user.id)
+            # Remove user from party (or its waitlist); a freed slot goes to the head of the queue
+            outcome, party_data = await ctx.storage(party_ops.leave_party, self.party_id, interaction.user.id)
             
-            if success:
-                await interaction.response.send_message("🚪 **Left the party** - You're no longer signed up.", ephemeral=True)
-                await self.update_embed(interaction)
+            if outcome == 'not_found':
+                await ctx.send("❌ Party not found!", ephemeral=True)
+            elif outcome == 'not_member':
+                await ctx.send("❌ You're not in this party!", ephemeral=True)
+            elif outcome in ('left', 'unqueued'):
+                if outcome == 'left':
+                    await ctx.send("🚪 **Left the party** - You're no longer signed up.", ephemeral=True)
+                else:
+                    await ctx.send("🚪 **Left the waitlist** - You're no longer queued.", ephemeral=True)
+                await self.update_embed(interaction, Party.from_dict(party_data))
             else:
-                await interaction.response.send_message("❌ Failed to leave party!", ephemeral=True)
+                await ctx.send("❌ Failed to leave party!", ephemeral=True)
             
         except Exception as e:
-            print(f"Error in leave_party: {e}")
-            await interaction.response.send_message("❌ Failed to leave party!", ephemeral=True)
+            logger.error("Error in leave_party: %s", e, extra={'party_id': self.party_id})
+            await ctx.send("❌ Failed to leave party!", ephemeral=True)
     
     async def interaction_check(self, interaction: discord.Interaction) -> bool:
         """Check if user can interact with buttons"""
-        custom_id = interaction.data.get('custom_id')
+        parsed = parse_party_custom_id(interaction.data.get('custom_id'))
+        action = parsed[1] if parsed else None
+        
+        # Deleted or archived party: answer from memory without touching storage
+        if party_ops.is_deleted(self.party_id):
+            await self.reject_dead_click(interaction)
+            return False
         
         # For edit and delete buttons, only allow creator or admins
-        if custom_id in ['edit_party', 'delete_party']:
+        if action in ['edit_party', 'delete_party']:
+            is_admin = interaction.permissions.administrator
+            if self.creator_id is None and not is_admin:
+                # View rebuilt from a custom id: look the creator up once
+                party_data = await get_context(interaction).storage(party_ops.get_party, self.party_id)
+                self.creator_id = party_data.get('created_by') if party_data else None
             is_creator = interaction.user.id == self.creator_id
-            is_admin = interaction.user.guild_permissions.administrator
             
             if not (is_creator or is_admin):
                 await interaction.response.send_message("❌ Only the party creator or admins can edit/delete this party!", ephemeral=True)
@@ -129,36 +294,58 @@ class PartyView(discord.ui.View):
         
         return True
     
-    @discord.ui.button(label='Edit Party', style=discord.ButtonStyle.primary, emoji='✏️', row=2, custom_id='edit_party')
+    async def reject_dead_click(self, interaction: discord.Interaction):
+        """Tell the user the party is gone; the first dead click also disables the stale message"""
+        if PartyView._closed_messages.get(self.party_id) is None:
+            PartyView._closed_messages.set(self.party_id, True)
+            try:
+                await interaction.response.edit_message(view=PartyView.closed(self.party_id, self.creator_id))
+                await interaction.followup.send("❌ This party no longer exists.", ephemeral=True)
+                DEAD_CLICKS.labels(outcome='closed_message').inc()
+                return
+            except discord.HTTPException as e:
+                logger.warning("Failed to close stale party message: %s", e, extra={'party_id': self.party_id})
+        
+        if not interaction.response.is_done():
+            await interaction.response.send_message("❌ This party no longer exists.", ephemeral=True)
+        DEAD_CLICKS.labels(outcome='rejected').inc()
+    
+    @discord.ui.button(label='Edit Party', style=discord.ButtonStyle.primary, emoji='✏️', row=2)
+    @admission_control('edit_party')
+    @interaction_pipeline('view.edit_party', can_defer=False)
     async def edit_party(self, interaction: discord.Interaction, button: discord.ui.Button):
+        ctx = get_context(interaction)
         try:
-            # Get party data
-            party_data = party_ops.get_party(self.party_id)
-            if not party_data:
-                await interaction.response.send_message("❌ Party not found!", ephemeral=True)
+            # Get party data (no deferring here: the modal has to be the initial response)
+            party = await ctx.storage(party_ops.get_party_model, self.party_id, timeout=INTERACTION_DEFER_DEADLINE)
+            if not party:
+                await ctx.send("❌ Party not found!", ephemeral=True)
                 return
             
             modal = PartyEditModal(
                 self.party_id,
-                party_data.get('party_name', ''),
-                party_data.get('party_timestamp', ''),
-                party_data.get('tank_slots', DEFAULT_TANK_SLOTS),
-                party_data.get('healer_slots', DEFAULT_HEALER_SLOTS),
-                party_data.get('dps_slots', DEFAULT_DPS_SLOTS)
+                party.name,
+                party.party_timestamp if party.party_timestamp is not None else '',
+                party.slots['tank'],
+                party.slots['healer'],
+                party.slots['dps']
             )
-            await interaction.response.send_modal(modal)
+            await ctx.send_modal(modal)
             
         except Exception as e:
-            print(f"Error in edit_party: {e}")
-            await interaction.response.send_message("❌ Edit failed!", ephemeral=True)
+            logger.error("Error in edit_party: %s", e, extra={'party_id': self.party_id})
+            await ctx.send("❌ Edit failed!", ephemeral=True)
     
-    @discord.ui.button(label='Delete Party', style=discord.ButtonStyle.danger, emoji='🗑️', row=2, custom_id='delete_party')
+    @discord.ui.button(label='Delete Party', style=discord.ButtonStyle.danger, emoji='🗑️', row=2)
+    @admission_control('delete_party')
+    @interaction_pipeline('view.delete_party')
     async def delete_party(self, interaction: discord.Interaction, button: discord.ui.Button):
+        ctx = get_context(interaction)
         try:
             # Get party data first to show party name
-            party_data = party_ops.get_party(self.party_id)
+            party_data = await ctx.storage(party_ops.get_party, self.party_id)
             if not party_data:
-                await interaction.response.send_message("❌ Party not found!", ephemeral=True)
+                await ctx.send("❌ Party not found!", ephemeral=True)
                 return
             
             party_name = party_data.get('party_name', 'Unknown Party')
@@ -172,48 +359,47 @@ class PartyView(discord.ui.View):
                 color=0xFF5555
             )
             
-            await interaction.response.send_message(embed=embed, view=confirm_view, ephemeral=True)
+            await ctx.send(embed=embed, view=confirm_view, ephemeral=True)
             
         except Exception as e:
-            print(f"Error in delete_party: {e}")
-            await interaction.response.send_message("❌ Delete failed!", ephemeral=True)
+            logger.error("Error in delete_party: %s", e, extra={'party_id': self.party_id})
+            await ctx.send("❌ Delete failed!", ephemeral=True)
     
     async def join_role(self, interaction: discord.Interaction, role: str):
         """Handle joining a party with a specific role"""
+        ctx = get_context(interaction)
         try:
-            # Get party data
-            party_data = party_ops.get_party(self.party_id)
-            if not party_data:
-                await interaction.response.send_message("❌ Party not found!", ephemeral=True)
+            # Slot checks, queueing and the write happen in one transaction
+            outcome, party_data = await ctx.storage(
+                party_ops.join_role, self.party_id, interaction.user.id, interaction.user.display_name, role)
+            if outcome == 'not_found':
+                await ctx.send("❌ Party not found!", ephemeral=True)
+                return
+            if outcome == 'error':
+                await ctx.send("❌ Failed to join party!", ephemeral=True)
                 return
             
-            # Handle "can't attend" role differently (no slot limits)
-            if role != 'cant_attend':
-                # Check if role has slots
-                role_slots = {
-                    'tank': party_data.get('tank_slots', DEFAULT_TANK_SLOTS),
-                    'healer': party_data.get('healer_slots', DEFAULT_HEALER_SLOTS),
-                    'dps': party_data.get('dps_slots', DEFAULT_DPS_SLOTS)
-                }
-                
-                max_slots = role_slots.get(role, 0)
-                if max_slots == 0:
-                    role_name = role.title()
-                    await interaction.response.send_message(f"❌ No {role_name} slots available in this party!", ephemeral=True)
-                    return
-                
-                # Check if role is full
-                if party_ops.is_role_full(party_data, role):
-                    role_name = role.title()
-                    counts = party_ops.get_member_counts_by_role(party_data)
-                    current_count = counts.get(role, 0)
-                    await interaction.response.send_message(f"❌ {role_name} slots are full! ({current_count}/{max_slots})", ephemeral=True)
-                    return
-            
-            # Add/update user in party
-            success = party_ops.add_member(self.party_id, interaction.user.id, interaction.user.display_name, role)
-            
-            if success:
+            party = Party.from_dict(party_data)
+            role_name = ROLE_NAMES.get(role)
+            if outcome == 'closed':
+                await ctx.send("🔒 Signups for this party are closed.", ephemeral=True)
+            elif outcome == 'no_slots':
+                await ctx.send(f"❌ No {role_name} slots available in this party!", ephemeral=True)
+            elif outcome == 'queue_full':
+                await ctx.send(f"❌ {role_name} slots are full ({party.count(role)}/{party.slots[role]}) "
+                               f"and so is the waitlist!", ephemeral=True)
+            elif outcome in ('queued', 'already_queued'):
+                _, position = party.queue_position(interaction.user.id)
+                await ctx.send(f"⏳ **{role_name} slots are full** - you're #{position} on the waitlist "
+                               f"and will be moved in when a slot frees up.", ephemeral=True)
+                if outcome == 'queued':
+                    await self.update_embed(interaction, party)
+            elif outcome == 'unchanged':
+                if role == 'cant_attend':
+                    await ctx.send("❌ You're already marked as Can't Attend.", ephemeral=True)
+                else:
+                    await ctx.send(f"✅ You're already signed up as {role_name}.", ephemeral=True)
+            else:
                 role_messages = {
                     'tank': '🛡️ **Joined as Tank!**',
                     'healer': '💚 **Joined as Healer!**', 
@@ -221,41 +407,30 @@ class PartyView(discord.ui.View):
                     'cant_attend': '❌ **Marked as Can\'t Attend**'
                 }
                 
-                await interaction.response.send_message(role_messages[role], ephemeral=True)
-                await self.update_embed(interaction)
-            else:
-                await interaction.response.send_message("❌ Failed to join party!", ephemeral=True)
+                await ctx.send(role_messages[role], ephemeral=True)
+                await self.update_embed(interaction, party)
             
         except Exception as e:
-            print(f"Error in join_role: {e}")
-            await interaction.response.send_message("❌ Failed to join party!", ephemeral=True)
+            logger.error("Error in join_role: %s", e, extra={'party_id': self.party_id})
+            await ctx.send("❌ Failed to join party!", ephemeral=True)
     
-    async def update_embed(self, interaction: discord.Interaction):
-        """Update the party embed with current data"""
+    async def update_embed(self, interaction: discord.Interaction, party: Optional[Party] = None):
+        """Update the party embed with current data (party: state a write just returned, saves a read)"""
+        ctx = get_context(interaction)
         try:
             # Get party data
-            party_data = party_ops.get_party(self.party_id)
-            if not party_data:
+            if party is None:
+                party = await ctx.storage(party_ops.get_party_model, self.party_id)
+            if not party:
                 return
             
-            print(f"Party {self.party_id} members: {party_data.get('members', {})}")
-            
-            # Create embed
-            embed = format_party_embed(party_data)
-            
-            # Update original message
-            channel_id = party_data.get('channel_id')
-            message_id = party_data.get('message_id')
+            logger.debug("Party %s members: %s", self.party_id, list(party.members.values()))
             
-            if channel_id and message_id:
-                try:
-                    # Use the interaction's client instead of importing bot
-                    channel = interaction.client.get_channel(channel_id)
-                    if channel:
-                        message = await channel.fetch_message(message_id)
-                        await message.edit(embed=embed, view=self)
-                except Exception as e:
-                    print(f"Failed to update message: {e}")
+            # Update original message (skipped when a newer write already rendered it)
+            try:
+                await render_party_message(interaction.client, party, self.apply_state(party), ctx.work_slot())
+            except Exception as e:
+                logger.warning("Failed to update message: %s", e, extra={'party_id': self.party_id})
                     
         except Exception as e:
-            print(f"Error updating embed: {e}")
\ No newline at end of file
+            logger.error("Error updating embed: %s", e, extra={'party_id': self.party_id})
\ No newline at end of file
@@ -0,0 +1,50 @@
+"""
+Admission control for button clicks: a token bucket and an in-flight guard per (user, party)
+"""
+import time
+from typing import Hashable, Optional, Set
+from config.settings import CLICK_RATE, CLICK_BURST
+from monitoring.metrics import registry
+from utils.cache import LRUCache
+
+ADMISSION_DECISIONS = registry.counter(
+    "party_bot_click_admission_total",
+    "Button clicks by admission outcome (admitted, rate_limited, in_flight, noop)",
+    ["action", "outcome"])
+
+class ClickAdmission:
+    """Token bucket plus in-flight de-duplication, keyed by (user_id, party_id)
+    
+    Only used from the event loop, so no locking is needed.
+    """
+    
+    def __init__(self, rate: float = CLICK_RATE, burst: int = CLICK_BURST, maxsize: int = 10000):
+        self.rate = rate
+        self.burst = burst
+        self._buckets = LRUCache(maxsize)
+        self._in_flight: Set[Hashable] = set()
+    
+    def _take_token(self, key: Hashable) -> bool:
+        now = time.monotonic()
+        tokens, updated = self._buckets.get(key, (float(self.burst), now))
+        tokens = min(float(self.burst), tokens + (now - updated) * self.rate)
+        if tokens < 1.0:
+            self._buckets.set(key, (tokens, now))
+            return False
+        self._buckets.set(key, (tokens - 1.0, now))
+        return True
+    
+    def acquire(self, key: Hashable) -> Optional[str]:
+        """Admit a click; returns None when admitted, otherwise the rejection reason"""
+        if key in self._in_flight:
+            return 'in_flight'
+        if not self._take_token(key):
+            return 'rate_limited'
+        self._in_flight.add(key)
+        return None
+    
+    def release(self, key: Hashable):
+        """Mark an admitted click as finished"""
+        self._in_flight.discard(key)
+
+admission = ClickAdmission()
@@ -0,0 +1,88 @@
+"""
+Small in-process caches
+"""
+import time
+import threading
+from collections import OrderedDict
+from typing import Any, Hashable, Optional
+
+class LRUCache:
+    """Bounded least-recently-used cache with hit/miss counters"""
+    
+    def __init__(self, maxsize: int = 1024):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+    
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Return the cached value for key and mark it as recently used"""
+        try:
+            value = self._data[key]
+        except KeyError:
+            self.misses += 1
+            return default
+        
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+    
+    def set(self, key: Hashable, value: Any):
+        """Store a value, evicting the least recently used entry when full"""
+        self._data[key] = value
+        self._data.move_to_end(key)
+        if len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+    
+    def pop(self, key: Hashable, default: Any = None) -> Optional[Any]:
+        """Remove a key and return its value"""
+        return self._data.pop(key, default)
+    
+    def clear(self):
+        """Drop all entries and reset counters"""
+        self._data.clear()
+        self.hits = 0
+        self.misses = 0
+    
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._data
+    
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class TTLCache(LRUCache):
+    """Thread-safe LRU cache whose entries also expire after ttl seconds"""
+    
+    _MISSING = object()
+    
+    def __init__(self, maxsize: int = 1024, ttl: float = 30.0):
+        super().__init__(maxsize)
+        self.ttl = ttl
+        self._lock = threading.Lock()
+    
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            entry = super().get(key, self._MISSING)
+            if entry is self._MISSING:
+                return default
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._data[key]
+                self.hits -= 1
+                self.misses += 1
+                return default
+            return value
+    
+    def set(self, key: Hashable, value: Any):
+        with self._lock:
+            super().set(key, (time.monotonic() + self.ttl, value))
+    
+    def pop(self, key: Hashable, default: Any = None) -> Optional[Any]:
+        with self._lock:
+            entry = super().pop(key, self._MISSING)
+            return default if entry is self._MISSING else entry[1]
+    
+    def clear(self):
+        with self._lock:
+            super().clear()
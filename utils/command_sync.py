@@ -0,0 +1,88 @@
+"""
+Slash command sync that only calls Discord when the command tree changed
+
+The serialized tree is hashed per scope (global, or each development guild) and
+compared with the hash stored at the last sync, so restarts and gateway
+reconnects do not spend rate-limited sync calls on an unchanged tree.
+
+With DEV_GUILD_IDS set only the guild scopes are synced; global commands that an
+earlier global sync registered stay registered with Discord, so those guilds show
+every command twice. Use a separate application for development.
+"""
+import json
+import asyncio
+import hashlib
+import logging
+from typing import List, Optional
+import discord
+from discord import app_commands
+from config.settings import COMMAND_SYNC, DEV_GUILD_IDS, LEASE_TTL
+from database.bot_state import bot_state
+from jobs.runner import get_job_runner
+from monitoring.metrics import registry
+
+logger = logging.getLogger(__name__)
+
+COMMAND_SYNCS = registry.counter(
+    "party_bot_command_syncs_total", "Command tree sync decisions at boot", ["scope", "outcome"])
+
+LEASE_ATTEMPTS = 3
+
+def command_tree_hash(tree: app_commands.CommandTree, guild: Optional[discord.abc.Snowflake] = None) -> str:
+    """Stable hash of the commands that would be synced for guild (None for global)"""
+    payload = sorted((command.to_dict(tree) for command in tree.get_commands(guild=guild)),
+                     key=lambda command: command['name'])
+    return hashlib.sha256(json.dumps(payload, sort_keys=True, separators=(',', ':')).encode()).hexdigest()
+
+async def sync_commands(bot, mode: str = COMMAND_SYNC, guild_ids: List[int] = DEV_GUILD_IDS):
+    """Sync each scope whose tree hash differs from the stored one"""
+    if mode == 'off':
+        return
+    
+    # Only one replica syncs; the others skip (their tree is the same build)
+    runner = get_job_runner(bot)
+    store = runner.store
+    lease = None
+    for attempt in range(1, LEASE_ATTEMPTS + 1):
+        try:
+            lease = await asyncio.to_thread(store.acquire, 'command_sync', runner.holder, LEASE_TTL)
+        except Exception as e:
+            logger.warning("Could not take the command sync lease (attempt %d): %s", attempt, e)
+            if attempt < LEASE_ATTEMPTS:
+                await asyncio.sleep(2 ** attempt)
+            continue
+        if lease is None:
+            logger.info("⚡ Another replica is syncing commands, skipping")
+            return
+        break
+    else:
+        # Lease storage unreachable: sync anyway, the hash check keeps a duplicate sync cheap
+        logger.warning("⚡ Lease storage unavailable, syncing commands without the lease")
+    
+    try:
+        guilds = [discord.Object(id=guild_id) for guild_id in guild_ids] or [None]
+        for guild in guilds:
+            if guild is not None:
+                bot.tree.copy_global_to(guild=guild)
+            scope = str(guild.id) if guild is not None else 'global'
+            digest = command_tree_hash(bot.tree, guild)
+            
+            if mode != 'force':
+                stored = await asyncio.to_thread(bot_state.get_command_hash, bot.application_id, scope)
+                if stored == digest:
+                    COMMAND_SYNCS.labels(scope=scope, outcome='unchanged').inc()
+                    logger.info("⚡ Commands unchanged for %s, skipping sync", scope)
+                    continue
+            
+            try:
+                synced = await bot.tree.sync(guild=guild)
+            except discord.HTTPException as e:
+                COMMAND_SYNCS.labels(scope=scope, outcome='error').inc()
+                logger.error("❌ Sync failed for %s: %s", scope, e)
+                continue
+            await asyncio.to_thread(bot_state.set_command_hash, bot.application_id, scope, digest)
+            COMMAND_SYNCS.labels(scope=scope, outcome='synced').inc()
+            logger.info("⚡ Synced %d commands for %s", len(synced), scope)
+    finally:
+        if lease is not None:
+            await asyncio.to_thread(store.release, lease)
@@ -2,189 +2,96 @@
 Utility functions and helpers
 """
 import discord
-import datetime
-from typing import Dict, Any, Optional, Union
+from collections import defaultdict
+from typing import Dict, Union
 from config.settings import EMBED_COLOR
+from database.models import Party
+from utils.time_parser import parse_start_time
+
+# Slot roles in embed order: (role, emoji, label)
+ROLE_SECTIONS = (('tank', '🛡️', 'Tank'), ('healer', '💚', 'Healer'), ('dps', '⚔️', 'DPS'))
+ROLE_PLURALS = {'tank': 'Tanks', 'healer': 'Healers', 'dps': 'DPS'}
 
 def parse_time_string(time_str: str, guild_id: int = None) -> Union[int, str]:
     """Parse a time string and return timestamp or original string if parsing fails"""
-    try:
-        import dateutil.parser
-        
-        time_str = time_str.lower()
-        
-        # Parse time as UTC - users should input UTC time
-        dt = dateutil.parser.parse(time_str, fuzzy=True)
-        return int(dt.timestamp())
-        
-    except Exception:
-        # If parsing fails, return original string
-        return time_str
+    return parse_start_time(time_str, guild_id)
 
-def format_party_embed(party_data: Dict) -> discord.Embed:
-    """Format party data into a Discord embed"""
-    party_creator_id = party_data.get('created_by')
-    members = party_data.get('members', {})
+def format_party_embed(party: Union[Party, Dict]) -> discord.Embed:
+    """Format a party into a Discord embed"""
+    party = Party.coerce(party)
     
     embed = discord.Embed(
-        title=f"⚔️ {party_data.get('party_name', 'Unknown Party')}",
+        title=f"⚔️ {party.name}",
         color=EMBED_COLOR
     )
     
     # Add timestamp if exists
-    party_timestamp = party_data.get('party_timestamp')
-    if party_timestamp:
-        try:
-            timestamp = int(party_timestamp)
-            embed.add_field(
-                name="🕐 Party Starts",
-                value=f"<t:{timestamp}:F>\n<t:{timestamp}:R>",
-                inline=False
-            )
-        except (ValueError, TypeError):
-            # It's a string
-            embed.add_field(
-                name="🕐 Party Starts",
-                value=f"**{party_timestamp}**",
-                inline=False
-            )
-    
-    # Organize members with creator crown logic
-    tanks = []
-    healers = []
-    dps = []
-    cant_attend = []
-    
-    for user_id_str, member_data in members.items():
-        user_id = int(user_id_str)
-        username = member_data.get('username', 'Unknown')
-        role = member_data.get('role', 'unknown')
-        
+    if party.start_ts is not None:
+        embed.add_field(
+            name="🕐 Party Starts",
+            value=f"<t:{party.start_ts}:F>\n<t:{party.start_ts}:R>",
+            inline=False
+        )
+    elif party.party_timestamp:
+        # It's a string
+        embed.add_field(
+            name="🕐 Party Starts",
+            value=f"**{party.party_timestamp}**",
+            inline=False
+        )
+    
+    if party.signups_closed:
+        embed.add_field(name="🔒 Signups Closed", value="The party has started.", inline=False)
+    
+    def display_names(role: str) -> list:
         # Add crown if this user is the party creator
-        display_name = f"👑 {username}" if user_id == party_creator_id else username
+        return [f"👑 {member.username}" if member.user_id == party.created_by else member.username
+                for member in party.roles[role]]
+    
+    for role, emoji, label in ROLE_SECTIONS:
+        names = display_names(role)
+        slots = party.slots[role]
+        if slots == 0:
+            text = f"*No {label} Slots Set*"
+        else:
+            text = "\n".join(names[i] if i < len(names) else "*Empty*" for i in range(slots))
         
-        if role == 'tank':
-            tanks.append(display_name)
-        elif role == 'healer':
-            healers.append(display_name)
-        elif role == 'dps':
-            dps.append(display_name)
-        elif role == 'cant_attend':
-            cant_attend.append(display_name)
-    
-    tank_slots = party_data.get('tank_slots', 2)
-    healer_slots = party_data.get('healer_slots', 2)
-    dps_slots = party_data.get('dps_slots', 4)
-    
-    # Tank section
-    if tank_slots == 0:
-        tank_text = "*No Tank Slots Set*"
-    else:
-        tank_display = []
-        for i in range(tank_slots):
-            if i < len(tanks):
-                tank_display.append(f"{tanks[i]}")
-            else:
-                tank_display.append("*Empty*")
-        tank_text = "\n".join(tank_display)
-    
-    embed.add_field(
-        name=f"🛡️ Tanks ({len(tanks)}/{tank_slots})",
-        value=tank_text,
-        inline=True
-    )
-    
-    # Healer section
-    if healer_slots == 0:
-        healer_text = "*No Healer Slots Set*"
-    else:
-        healer_display = []
-        for i in range(healer_slots):
-            if i < len(healers):
-                healer_display.append(f"{healers[i]}")
-            else:
-                healer_display.append("*Empty*")
-        healer_text = "\n".join(healer_display)
-    
-    embed.add_field(
-        name=f"💚 Healers ({len(healers)}/{healer_slots})",
-        value=healer_text,
-        inline=True
-    )
-    
-    # DPS section
-    if dps_slots == 0:
-        dps_text = "*No DPS Slots Set*"
-    else:
-        dps_display = []
-        for i in range(dps_slots):
-            if i < len(dps):
-                dps_display.append(f"{dps[i]}")
-            else:
-                dps_display.append("*Empty*")
-        dps_text = "\n".join(dps_display)
-    
-    embed.add_field(
-        name=f"⚔️ DPS ({len(dps)}/{dps_slots})",
-        value=dps_text,
-        inline=True
-    )
+        queued = party.queue_length(role)
+        waiting = f" • {queued} waiting" if queued else ""
+        embed.add_field(name=f"{emoji} {ROLE_PLURALS[role]} ({len(names)}/{slots}){waiting}", value=text, inline=True)
     
     # Can't Attend section - always show this section
-    if cant_attend:
-        cant_attend_text = "\n".join(cant_attend)
-    else:
-        cant_attend_text = "*Empty*"
-    
+    cant_attend = display_names('cant_attend')
     embed.add_field(
         name=f"❌ Can't Attend ({len(cant_attend)})",
-        value=cant_attend_text,
+        value="\n".join(cant_attend) if cant_attend else "*Empty*",
         inline=False
     )
     
-    total_members = len(tanks) + len(healers) + len(dps)  # Don't count cant_attend in member total
-    total_slots = tank_slots + healer_slots + dps_slots
-    
-    # Get creator's name for footer
-    creator_name = get_creator_name(members, party_creator_id)
-    
-    embed.set_footer(text=f"{creator_name}'s Party • {total_members}/{total_slots} members")
+    # Don't count cant_attend in member total
+    embed.set_footer(text=f"{party.creator_name}'s Party • {party.total_members}/{party.total_slots} members")
     
     return embed
 
-def get_creator_name(members: Dict, creator_id: int) -> str:
-    """Get the creator's display name from members or return Unknown"""
-    for user_id_str, member_data in members.items():
-        if int(user_id_str) == creator_id:
-            return member_data.get('username', 'Unknown')
-    return 'Unknown'
+def get_guild_name(interaction: discord.Interaction) -> str:
+    """Guild name for embeds; the guild may be uncached (HTTP interactions, lean gateway)"""
+    return getattr(interaction.guild, 'name', None) or 'this server'
 
 def format_party_list_embed(party_list: list, guild_name: str) -> discord.Embed:
     """Format a list of parties into a Discord embed"""
     embed = discord.Embed(title="⚔️ Active Parties", color=EMBED_COLOR)
     
-    for party_data in party_list:
-        party_id = party_data['id']
-        name = party_data.get('party_name', 'Unknown')
-        tank_slots = party_data.get('tank_slots', 2)
-        healer_slots = party_data.get('healer_slots', 2)
-        dps_slots = party_data.get('dps_slots', 4)
-        timestamp = party_data.get('party_timestamp')
+    for party in map(Party.coerce, party_list):
+        slots = party.slots
+        info = (f"**#{party.id[:8]}...** • {party.total_members}/{party.total_slots} members\n"
+                f"🛡️{slots['tank']} 💚{slots['healer']} ⚔️{slots['dps']}")
         
-        members = party_data.get('members', {})
-        member_count = len([m for m in members.values() if m.get('role') != 'cant_attend'])
-        total_slots = tank_slots + healer_slots + dps_slots
+        if party.start_ts is not None:
+            info += f"\n🕐 <t:{party.start_ts}:R>"
+        elif party.party_timestamp:
+            info += f"\n🕐 {party.party_timestamp}"
         
-        info = f"**#{party_id[:8]}...** • {member_count}/{total_slots} members\n🛡️{tank_slots} 💚{healer_slots} ⚔️{dps_slots}"
-        
-        if timestamp:
-            try:
-                ts = int(timestamp)
-                info += f"\n🕐 <t:{ts}:R>"
-            except:
-                info += f"\n🕐 {timestamp}"
-        
-        embed.add_field(name=f"🎮 {name}", value=info, inline=False)
+        embed.add_field(name=f"🎮 {party.name}", value=info, inline=False)
     
     return embed
 
@@ -233,35 +140,46 @@ def format_admin_stats_embed(stats: Dict, guild_name: str) -> discord.Embed:
     
     return embed
 
+def format_cluster_stats_embed(cluster_stats: list) -> discord.Embed:
+    """Format per-cluster process statistics into a Discord embed"""
+    embed = discord.Embed(title="🧩 Cluster Statistics", color=EMBED_COLOR)
+    
+    total_guilds = 0
+    for stats in sorted(cluster_stats, key=lambda s: s.get('cluster_id', 0)):
+        cluster_id = stats.get('cluster_id', '?')
+        if 'error' in stats:
+            embed.add_field(name=f"❌ Cluster {cluster_id}", value=f"*{stats['error']}*", inline=True)
+            continue
+        
+        total_guilds += stats.get('guilds', 0)
+        shard_ids = stats.get('shard_ids', [])
+        shard_text = f"{shard_ids[0]}-{shard_ids[-1]}" if len(shard_ids) > 1 else ", ".join(map(str, shard_ids))
+        latency = stats.get('latency_ms')
+        status = "✅" if stats.get('ready') else "⏳"
+        
+        info = (f"**Shards:** {shard_text}\n**Guilds:** {stats.get('guilds', 0)}\n"
+                f"**Latency:** {latency if latency is not None else '?'} ms\n**Memory:** {stats.get('rss_mb', '?')} MB")
+        embed.add_field(name=f"{status} Cluster {cluster_id} (pid {stats.get('pid', '?')})", value=info, inline=True)
+    
+    embed.description = f"**{len(cluster_stats)}** clusters • **{total_guilds}** guilds"
+    return embed
+
 def calculate_party_stats(parties: list) -> Dict:
     """Calculate statistics from a list of parties"""
-    total_parties = len(parties)
-    total_members = 0
     role_stats = {'tank': 0, 'healer': 0, 'dps': 0, 'cant_attend': 0}
-    user_party_count = {}
+    user_party_count = defaultdict(int)
     
-    for party_data in parties:
-        members = party_data.get('members', {})
-        
-        for user_id_str, member_data in members.items():
-            role = member_data.get('role', 'unknown')
-            username = member_data.get('username', 'Unknown')
-            
-            if role != 'cant_attend':
-                total_members += 1
-            
-            if role in role_stats:
-                role_stats[role] += 1
-            
-            # Count user participation
-            if username in user_party_count:
-                user_party_count[username] += 1
-            else:
-                user_party_count[username] = 1
+    for party in map(Party.coerce, parties):
+        for role, members in party.roles.items():
+            role_stats[role] += len(members)
+        # Count user participation
+        for member in party.members.values():
+            user_party_count[member.username] += 1
+    total_members = role_stats['tank'] + role_stats['healer'] + role_stats['dps']
     
     return {
-        'total_parties': total_parties,
+        'total_parties': len(parties),
         'total_members': total_members,
         'role_stats': role_stats,
-        'user_party_count': user_party_count
+        'user_party_count': dict(user_party_count)
     }
\ No newline at end of file
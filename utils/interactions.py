@@ -0,0 +1,195 @@
+"""
+Defer-first interaction pipeline shared by slash commands, buttons and modals
+
+Every handler gets an InteractionContext that:
+- defers up front when the handler's expected backend time exceeds the defer budget,
+- otherwise defers automatically if no response was sent by the defer deadline,
+- runs synchronous storage calls in a worker thread with a per-call timeout, scheduled in the
+  handler's work lane (see utils.work_scheduler),
+- sends the reply through the initial response or a followup, whichever is still valid.
+"""
+import time
+import asyncio
+import logging
+import functools
+from typing import Any, Callable, Dict, Optional
+import discord
+from config.settings import INTERACTION_DEFER_BUDGET, INTERACTION_DEFER_DEADLINE, STORAGE_CALL_TIMEOUT
+from monitoring.metrics import registry, observe_interaction
+from monitoring.recorder import recorder
+from utils.work_scheduler import work_scheduler
+
+logger = logging.getLogger(__name__)
+
+RESPONSE_PATHS = registry.counter(
+    "party_bot_interaction_response_path_total",
+    "How each interaction was acknowledged (immediate, eager_defer, deadline_defer)",
+    ["handler", "path"])
+STORAGE_TIMEOUTS = registry.counter(
+    "party_bot_storage_timeouts_total", "Storage calls that exceeded their timeout", ["handler"])
+EXPECTED_WORK = registry.gauge(
+    "party_bot_interaction_expected_work_seconds", "Moving average of backend time before the reply",
+    ["handler"])
+
+_EWMA_ALPHA = 0.2
+_expected_work: Dict[str, float] = {}
+
+class StorageTimeout(asyncio.TimeoutError):
+    """A storage call did not finish within its timeout"""
+
+class InteractionContext:
+    """Per-interaction state for the defer-first pipeline"""
+    
+    def __init__(self, interaction: discord.Interaction, handler: str, ephemeral: bool = False,
+                 can_defer: bool = True, lane: str = 'interactive'):
+        self.interaction = interaction
+        self.handler = handler
+        self.lane = lane
+        self.ephemeral = ephemeral
+        self.can_defer = can_defer
+        self.started = time.perf_counter()
+        self.path = 'immediate'
+        self.party_id: Optional[str] = None
+        self.backend_seconds = 0.0
+        self._replied = False
+        # A public "thinking" defer: the first followup replaces it and cannot be ephemeral
+        self._public_thinking = False
+        self._lock = asyncio.Lock()
+        self._deadline_handle: Optional[asyncio.TimerHandle] = None
+    
+    @property
+    def deferred(self) -> bool:
+        return self.path != 'immediate'
+    
+    async def start(self):
+        """Defer now if the handler is expected to be slow, otherwise arm the deadline guard"""
+        if not self.can_defer:
+            return
+        if _expected_work.get(self.handler, 0.0) > INTERACTION_DEFER_BUDGET:
+            await self.defer('eager_defer')
+        else:
+            self._deadline_handle = asyncio.get_running_loop().call_later(
+                INTERACTION_DEFER_DEADLINE, lambda: asyncio.ensure_future(self.defer('deadline_defer')))
+    
+    def finish(self):
+        """Cancel the deadline guard and record which path acknowledged the interaction"""
+        if self._deadline_handle is not None:
+            self._deadline_handle.cancel()
+            self._deadline_handle = None
+        RESPONSE_PATHS.labels(handler=self.handler, path=self.path).inc()
+    
+    async def defer(self, path: str = 'eager_defer'):
+        """Acknowledge the interaction so the reply can arrive later through a followup"""
+        async with self._lock:
+            if self.interaction.response.is_done():
+                return
+            try:
+                if self.interaction.type == discord.InteractionType.application_command:
+                    await self.interaction.response.defer(ephemeral=self.ephemeral, thinking=True)
+                    self._public_thinking = not self.ephemeral
+                else:
+                    await self.interaction.response.defer()
+                self.path = path
+            except discord.HTTPException as e:
+                logger.warning("Failed to defer %s: %s", self.handler, e)
+    
+    async def storage(self, func: Callable, *args, timeout: float = STORAGE_CALL_TIMEOUT, **kwargs) -> Any:
+        """Run a synchronous storage call in a worker thread with a timeout (queue time included)
+        
+        On timeout the handler stops waiting but the thread cannot be stopped: it runs to the end
+        and keeps its scheduler slot until then, so the lane limits still hold.
+        """
+        start = time.perf_counter()
+        try:
+            return await asyncio.wait_for(
+                work_scheduler.run(self.lane, self.interaction.guild_id, func, *args, **kwargs), timeout)
+        except asyncio.TimeoutError:
+            STORAGE_TIMEOUTS.labels(handler=self.handler).inc()
+            raise StorageTimeout(f"{getattr(func, '__name__', func)} timed out after {timeout}s")
+        finally:
+            if not self._replied:
+                self.backend_seconds += time.perf_counter() - start
+    
+    def work_slot(self):
+        """Slot in this handler's lane for Discord REST work outside the interaction response"""
+        return work_scheduler.slot(self.lane, self.interaction.guild_id)
+    
+    def _record_reply(self):
+        if self._replied:
+            return
+        self._replied = True
+        previous = _expected_work.get(self.handler)
+        estimate = self.backend_seconds if previous is None else (
+            _EWMA_ALPHA * self.backend_seconds + (1 - _EWMA_ALPHA) * previous)
+        _expected_work[self.handler] = estimate
+        EXPECTED_WORK.labels(handler=self.handler).set(estimate)
+    
+    async def send(self, content: Optional[str] = None, fetch: bool = False, **kwargs) -> Optional[discord.Message]:
+        """Send a message through the initial response, or a followup once responded/deferred
+        
+        fetch returns the sent message, which costs an extra REST call for an initial response.
+        """
+        async with self._lock:
+            self._record_reply()
+            if not self.interaction.response.is_done():
+                await self.interaction.response.send_message(content=content, **kwargs)
+                if not fetch or kwargs.get('ephemeral'):
+                    return None
+                return await self.interaction.original_response()
+            if self._public_thinking:
+                self._public_thinking = False
+                if kwargs.get('ephemeral'):
+                    # Would otherwise turn the public thinking message into this (public) reply
+                    try:
+                        await self.interaction.delete_original_response()
+                    except discord.HTTPException as e:
+                        logger.warning("Failed to remove thinking message of %s: %s", self.handler, e)
+            return await self.interaction.followup.send(content=content, wait=fetch, **kwargs)
+    
+    async def edit_message(self, **kwargs):
+        """Edit the message the component is attached to"""
+        async with self._lock:
+            self._record_reply()
+            if not self.interaction.response.is_done():
+                await self.interaction.response.edit_message(**kwargs)
+            else:
+                await self.interaction.edit_original_response(**kwargs)
+    
+    async def send_modal(self, modal: discord.ui.Modal):
+        """Open a modal; only possible as the initial response"""
+        async with self._lock:
+            self._record_reply()
+            await self.interaction.response.send_modal(modal)
+
+def get_context(interaction: discord.Interaction) -> InteractionContext:
+    """Get the pipeline context of an interaction, creating a non-deferring one if needed"""
+    ctx = interaction.extras.get('pipeline')
+    if ctx is None:
+        ctx = InteractionContext(interaction, 'unknown', can_defer=False)
+        interaction.extras['pipeline'] = ctx
+    return ctx
+
+def interaction_pipeline(handler: str, ephemeral: bool = False, can_defer: bool = True, lane: str = 'interactive'):
+    """Decorator running a cog/view/modal handler inside the defer-first pipeline"""
+    def decorator(func):
+        @observe_interaction(handler)
+        @functools.wraps(func)
+        async def wrapper(self, interaction: discord.Interaction, *args, **kwargs):
+            ctx = InteractionContext(interaction, handler, ephemeral=ephemeral, can_defer=can_defer, lane=lane)
+            interaction.extras['pipeline'] = ctx
+            ok = False
+            try:
+                await ctx.start()
+                result = await func(self, interaction, *args, **kwargs)
+                ok = True
+                return result
+            finally:
+                ctx.finish()
+                if recorder.enabled:
+                    recorder.record(ctx, getattr(self, 'party_id', None) or ctx.party_id, ok)
+        return wrapper
+    return decorator
+
+def expected_work() -> Dict[str, float]:
+    """Current expected backend time per handler"""
+    return dict(_expected_work)
@@ -0,0 +1,226 @@
+"""
+Party start time parsing
+
+Common inputs ("Friday 8PM UTC-5", "tomorrow 19:00", ISO) go through precompiled
+patterns; dateutil is only used as a fallback. Parses are cached per time zone as
+relative specs, so a cached "tomorrow 7pm" stays correct across days.
+"""
+import re
+import datetime
+from typing import Optional, Tuple, Union
+from config.settings import DEFAULT_TIMEZONE, GUILD_TIMEZONES, TIME_PARSE_CACHE_SIZE
+from utils.cache import LRUCache
+from monitoring.metrics import register_cache
+
+_WEEKDAYS = {
+    'mon': 0, 'monday': 0,
+    'tue': 1, 'tues': 1, 'tuesday': 1,
+    'wed': 2, 'weds': 2, 'wednesday': 2,
+    'thu': 3, 'thur': 3, 'thurs': 3, 'thursday': 3,
+    'fri': 4, 'friday': 4,
+    'sat': 5, 'saturday': 5,
+    'sun': 6, 'sunday': 6,
+}
+
+_DAY_OFFSETS = {'today': 0, 'tonight': 0, 'tomorrow': 1, 'tmrw': 1, 'tmr': 1}
+
+_DAY_PATTERN = r'(?P<next>next\s+)?(?P<day>' + '|'.join(
+    sorted(list(_WEEKDAYS) + list(_DAY_OFFSETS), key=len, reverse=True)
+) + r')'
+_TIME_PATTERN = r'(?:at\s+)?(?P<hour>\d{1,2})(?:[:.](?P<minute>\d{2}))?\s*(?P<ampm>am|pm)?'
+_TZ_PATTERN = r'(?P<tz>(?:utc|gmt)\s*[+-]\s*\d{1,2}(?::?\d{2})?|utc|gmt|z)'
+
+_DAY_FIRST_RE = re.compile(rf'^(?:{_DAY_PATTERN}\s*,?\s*)?{_TIME_PATTERN}(?:\s*{_TZ_PATTERN})?$')
+_TIME_FIRST_RE = re.compile(rf'^{_TIME_PATTERN}\s+(?:on\s+)?{_DAY_PATTERN}(?:\s*{_TZ_PATTERN})?$')
+_ISO_RE = re.compile(r'^\d{4}-\d{2}-\d{2}(?:[t ]\d{2}:\d{2}(?::\d{2}(?:\.\d+)?)?)?(?:z|[+-]\d{2}:?\d{2})?$')
+_EPOCH_RE = re.compile(r'^\d{9,11}$')
+_TZ_OFFSET_RE = re.compile(r'(?:utc|gmt)\s*(?P<sign>[+-])\s*(?P<hours>\d{1,2})(?::?(?P<minutes>\d{2}))?')
+_WHITESPACE_RE = re.compile(r'\s+')
+
+_parse_cache = LRUCache(TIME_PARSE_CACHE_SIZE)
+register_cache('time_parse', _parse_cache)
+_tzinfo_cache = {}
+_guild_timezones = dict(GUILD_TIMEZONES)
+_dateutil_parser = None
+
+def set_guild_timezone(guild_id: int, zone: str):
+    """Set the default time zone used for inputs without an explicit UTC offset"""
+    resolve_timezone(zone)  # Raises ValueError for unknown zones
+    _guild_timezones[guild_id] = zone
+
+def get_guild_timezone(guild_id: Optional[int]) -> str:
+    """Get the configured time zone name for a guild"""
+    if guild_id is None:
+        return DEFAULT_TIMEZONE
+    return _guild_timezones.get(guild_id, DEFAULT_TIMEZONE)
+
+def resolve_timezone(zone: str) -> datetime.tzinfo:
+    """Resolve "UTC", "UTC+3", "GMT-5:30" or an IANA name like "Europe/Berlin" to a tzinfo"""
+    key = zone.strip().lower()
+    tzinfo = _tzinfo_cache.get(key)
+    if tzinfo is not None:
+        return tzinfo
+    
+    if key in ('utc', 'gmt', 'z'):
+        tzinfo = datetime.timezone.utc
+    else:
+        match = _TZ_OFFSET_RE.fullmatch(key)
+        if match:
+            tzinfo = _offset_to_tzinfo(match)
+        else:
+            try:
+                from zoneinfo import ZoneInfo
+                tzinfo = ZoneInfo(zone.strip())
+            except Exception:
+                raise ValueError(f"Unknown time zone: {zone}")
+    
+    _tzinfo_cache[key] = tzinfo
+    return tzinfo
+
+def _offset_to_tzinfo(match: re.Match) -> datetime.timezone:
+    """Convert a matched UTC offset to a fixed-offset timezone"""
+    offset = datetime.timedelta(hours=int(match.group('hours')), minutes=int(match.group('minutes') or 0))
+    if match.group('sign') == '-':
+        offset = -offset
+    return datetime.timezone(offset)
+
+def parse_start_time(time_str: str, guild_id: Optional[int] = None,
+                     now: Optional[datetime.datetime] = None) -> Union[int, str]:
+    """Parse a start time into a unix timestamp, or return the input if it cannot be parsed"""
+    original = time_str.strip()
+    normalized = _WHITESPACE_RE.sub(' ', original.lower())
+    if not normalized:
+        return original
+    
+    zone = get_guild_timezone(guild_id)
+    try:
+        default_tz = resolve_timezone(zone)
+    except ValueError:
+        default_tz = datetime.timezone.utc
+    
+    now = now or datetime.datetime.now(datetime.timezone.utc)
+    
+    cache_key = (normalized, zone)
+    spec = _parse_cache.get(cache_key)
+    if spec is None:
+        spec = _parse_fast(normalized)
+        if spec is None:
+            spec = _parse_fallback(normalized, default_tz, now)
+        _parse_cache.set(cache_key, spec)
+    elif spec[0] == 'fallback' and spec[2] != now.astimezone(default_tz).date():
+        # Fallback results are resolved against "today", refresh them once the day changes
+        spec = _parse_fallback(normalized, default_tz, now)
+        _parse_cache.set(cache_key, spec)
+    
+    timestamp = _resolve_spec(spec, default_tz, now)
+    return original if timestamp is None else timestamp
+
+def _parse_fast(text: str) -> Optional[Tuple]:
+    """Try the precompiled patterns and return a cacheable spec"""
+    if _EPOCH_RE.match(text):
+        return ('absolute', int(text))
+    
+    if _ISO_RE.match(text):
+        try:
+            dt = datetime.datetime.fromisoformat(text.upper().replace('Z', '+00:00'))
+        except ValueError:
+            return None
+        return ('iso', dt)
+    
+    match = _DAY_FIRST_RE.match(text) or _TIME_FIRST_RE.match(text)
+    if not match:
+        return None
+    
+    hour = int(match.group('hour'))
+    minute = int(match.group('minute') or 0)
+    ampm = match.group('ampm')
+    
+    # A bare number like "friday 8" is too ambiguous for the fast path
+    if ampm is None and match.group('minute') is None:
+        return None
+    
+    if ampm:
+        if not 1 <= hour <= 12:
+            return None
+        hour = hour % 12 + (12 if ampm == 'pm' else 0)
+    
+    if hour > 23 or minute > 59:
+        return None
+    
+    day = match.group('day')
+    if day is None:
+        day_spec = ('upcoming', None)
+    elif day in _DAY_OFFSETS:
+        day_spec = ('offset', _DAY_OFFSETS[day])
+    else:
+        day_spec = ('next_weekday' if match.group('next') else 'weekday', _WEEKDAYS[day])
+    
+    tz = match.group('tz')
+    tzinfo = resolve_timezone(_WHITESPACE_RE.sub('', tz)) if tz else None
+    
+    return ('relative', day_spec, hour, minute, tzinfo)
+
+def _parse_fallback(text: str, default_tz: datetime.tzinfo, now: datetime.datetime) -> Tuple:
+    """Parse with dateutil, applying UTC offsets ourselves (dateutil inverts the "UTC+3" sign)"""
+    global _dateutil_parser
+    local_now = now.astimezone(default_tz)
+    
+    tzinfo = default_tz
+    offset_match = _TZ_OFFSET_RE.search(text)
+    if offset_match:
+        tzinfo = _offset_to_tzinfo(offset_match)
+        text = (text[:offset_match.start()] + text[offset_match.end():]).strip()
+    
+    try:
+        if _dateutil_parser is None:
+            import dateutil.parser
+            _dateutil_parser = dateutil.parser
+        
+        default = local_now.replace(hour=0, minute=0, second=0, microsecond=0, tzinfo=None)
+        dt = _dateutil_parser.parse(text, default=default, fuzzy=True)
+    except Exception:
+        return ('invalid',)
+    
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=tzinfo)
+    
+    return ('fallback', int(dt.timestamp()), local_now.date())
+
+def _resolve_spec(spec: Tuple, default_tz: datetime.tzinfo, now: datetime.datetime) -> Optional[int]:
+    """Turn a cached spec into a timestamp relative to now"""
+    kind = spec[0]
+    if kind == 'invalid':
+        return None
+    if kind in ('absolute', 'fallback'):
+        return spec[1]
+    if kind == 'iso':
+        dt = spec[1]
+        if dt.tzinfo is None:
+            dt = dt.replace(tzinfo=default_tz)
+        return int(dt.timestamp())
+    
+    _, (day_kind, day_value), hour, minute, tzinfo = spec
+    local_now = now.astimezone(tzinfo or default_tz)
+    target = local_now.replace(hour=hour, minute=minute, second=0, microsecond=0)
+    
+    if day_kind == 'offset':
+        target += datetime.timedelta(days=day_value)
+    elif day_kind == 'upcoming':
+        # A bare time that already passed today means tomorrow
+        if target <= local_now:
+            target += datetime.timedelta(days=1)
+    else:
+        days_ahead = (day_value - local_now.weekday()) % 7
+        if days_ahead == 0 and (day_kind == 'next_weekday' or target <= local_now):
+            days_ahead = 7
+        target += datetime.timedelta(days=days_ahead)
+    
+    return int(target.timestamp())
+
+def get_cache_stats() -> dict:
+    """Get hit/miss statistics for the parse cache"""
+    return {'hits': _parse_cache.hits, 'misses': _parse_cache.misses, 'size': len(_parse_cache)}
+
+def clear_cache():
+    """Clear the parse cache"""
+    _parse_cache.clear()
@@ -0,0 +1,196 @@
+"""
+Priority lanes for storage and Discord REST work, fair between guilds
+
+Lanes are served in priority order (interactive clicks and commands, then admin purges, then
+background jobs). Within a lane, guilds take turns, so one busy guild or one large purge
+cannot hold up everyone else. WORK_CONCURRENCY caps the total work in flight and
+WORK_LANE_LIMITS caps each lane, which leaves room for interactive work. Storage calls run
+on the scheduler's own thread pool, sized so the lane limits (not the default executor)
+bound real concurrency.
+"""
+import time
+import asyncio
+import functools
+import contextlib
+import contextvars
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, AsyncIterator, Callable, Deque, Dict, Hashable, Optional
+from config.settings import WORK_CONCURRENCY, WORK_LANE_LIMITS
+from monitoring.metrics import registry
+
+LANES = ('interactive', 'admin', 'background')
+
+WORK_QUEUE_SECONDS = registry.histogram(
+    "party_bot_work_queue_seconds", "Time work waited for a slot in its lane", ["lane"])
+WORK_QUEUED = registry.gauge("party_bot_work_queued", "Work waiting for a slot", ["lane"])
+WORK_ACTIVE = registry.gauge("party_bot_work_active", "Work currently holding a slot", ["lane"])
+
+def parse_lane_limits(raw: str) -> Dict[str, int]:
+    """Parse "interactive=16,admin=2" into a {lane: limit} dict"""
+    limits = {}
+    for entry in raw.split(','):
+        name, _, limit = entry.strip().partition('=')
+        if name.strip() and limit.strip():
+            limits[name.strip()] = int(limit)
+    return limits
+
+class _Lane:
+    """Waiters of one lane, queued per guild with the guilds in round-robin order"""
+    
+    def __init__(self, name: str, limit: int):
+        self.name = name
+        self.limit = limit
+        self.active = 0
+        self.depth = 0
+        self.waiters: Dict[Hashable, Deque[asyncio.Future]] = {}
+        self.rotation: Deque[Hashable] = deque()
+    
+    def push(self, guild_id: Hashable, future: asyncio.Future):
+        if guild_id not in self.waiters:
+            self.waiters[guild_id] = deque()
+            self.rotation.append(guild_id)
+        self.waiters[guild_id].append(future)
+        self.depth += 1
+    
+    def pop(self) -> asyncio.Future:
+        """Take the next waiter from the guild whose turn it is"""
+        guild_id = self.rotation.popleft()
+        queue = self.waiters[guild_id]
+        future = queue.popleft()
+        if queue:
+            self.rotation.append(guild_id)
+        else:
+            del self.waiters[guild_id]
+        self.depth -= 1
+        return future
+    
+    def discard(self, guild_id: Hashable, future: asyncio.Future):
+        queue = self.waiters.get(guild_id)
+        if queue is None or future not in queue:
+            return
+        queue.remove(future)
+        if not queue:
+            del self.waiters[guild_id]
+            self.rotation.remove(guild_id)
+        self.depth -= 1
+
+class WorkScheduler:
+    """Grants work slots by lane priority, then guild round robin
+    
+    Only used from the event loop; the work itself may run in worker threads.
+    """
+    
+    def __init__(self, concurrency: int = WORK_CONCURRENCY, lane_limits: Optional[Dict[str, int]] = None):
+        limits = parse_lane_limits(WORK_LANE_LIMITS) if lane_limits is None else lane_limits
+        self.concurrency = max(1, concurrency)
+        self.active = 0
+        self.lanes = {name: _Lane(name, max(1, limits.get(name, self.concurrency))) for name in LANES}
+        # Never more threads busy than slots granted
+        self.max_workers = min(self.concurrency, sum(lane.limit for lane in self.lanes.values()))
+        self._executor: Optional[ThreadPoolExecutor] = None
+    
+    @property
+    def executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='work')
+        return self._executor
+    
+    def _can_start_now(self, lane: _Lane) -> bool:
+        # Nobody may jump the queue of its own lane, or of a higher priority lane that could start
+        # right now; a higher lane waiting only on its own limit does not hold up lower lanes
+        for other in self.lanes.values():
+            if other is lane:
+                if other.depth:
+                    return False
+                break
+            if other.depth and other.active < other.limit:
+                return False
+        return self.active < self.concurrency and lane.active < lane.limit
+    
+    def _start(self, lane: _Lane):
+        self.active += 1
+        lane.active += 1
+        WORK_ACTIVE.labels(lane=lane.name).set(lane.active)
+    
+    def _release(self, lane: _Lane):
+        self.active -= 1
+        lane.active -= 1
+        WORK_ACTIVE.labels(lane=lane.name).set(lane.active)
+        self._dispatch()
+    
+    def _dispatch(self):
+        while self.active < self.concurrency:
+            for lane in self.lanes.values():
+                if lane.depth and lane.active < lane.limit:
+                    future = lane.pop()
+                    WORK_QUEUED.labels(lane=lane.name).set(lane.depth)
+                    self._start(lane)
+                    future.set_result(None)
+                    break
+            else:
+                return
+    
+    async def _acquire(self, lane: _Lane, guild_id: Optional[int]):
+        """Wait for a slot in the lane; the caller must _release it"""
+        queued = time.perf_counter()
+        if self._can_start_now(lane):
+            self._start(lane)
+        else:
+            future = asyncio.get_running_loop().create_future()
+            lane.push(guild_id, future)
+            WORK_QUEUED.labels(lane=lane.name).set(lane.depth)
+            try:
+                await future
+            except asyncio.CancelledError:
+                if future.done() and not future.cancelled():
+                    # Granted just as the waiter was cancelled: hand the slot on
+                    self._release(lane)
+                else:
+                    lane.discard(guild_id, future)
+                    WORK_QUEUED.labels(lane=lane.name).set(lane.depth)
+                raise
+        WORK_QUEUE_SECONDS.labels(lane=lane.name).observe(time.perf_counter() - queued)
+    
+    @contextlib.asynccontextmanager
+    async def slot(self, lane_name: str, guild_id: Optional[int] = None) -> AsyncIterator[None]:
+        """Hold one work slot in the given lane for the duration of the block"""
+        lane = self.lanes[lane_name]
+        await self._acquire(lane, guild_id)
+        try:
+            yield
+        finally:
+            self._release(lane)
+    
+    async def run(self, lane_name: str, guild_id: Optional[int], func: Callable, *args, **kwargs) -> Any:
+        """Run a synchronous storage call in a worker thread once the lane grants a slot
+        
+        The slot is held until the thread finishes, not until the caller stops waiting: a call
+        abandoned by a timeout keeps running, and keeps counting against the lane limits.
+        """
+        lane = self.lanes[lane_name]
+        await self._acquire(lane, guild_id)
+        # Carry the context over like asyncio.to_thread, so spans opened in func have their parent
+        call = functools.partial(contextvars.copy_context().run, func, *args, **kwargs)
+        try:
+            future = self.executor.submit(call)
+        except BaseException:
+            self._release(lane)
+            raise
+        loop = asyncio.get_running_loop()
+        
+        def finished(_):
+            try:
+                loop.call_soon_threadsafe(self._release, lane)
+            except RuntimeError:
+                pass  # Loop already closed at shutdown
+        
+        future.add_done_callback(finished)
+        return await asyncio.wrap_future(future)
+    
+    def snapshot(self) -> Dict[str, Dict[str, int]]:
+        """Active and queued work per lane"""
+        return {lane.name: {'active': lane.active, 'queued': lane.depth, 'limit': lane.limit}
+                for lane in self.lanes.values()}
+
+work_scheduler = WorkScheduler()